@@ -53,29 +53,74 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Tam metin arama ve trigram desteği
     'onep',  # ONEP uygulamamız
 ]
 
 # Cache framework ayarları (PERFORMANCE BOOST)
-CACHES = {
-    'default': {
+# ONEP_CACHE_BACKEND ile paylaşılan katman seçilir:
+#   locmem -- worker başına bellek içi (tek worker / geliştirme)
+#   file   -- ortak dizinde dosya tabanlı, dış servis gerektirmez
+#   db     -- veritabanı tablosu ('python manage.py createcachetable' gerekir)
+#   redis  -- REDIS_URL ile Redis ('redis' paketi kurulu olmalı)
+# Paylaşılan bir katman seçildiğinde 'default' önbellek, önünde küçük bir süreç
+# içi LRU bulunan iki katmanlı önbellektir (onep/cache_backends.py).
+ONEP_CACHE_BACKEND = config('ONEP_CACHE_BACKEND', default='locmem')
+ONEP_CACHE_IKI_KATMAN = config('ONEP_CACHE_IKI_KATMAN', default=True, cast=bool)
+
+if ONEP_CACHE_BACKEND == 'file':
+    PAYLASILAN_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('ONEP_CACHE_DIR', default=str(BASE_DIR / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+elif ONEP_CACHE_BACKEND == 'db':
+    PAYLASILAN_CACHE = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'onep_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+elif ONEP_CACHE_BACKEND == 'redis':
+    PAYLASILAN_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('REDIS_URL', default='redis://127.0.0.1:6379/1'),
+    }
+else:
+    PAYLASILAN_CACHE = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'onep-cache',
-        'TIMEOUT': 300,  # 5 dakika önbellek
         'OPTIONS': {
             'MAX_ENTRIES': 1000,  # Maksimum önbellek girişi
             'CULL_FREQUENCY': 3,  # Her 3 seferinde bir fazlalık girdileri temizle
         }
     }
-}
+PAYLASILAN_CACHE.update({
+    'TIMEOUT': 300,  # 5 dakika önbellek
+    'KEY_PREFIX': 'onep',
+})
+
+CACHES = {'shared': PAYLASILAN_CACHE}
+if ONEP_CACHE_BACKEND != 'locmem' and ONEP_CACHE_IKI_KATMAN:
+    CACHES['default'] = {
+        'BACKEND': 'onep.cache_backends.IkiKatmanliCache',
+        'LOCATION': 'shared',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'YEREL_MAX_ENTRIES': config('ONEP_CACHE_YEREL_MAX', default=500, cast=int),
+            'YEREL_TIMEOUT': config('ONEP_CACHE_YEREL_SURE', default=30, cast=int),
+        },
+    }
+else:
+    CACHES['default'] = PAYLASILAN_CACHE
 
-# Site genelinde önbellek
-CACHE_MIDDLEWARE_ALIAS = 'default'
-CACHE_MIDDLEWARE_SECONDS = 600  # 10 dakika önbellek
-CACHE_MIDDLEWARE_KEY_PREFIX = 'onep'
+# Katalog sayfalarının (liste/detay) kullandığı önbellek alias'ı
+ONEP_KATALOG_CACHE = 'default'
+
+# Site genelinde sayfa önbelleği (UpdateCache/FetchFromCache) kullanılmıyor:
+# katalog önbellekleri sürümlü anahtarlarla tutulur (onep/caching.py), böylece
+# ürün/stok/yorum değişiklikleri anında yansır.
 
 MIDDLEWARE = [
-    'django.middleware.cache.UpdateCacheMiddleware',  # En başa ekle
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise for static files
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -85,7 +130,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'django.middleware.cache.FetchFromCacheMiddleware',  # En sona ekle
 ]
 
 ROOT_URLCONF = 'ONEP_ORG.urls'
@@ -128,7 +172,8 @@ db_config = dj_database_url.config(
 )
 
 # Sonra PostgreSQL özel ayarlarını ekleyin
-if db_config:
+# (DATABASE_URL=sqlite:///... ile testler SQLite üzerinde de çalışabilir)
+if db_config and db_config.get('ENGINE') == 'django.db.backends.postgresql':
     # PostgreSQL options'ı ekliyoruz
     db_config['OPTIONS'] = {
         'connect_timeout': 5,
@@ -196,11 +241,27 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# Session configuration for cart management (OPTIMIZE EDİLDİ - WORKER SYNC)
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Database için zorunlu
-SESSION_CACHE_ALIAS = 'default'
+# Session configuration for cart management
+# Sepet request.session['sepet'] içinde tutulur; ONEP_SEPET_DEPOSU session'ın
+# nerede saklanacağını seçer (bkz. onep/cart_store):
+#   db        -- veritabanı tablosu
+#   onbellek  -- paylaşılan önbellek, DB'ye gecikmeli yazma (varsayılan, paylaşılan önbellek varsa)
+#   cerez     -- imzalı, sıkıştırılmış çerez (sunucuda hiç yazma yok)
+# Yerel LRU katmanı atlanır, çünkü session'lar worker'lar arasında anında tutarlı olmalı.
+ONEP_SEPET_DEPOSU = config(
+    'ONEP_SEPET_DEPOSU', default='db' if ONEP_CACHE_BACKEND == 'locmem' else 'onbellek'
+)
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'onbellek': 'onep.cart_store.cache',
+    'cerez': 'onep.cart_store.cookie',
+}[ONEP_SEPET_DEPOSU]
+SESSION_CACHE_ALIAS = 'shared'
+# Sadece sepet değişikliklerinin DB'ye yazılması bu kadar ertelenir (saniye);
+# ertelenen değişiklikler periyodik 'manage.py flush_cart_sessions' ile yazılır
+ONEP_SEPET_DB_GECIKMESI = config('ONEP_SEPET_DB_GECIKMESI', default=300, cast=int)
 SESSION_COOKIE_AGE = 86400  # 1 gün
-SESSION_SAVE_EVERY_REQUEST = True  # Her istekte session'ı kaydet (WORKER SYNC)
+SESSION_SAVE_EVERY_REQUEST = False  # Session sadece değiştiğinde yazılır
 SESSION_COOKIE_SECURE = not DEBUG  # Production'da True
 SESSION_COOKIE_HTTPONLY = True  # JavaScript erişimine kapalı
 
@@ -11,6 +11,9 @@ python manage.py collectstatic --no-input
 # Run migrations
 python manage.py migrate
 
+# Create the cache table (only used when ONEP_CACHE_BACKEND=db)
+python manage.py createcachetable
+
 # Set up initial data (creates superuser and sample products)
 # First try to load from fixture, if not available create new data
 python manage.py setup_onep --use-fixture
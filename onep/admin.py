@@ -1,28 +1,56 @@
 from django.contrib import admin
-from .models import Urun, Siparis, SiparisKalemi, Yorum
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .daily_sales import satis_ozeti
+from .pagination import TahminiSayimliPaginator
+from .models import Kategori, Urun, Sepet, SepetKalemi, Siparis, SiparisKalemi, Yorum
+
+
+class BuyukTabloAdmin(admin.ModelAdmin):
+    """
+    Büyük tabloların listeleri: filtresiz listede sayım pg_class tahmininden
+    gelir, filtreli listede tüm tablo için ikinci bir COUNT(*) çalışmaz.
+    İlişkili tablolardan sadece listede (ve seçim kutusunun etiketindeki
+    __str__'de) kullanılan kolonlar select_related + only() ile okunur;
+    select_related sayım sorgusuna JOIN eklemez. Değiştirme formlarında büyük
+    tablolara giden FK'ler raw_id_fields ile gösterilir (tüm satırlar
+    <select> içine okunmaz).
+    """
+    paginator = TahminiSayimliPaginator
+    show_full_result_count = False
 
 
 class SiparisKalemiInline(admin.TabularInline):
     """Sipariş kalemleri için inline admin"""
     model = SiparisKalemi
     extra = 0
-    readonly_fields = ('toplam_fiyat',)
-    
-    def toplam_fiyat(self, obj):
-        if obj.adet and obj.birim_fiyat:
-            return f"{obj.adet * obj.birim_fiyat} TL"
-        return "-"
-    toplam_fiyat.short_description = 'Toplam Fiyat'
+    fields = ('urun', 'urun_adi', 'adet', 'birim_fiyat', 'satir_toplami')
+    readonly_fields = ('urun_adi', 'satir_toplami')
+    raw_id_fields = ('urun',)
+
+
+@admin.register(Kategori)
+class KategoriAdmin(admin.ModelAdmin):
+    """Kategori modeli admin yapılandırması"""
+    list_display = ('ad', 'slug', 'ust_kategori', 'sira', 'urun_sayisi', 'stokta_urun_sayisi')
+    list_editable = ('sira',)
+    search_fields = ('ad', 'slug')
+    readonly_fields = ('urun_sayisi', 'stokta_urun_sayisi')
+    prepopulated_fields = {'slug': ('ad',)}
+    list_select_related = ('ust_kategori',)
 
 
 @admin.register(Urun)
-class UrunAdmin(admin.ModelAdmin):
+class UrunAdmin(BuyukTabloAdmin):
     """Ürün modeli admin yapılandırması"""
-    list_display = ('urun_adi', 'kategori', 'fiyat', 'stok_adedi', 'is_stokta', 'olusturulma_tarihi')
+    list_display = ('urun_adi', 'kategori', 'fiyat', 'stok_adedi', 'is_stokta', 'ortalama_puan', 'yorum_sayisi', 'olusturulma_tarihi')
     list_filter = ('kategori', 'olusturulma_tarihi', 'guncellenme_tarihi')
-    search_fields = ('urun_adi', 'aciklama', 'kategori')
+    search_fields = ('urun_adi', 'aciklama', 'kategori__ad')
+    list_select_related = ('kategori',)
     ordering = ('-olusturulma_tarihi',)
-    readonly_fields = ('olusturulma_tarihi', 'guncellenme_tarihi')
+    readonly_fields = ('olusturulma_tarihi', 'guncellenme_tarihi', 'yorum_sayisi', 'ortalama_puan')
     list_per_page = 25
     
     fieldsets = (
@@ -35,6 +63,10 @@ class UrunAdmin(admin.ModelAdmin):
         ('Resim', {
             'fields': ('resim_url',)
         }),
+        ('Değerlendirmeler', {
+            'fields': ('yorum_sayisi', 'ortalama_puan'),
+            'classes': ('collapse',)
+        }),
         ('Tarihler', {
             'fields': ('olusturulma_tarihi', 'guncellenme_tarihi'),
             'classes': ('collapse',)
@@ -45,16 +77,21 @@ class UrunAdmin(admin.ModelAdmin):
         return obj.is_stokta
     is_stokta.boolean = True
     is_stokta.short_description = 'Stokta'
+    
+    def ortalama_puan(self, obj):
+        return obj.ortalama_puan if obj.ortalama_puan is not None else "-"
+    ortalama_puan.short_description = 'Ortalama Puan'
 
 
 @admin.register(Siparis)
-class SiparisAdmin(admin.ModelAdmin):
+class SiparisAdmin(BuyukTabloAdmin):
     """Sipariş modeli admin yapılandırması"""
-    list_display = ('id', 'kullanici', 'siparis_tarihi', 'toplam_tutar', 'durum')
+    list_display = ('id', 'kullanici', 'siparis_tarihi', 'urun_adedi', 'toplam_tutar', 'durum')
     list_filter = ('durum', 'siparis_tarihi')
     search_fields = ('kullanici__username', 'kullanici__email', 'id')
     ordering = ('-siparis_tarihi',)
-    readonly_fields = ('siparis_tarihi',)
+    readonly_fields = ('siparis_tarihi', 'urun_adedi')
+    raw_id_fields = ('kullanici',)
     inlines = [SiparisKalemiInline]
     list_per_page = 25
     
@@ -63,47 +100,106 @@ class SiparisAdmin(admin.ModelAdmin):
             'fields': ('kullanici', 'siparis_tarihi', 'durum')
         }),
         ('Ödeme Bilgileri', {
-            'fields': ('toplam_tutar',)
+            'fields': ('toplam_tutar', 'urun_adedi')
         }),
     )
     
     def get_queryset(self, request):
-        """Sipariş sorgusu optimizasyonu"""
+        """
+        Sipariş sorgusu optimizasyonu: kullanıcıdan sadece kullanıcı adı okunur.
+        Kalemler önceden yüklenmez; değiştirme formunda inline formset onları
+        kendi sorgusuyla okur.
+        """
         qs = super().get_queryset(request)
-        return qs.select_related('kullanici').prefetch_related('kalemler__urun')
+        return qs.select_related('kullanici').only(
+            'id', 'siparis_tarihi', 'toplam_tutar', 'durum', 'urun_adedi', 'kullanici', 'kullanici__username'
+        )
+    
+    def get_urls(self):
+        ozet = path('ozet/', self.admin_site.admin_view(self.satis_ozeti_view), name='onep_siparis_ozet')
+        return [ozet] + super().get_urls()
+    
+    def satis_ozeti_view(self, request):
+        """Günlük satış özeti: sadece GunlukSiparisOzeti / GunlukUrunSatisi okunur"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            gun_sayisi = min(max(int(request.GET.get('gun', 30)), 1), 366)
+        except ValueError:
+            gun_sayisi = 30
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Satış Özeti',
+            'opts': self.model._meta,
+            'gun_sayisi': gun_sayisi,
+            'gun_secenekleri': (7, 30, 90, 365),
+            **satis_ozeti(gun_sayisi),
+        }
+        return TemplateResponse(request, 'admin/onep/siparis/satis_ozeti.html', context)
 
 
 @admin.register(SiparisKalemi)
-class SiparisKalemiAdmin(admin.ModelAdmin):
+class SiparisKalemiAdmin(BuyukTabloAdmin):
     """Sipariş kalemi modeli admin yapılandırması"""
-    list_display = ('siparis_id', 'urun', 'adet', 'birim_fiyat', 'toplam_fiyat_display')
+    list_display = ('siparis_id', 'siparis_tarihi', 'urun_adi', 'adet', 'birim_fiyat', 'toplam_fiyat_display')
     list_filter = ('siparis__durum', 'siparis__siparis_tarihi')
-    search_fields = ('urun__urun_adi', 'siparis__kullanici__username')
+    search_fields = ('urun_adi', 'siparis__kullanici__username')
     ordering = ('-siparis__siparis_tarihi',)
+    raw_id_fields = ('siparis', 'urun')
     list_per_page = 25
     
     def toplam_fiyat_display(self, obj):
-        return f"{obj.toplam_fiyat} TL"
+        return f"{obj.satir_toplami} TL"
     toplam_fiyat_display.short_description = 'Toplam Fiyat'
     
     def siparis_id(self, obj):
-        return f"Sipariş #{obj.siparis.id}"
+        return f"Sipariş #{obj.siparis_id}"
     siparis_id.short_description = 'Sipariş'
     
+    def siparis_tarihi(self, obj):
+        return obj.siparis.siparis_tarihi
+    siparis_tarihi.short_description = 'Sipariş Tarihi'
+    siparis_tarihi.admin_order_field = 'siparis__siparis_tarihi'
+    
     def get_queryset(self, request):
-        """Sipariş kalemi sorgusu optimizasyonu"""
+        """Sipariş kalemi sorgusu optimizasyonu: siparişten sadece tarih okunur"""
         qs = super().get_queryset(request)
-        return qs.select_related('siparis__kullanici', 'urun')
+        return qs.select_related('siparis').only(
+            'id', 'urun', 'adet', 'birim_fiyat', 'urun_adi', 'resim_url', 'satir_toplami',
+            'siparis', 'siparis__siparis_tarihi',
+        )
+
+
+class SepetKalemiInline(admin.TabularInline):
+    """Sepet kalemleri için inline admin"""
+    model = SepetKalemi
+    extra = 0
+    raw_id_fields = ('urun',)
+    readonly_fields = ('eklenme_tarihi',)
+
+
+@admin.register(Sepet)
+class SepetAdmin(BuyukTabloAdmin):
+    """Kalıcı sepet admin yapılandırması"""
+    list_display = ('kullanici', 'guncellenme_tarihi')
+    search_fields = ('kullanici__username', 'kullanici__email')
+    ordering = ('-guncellenme_tarihi',)
+    readonly_fields = ('guncellenme_tarihi',)
+    raw_id_fields = ('kullanici',)
+    inlines = [SepetKalemiInline]
+    list_select_related = ('kullanici',)
+    list_per_page = 25
 
 
 @admin.register(Yorum)
-class YorumAdmin(admin.ModelAdmin):
+class YorumAdmin(BuyukTabloAdmin):
     """Yorum modeli admin yapılandırması"""
     list_display = ('kullanici', 'urun', 'puan', 'tarih', 'yorum_ozeti')
     list_filter = ('puan', 'tarih', 'urun__kategori')
     search_fields = ('kullanici__username', 'urun__urun_adi', 'yorum_metni')
     ordering = ('-tarih',)
     readonly_fields = ('tarih',)
+    raw_id_fields = ('kullanici', 'urun')
     list_per_page = 25
     
     fieldsets = (
@@ -127,9 +223,12 @@ class YorumAdmin(admin.ModelAdmin):
     yorum_ozeti.short_description = 'Yorum Özeti'
     
     def get_queryset(self, request):
-        """Yorum sorgusu optimizasyonu"""
+        """Yorum sorgusu optimizasyonu: kullanıcı ve üründen sadece __str__ kolonları okunur"""
         qs = super().get_queryset(request)
-        return qs.select_related('kullanici', 'urun')
+        return qs.select_related('kullanici', 'urun').only(
+            'id', 'puan', 'yorum_metni', 'tarih',
+            'kullanici', 'kullanici__username', 'urun', 'urun__urun_adi', 'urun__fiyat',
+        )
 
 
 # Admin site başlık ve açıklama ayarları
@@ -0,0 +1,162 @@
+"""
+ONEP Satış Analitiği
+rebuild_sales_analytics komutu iptal edilmemiş siparişlerin kalemlerini
+sipariş sırasıyla parça parça okur (iterator(chunk_size)) ve üç özet tabloyu
+baştan yazar:
+
+  UrunSatisOzeti       -- ürün başına satılan adet, ciro, sipariş sayısı
+  KategoriGunlukSatis  -- gün × kategori adet ve ciro
+  UrunCifti            -- aynı siparişte birlikte geçen ürün çiftleri
+
+Bellek kalem sayısına değil ürün / gün × kategori / çift sayısına bağlıdır.
+Ürün toplamları, ürün id'lerinin yoğun bir indekse eşlendiği array('q')
+dizilerinde tutulur; ciro Decimal yerine kuruş cinsinden tamsayıdır. Çiftler
+iki indeks tek bir tamsayıya paketlenerek sayılır. Akıştaki sadece o anki
+siparişin ürünleri ayrıca tutulur.
+
+Gün, siparis_tarihi'nin yerel saat dilimindeki (TIME_ZONE) tarihidir.
+Kategori ürünün bugünkü kategorisidir. CIFT_SEPET_SINIRI'ndan fazla farklı
+ürün içeren siparişler (toplu alımlar) çift sayımına katılmaz; çift sayısı
+ürün sayısının karesiyle büyür.
+"""
+import time
+from array import array
+from collections import Counter, defaultdict
+from decimal import Decimal
+from itertools import combinations, islice
+
+from django.db import transaction
+from django.db.models.functions import TruncDate
+
+from .models import KategoriGunlukSatis, SiparisKalemi, UrunCifti, UrunSatisOzeti
+
+CIFT_SEPET_SINIRI = 50
+ILERLEME_ARALIGI = 100000
+
+_KURUS = Decimal('0.01')
+
+
+class _UrunDizileri:
+    """Ürün id -> yoğun indeks ve indeks başına adet / kuruş / sipariş sayacı"""
+
+    def __init__(self):
+        self.indeks = {}
+        self.idler = array('q')
+        self.adet = array('q')
+        self.kurus = array('q')
+        self.siparis = array('q')
+
+    def indeks_al(self, urun_id):
+        i = self.indeks.get(urun_id)
+        if i is None:
+            i = self.indeks[urun_id] = len(self.idler)
+            self.idler.append(urun_id)
+            self.adet.append(0)
+            self.kurus.append(0)
+            self.siparis.append(0)
+        return i
+
+
+def _kalem_akisi(chunk_size):
+    return (
+        SiparisKalemi.objects.exclude(siparis__durum='iptal_edildi')
+        .annotate(gun=TruncDate('siparis__siparis_tarihi'))
+        .order_by('siparis_id')
+        .values_list('siparis_id', 'urun_id', 'urun__kategori_id', 'gun', 'adet', 'birim_fiyat')
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _parcalar(nesneler, batch_size):
+    nesneler = iter(nesneler)
+    while parca := list(islice(nesneler, batch_size)):
+        yield parca
+
+
+def satislari_topla(chunk_size=2000, ilerleme=None):
+    """
+    Kalemleri akıtarak toplar; (urunler, kategori_gunleri, ciftler, istatistik)
+    döndürür. ilerleme(satir, sure) her ILERLEME_ARALIGI satırda çağrılır.
+    """
+    urunler = _UrunDizileri()
+    kategori_gunleri = defaultdict(lambda: [0, 0])  # (gun, kategori_id) -> [adet, kurus]
+    ciftler = Counter()  # (i << 32) | j; i küçük ürün id'sinin indeksi
+
+    baslangic = time.monotonic()
+    satir = siparis_sayisi = 0
+    onceki_siparis = None
+    sepet = set()
+
+    def sepeti_kapat():
+        for i in sepet:
+            urunler.siparis[i] += 1
+        if 1 < len(sepet) <= CIFT_SEPET_SINIRI:
+            sirali = sorted(sepet, key=urunler.idler.__getitem__)
+            ciftler.update((i << 32) | j for i, j in combinations(sirali, 2))
+        sepet.clear()
+
+    for siparis_id, urun_id, kategori_id, gun, adet, birim_fiyat in _kalem_akisi(chunk_size):
+        if siparis_id != onceki_siparis:
+            sepeti_kapat()
+            onceki_siparis = siparis_id
+            siparis_sayisi += 1
+
+        kurus = int(birim_fiyat / _KURUS) * adet
+        i = urunler.indeks_al(urun_id)
+        urunler.adet[i] += adet
+        urunler.kurus[i] += kurus
+        toplam = kategori_gunleri[gun, kategori_id]
+        toplam[0] += adet
+        toplam[1] += kurus
+        sepet.add(i)
+
+        satir += 1
+        if ilerleme and satir % ILERLEME_ARALIGI == 0:
+            ilerleme(satir, time.monotonic() - baslangic)
+    sepeti_kapat()
+
+    istatistik = {'satir': satir, 'siparis': siparis_sayisi, 'sure': time.monotonic() - baslangic}
+    return urunler, kategori_gunleri, ciftler, istatistik
+
+
+def _kurustan(kurus):
+    return Decimal(kurus) * _KURUS
+
+
+def satis_analitigini_yeniden_olustur(chunk_size=2000, batch_size=1000, ilerleme=None):
+    """
+    Özet tabloları baştan oluşturur (yazma tek transaction). Toplama
+    istatistiğine yazılan kayıt sayılarını ekleyerek döndürür:
+    {'satir', 'siparis', 'sure', 'urun', 'kategori_gun', 'cift'}.
+    """
+    urunler, kategori_gunleri, ciftler, istatistik = satislari_topla(chunk_size, ilerleme)
+    idler = urunler.idler
+
+    urun_ozetleri = (
+        UrunSatisOzeti(
+            urun_id=idler[i], adet=urunler.adet[i], ciro=_kurustan(urunler.kurus[i]),
+            siparis_sayisi=urunler.siparis[i],
+        )
+        for i in range(len(idler))
+    )
+    gunluk = (
+        KategoriGunlukSatis(gun=gun, kategori_id=kategori_id, adet=adet, ciro=_kurustan(kurus))
+        for (gun, kategori_id), (adet, kurus) in kategori_gunleri.items()
+    )
+    cift_kayitlari = (
+        UrunCifti(urun_id=idler[anahtar >> 32], diger_id=idler[anahtar & 0xFFFFFFFF], siparis_sayisi=sayi)
+        for anahtar, sayi in ciftler.items()
+    )
+
+    with transaction.atomic():
+        for model, nesneler in (
+            (UrunSatisOzeti, urun_ozetleri),
+            (KategoriGunlukSatis, gunluk),
+            (UrunCifti, cift_kayitlari),
+        ):
+            model.objects.all().delete()
+            for parca in _parcalar(nesneler, batch_size):
+                model.objects.bulk_create(parca)
+
+    istatistik.update(urun=len(idler), kategori_gun=len(kategori_gunleri), cift=len(ciftler))
+    return istatistik
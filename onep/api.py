@@ -0,0 +1,218 @@
+"""
+ONEP Katalog JSON API (salt okunur)
+product-filter-ajax.js filtreleme ve sonsuz kaydırma için HTML yerine bu
+uçları kullanır; şablon render edilmez ve aktarılan veri çok daha küçüktür.
+
+    GET /api/products/?arama=&kategori=&min_fiyat=&max_fiyat=&siralama=
+                      &imlec=&limit=&alanlar=id,urun_adi,fiyat&facetler=1
+    GET /api/products/<id>/?alanlar=...
+    GET /api/products/facets/?<liste filtreleri>
+
+Liste yanıtı sütun başlıkları + satır dizileri şeklindedir (alan adları her
+satırda tekrarlanmaz, gzip ile iyi sıkışır):
+
+    {"alanlar": ["id", "urun_adi"], "urunler": [[1, "..."], ...], "sonraki": "<imleç>"}
+
+Sayfalama "sonraki" imleci ile yapılır: pagination.IMLEC_SIRALAMALARI'ndaki
+sıralamalar keyset ile, hesaplanan sıralamalar (alaka, puan_azalan) OFFSET
+ile sayfalanır. "kart" alanı ürünün grid kartını _product_card.html ile
+render edilmiş HTML olarak verir; JS kartı kendisi kurmaz. Yanıtlar
+kullanıcıya özel değildir (kartlardaki CSRF token'ı yer tutucudur, JS kendi
+token'ı ile değiştirir); serileştirilmiş JSON katalog / ürün sürümüne bağlı
+anahtarlarla önbelleğe alınır.
+"""
+import json
+
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.utils.text import Truncator
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
+
+from .caching import CSRF_YER_TUTUCU, katalog_anahtari, onbellek, urun_anahtari
+from .facets import facetleri_getir, filtreleri_ayristir, fiyat_ayristir
+from .models import Urun
+from .pagination import IMLEC_SIRALAMALARI, imlec_destekleniyor, imlec_ile_sayfala, ofset_ile_sayfala
+from .views import urun_listesi_sorgusu
+
+
+def _kart(urun):
+    return render_to_string('_product_card.html', {'urun': urun, 'csrf_token': CSRF_YER_TUTUCU})
+
+
+# alan -> (yüklenecek model alanları, serileştirici)
+API_ALANLARI = {
+    'id': (('id',), lambda u: u.id),
+    'urun_adi': (('urun_adi',), lambda u: u.urun_adi),
+    'aciklama': (('aciklama',), lambda u: u.aciklama),
+    # Grid kartlarındaki kısa açıklama (truncatechars:60 ile aynı)
+    'aciklama_ozeti': (('aciklama',), lambda u: Truncator(u.aciklama).chars(60)),
+    'fiyat': (('fiyat',), lambda u: str(u.fiyat)),
+    'stok_adedi': (('stok_adedi',), lambda u: u.stok_adedi),
+    'kategori': (('kategori__slug',), lambda u: u.kategori.slug if u.kategori_id else None),
+    'kategori_adi': (('kategori__ad',), lambda u: u.kategori.ad if u.kategori_id else None),
+    'resim_url': (('resim_url',), lambda u: u.resim_url),
+    'ortalama_puan': (('yorum_sayisi', 'puan_toplami'), lambda u: u.ortalama_puan),
+    'yorum_sayisi': (('yorum_sayisi',), lambda u: u.yorum_sayisi),
+    'olusturulma_tarihi': (('olusturulma_tarihi',), lambda u: u.olusturulma_tarihi.isoformat()),
+    'puan_dagilimi': (
+        ('yorum_sayisi',) + tuple(f'puan_{puan}_sayisi' for puan in range(1, 6)),
+        lambda u: [satir['sayi'] for satir in u.puan_dagilimi],  # 5'ten 1'e
+    ),
+    'kart': (
+        ('urun_adi', 'aciklama', 'fiyat', 'stok_adedi', 'kategori__slug', 'resim_url',
+         'yorum_sayisi', 'puan_toplami'),
+        _kart,
+    ),
+}
+
+LISTE_VARSAYILAN_ALANLAR = (
+    'id', 'urun_adi', 'fiyat', 'stok_adedi', 'kategori', 'resim_url', 'ortalama_puan', 'yorum_sayisi',
+)
+DETAY_VARSAYILAN_ALANLAR = tuple(alan for alan in API_ALANLARI if alan != 'kart')
+
+VARSAYILAN_LIMIT = 12
+MAKSIMUM_LIMIT = 48
+
+LISTE_ONBELLEK_SURESI = 600  # 10 dakika
+DETAY_ONBELLEK_SURESI = 900  # 15 dakika
+# Yanıtlar kullanıcıya özel değil; tarayıcı/proxy kısa süre saklayabilir
+HTTP_MAX_AGE = 60
+
+
+class ApiHatasi(Exception):
+    """Geçersiz istek parametresi (400)"""
+
+
+def _json(veri):
+    return json.dumps(veri, ensure_ascii=False, separators=(',', ':'))
+
+
+def _yanit(govde, status=200):
+    response = HttpResponse(govde, content_type='application/json', status=status)
+    if status == 200:
+        patch_cache_control(response, public=True, max_age=HTTP_MAX_AGE)
+    return response
+
+
+def _hata(mesaj, status=400):
+    return _yanit(_json({'success': False, 'message': mesaj}), status)
+
+
+def _alanlari_ayristir(params, varsayilan):
+    deger = params.get('alanlar')
+    if not deger:
+        return varsayilan
+    alanlar = tuple(dict.fromkeys(a.strip() for a in deger.split(',') if a.strip()))
+    bilinmeyen = [alan for alan in alanlar if alan not in API_ALANLARI]
+    if bilinmeyen or not alanlar:
+        raise ApiHatasi(f"Bilinmeyen alan: {', '.join(bilinmeyen) or '-'}")
+    return alanlar
+
+
+def _limit(params):
+    try:
+        limit = int(params.get('limit') or VARSAYILAN_LIMIT)
+    except ValueError:
+        raise ApiHatasi('Geçersiz limit')
+    return max(1, min(limit, MAKSIMUM_LIMIT))
+
+
+def _fiyatlari_dogrula(params):
+    """Fiyat filtreleri sessizce yok sayılmaz; geçersiz değer 400 döner"""
+    for ad in ('min_fiyat', 'max_fiyat'):
+        try:
+            fiyat_ayristir(params.get(ad))
+        except ValueError:
+            raise ApiHatasi('Geçersiz fiyat')
+
+
+def _sadece(urunler, alanlar, *ek_alanlar):
+    """Sadece istenen alanların kolonlarını yükle; kategori gerekmiyorsa JOIN yapma"""
+    kolonlar = {'id', *ek_alanlar}
+    for alan in alanlar:
+        kolonlar.update(API_ALANLARI[alan][0])
+    if any(kolon.startswith('kategori__') for kolon in kolonlar):
+        kolonlar.add('kategori')
+        urunler = urunler.select_related('kategori')
+    else:
+        urunler = urunler.select_related(None)
+    return urunler.only(*kolonlar)
+
+
+def _satir(urun, alanlar):
+    return [API_ALANLARI[alan][1](urun) for alan in alanlar]
+
+
+def _liste_govdesi(params):
+    alanlar = _alanlari_ayristir(params, LISTE_VARSAYILAN_ALANLAR)
+    limit = _limit(params)
+    _fiyatlari_dogrula(params)
+    urunler, siralama, filtreler = urun_listesi_sorgusu(params)
+
+    facetler_dahil = params.get('facetler') == '1' and not params.get('imlec')
+    anahtar = katalog_anahtari(
+        'api_urunler', filtreler['arama'], filtreler['kategori'], filtreler['min_fiyat'],
+        filtreler['max_fiyat'], siralama, params.get('imlec', ''), limit, ','.join(alanlar), facetler_dahil,
+    )
+    govde = onbellek.get(anahtar)
+    if govde is None:
+        if imlec_destekleniyor(siralama):
+            siralama_alani = IMLEC_SIRALAMALARI[siralama][0]
+            sayfa = imlec_ile_sayfala(
+                _sadece(urunler, alanlar, siralama_alani), siralama, params.get('imlec'), limit, params
+            )
+        else:
+            sayfa = ofset_ile_sayfala(_sadece(urunler, alanlar), params.get('imlec'), limit, params)
+        veri = {
+            'alanlar': list(alanlar),
+            'urunler': [_satir(urun, alanlar) for urun in sayfa],
+            'sonraki': sayfa.sonraki_imlec,
+        }
+        if facetler_dahil:
+            veri['facetler'] = facetleri_getir(filtreler)
+        govde = _json(veri)
+        onbellek.set(anahtar, govde, LISTE_ONBELLEK_SURESI)
+    return govde
+
+
+@require_GET
+@gzip_page
+def urun_listesi(request):
+    """Ürün listesi: filtreler, alan seçimi ve imleç sayfalama"""
+    try:
+        return _yanit(_liste_govdesi(request.GET))
+    except ApiHatasi as e:
+        return _hata(str(e))
+
+
+@require_GET
+@gzip_page
+def urun_detayi(request, id):
+    """Tek ürün: {"urun": {alan: değer}}"""
+    try:
+        alanlar = _alanlari_ayristir(request.GET, DETAY_VARSAYILAN_ALANLAR)
+    except ApiHatasi as e:
+        return _hata(str(e))
+
+    anahtar = urun_anahtari('api_urun', id, ','.join(alanlar))
+    govde = onbellek.get(anahtar)
+    if govde is None:
+        urun = _sadece(Urun.objects.all(), alanlar).filter(id=id).first()
+        if urun is None:
+            return _hata('Ürün bulunamadı', status=404)
+        govde = _json({'urun': dict(zip(alanlar, _satir(urun, alanlar)))})
+        onbellek.set(anahtar, govde, DETAY_ONBELLEK_SURESI)
+    return _yanit(govde)
+
+
+@require_GET
+@gzip_page
+def facetler(request):
+    """Liste filtreleri için facet sayıları (bkz. onep/facets.py)"""
+    try:
+        _fiyatlari_dogrula(request.GET)
+    except ApiHatasi as e:
+        return _hata(str(e))
+    return _yanit(_json(facetleri_getir(filtreleri_ayristir(request.GET))))
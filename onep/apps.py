@@ -5,3 +5,7 @@ class OnepConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'onep'
     verbose_name = 'ONEP E-Ticaret Platformu'
+
+    def ready(self):
+        # Sinyal alıcılarını kaydet
+        from . import signals  # noqa: F401
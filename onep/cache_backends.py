@@ -0,0 +1,170 @@
+"""
+ONEP İki Katmanlı Önbellek
+Her gunicorn worker'ında küçük bir süreç içi LRU, arkasında tüm worker'ların
+paylaştığı bir önbellek (dosya, veritabanı tablosu veya Redis) bulunur:
+
+    CACHES = {
+        'shared': {...},                       # paylaşılan katman
+        'default': {
+            'BACKEND': 'onep.cache_backends.IkiKatmanliCache',
+            'LOCATION': 'shared',              # paylaşılan katmanın alias'ı
+            'OPTIONS': {'YEREL_MAX_ENTRIES': 500, 'YEREL_TIMEOUT': 30},
+        },
+    }
+
+Okumalar önce yerel katmana bakar, bulunamazsa paylaşılan katmandan okunup
+yerel katmana kısa bir süreyle (YEREL_TIMEOUT) yazılır. Yazma ve silme her iki
+katmana uygulanır. Sürümlü anahtarların içeriği değişmediği için yerel katmanda
+güvenle tutulur; sürüm ve istatistik sayaçları gibi değişken anahtarlar (YEREL_HARIC_ONEKLER)
+yerel katmanı atlar, böylece bir worker'daki geçersiz kılma diğerlerine anında
+ulaşır.
+"""
+import pickle
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class IkiKatmanliCache(BaseCache):
+    """Süreç içi LRU + paylaşılan önbellek"""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._paylasilan_alias = location
+        self._yerel_max = int(options.get('YEREL_MAX_ENTRIES', 500))
+        self._yerel_timeout = float(options.get('YEREL_TIMEOUT', 30))
+        self._haric_onekler = tuple(options.get('YEREL_HARIC_ONEKLER', ('surum:', 'sayac:')))
+        self._yerel = OrderedDict()
+        self._kilit = Lock()
+
+    @property
+    def paylasilan(self):
+        return caches[self._paylasilan_alias]
+
+    # --- yerel katman -------------------------------------------------------
+
+    def _yerel_kullanilir(self, key):
+        return not str(key).startswith(self._haric_onekler)
+
+    def _yerel_oku(self, anahtar):
+        with self._kilit:
+            kayit = self._yerel.get(anahtar)
+            if kayit is None:
+                return None
+            bitis, veri = kayit
+            if bitis <= time.monotonic():
+                del self._yerel[anahtar]
+                return None
+            self._yerel.move_to_end(anahtar)
+        return veri
+
+    def _yerel_yaz(self, anahtar, value, timeout=DEFAULT_TIMEOUT):
+        sure = self._yerel_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            sure = min(sure, timeout)
+        if sure <= 0:
+            self._yerel_sil(anahtar)
+            return
+        # LocMemCache gibi kopya saklanır; çağıranın nesneyi değiştirmesi önbelleği bozmaz
+        veri = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._kilit:
+            self._yerel[anahtar] = (time.monotonic() + sure, veri)
+            self._yerel.move_to_end(anahtar)
+            while len(self._yerel) > self._yerel_max:
+                self._yerel.popitem(last=False)
+
+    def _yerel_sil(self, anahtar):
+        with self._kilit:
+            self._yerel.pop(anahtar, None)
+
+    # --- cache API ----------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        if self._yerel_kullanilir(key):
+            anahtar = self.make_and_validate_key(key, version=version)
+            veri = self._yerel_oku(anahtar)
+            if veri is not None:
+                return pickle.loads(veri)
+
+        sentinel = object()
+        value = self.paylasilan.get(key, sentinel, version=version)
+        if value is sentinel:
+            return default
+        if self._yerel_kullanilir(key):
+            self._yerel_yaz(anahtar, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        sonuc = {}
+        eksik = []
+        for key in keys:
+            if self._yerel_kullanilir(key):
+                veri = self._yerel_oku(self.make_and_validate_key(key, version=version))
+                if veri is not None:
+                    sonuc[key] = pickle.loads(veri)
+                    continue
+            eksik.append(key)
+
+        if eksik:
+            # Paylaşılan katmana tek istek
+            bulunan = self.paylasilan.get_many(eksik, version=version)
+            for key, value in bulunan.items():
+                if self._yerel_kullanilir(key):
+                    self._yerel_yaz(self.make_and_validate_key(key, version=version), value)
+            sonuc.update(bulunan)
+        return sonuc
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.paylasilan.set(key, value, timeout, version=version)
+        if self._yerel_kullanilir(key):
+            self._yerel_yaz(self.make_and_validate_key(key, version=version), value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        basarisiz = self.paylasilan.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in basarisiz and self._yerel_kullanilir(key):
+                self._yerel_yaz(self.make_and_validate_key(key, version=version), value, timeout)
+        return basarisiz
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        eklendi = self.paylasilan.add(key, value, timeout, version=version)
+        if eklendi and self._yerel_kullanilir(key):
+            self._yerel_yaz(self.make_and_validate_key(key, version=version), value, timeout)
+        return eklendi
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.paylasilan.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._yerel_sil(self.make_and_validate_key(key, version=version))
+        return self.paylasilan.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._yerel_sil(self.make_and_validate_key(key, version=version))
+        self.paylasilan.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        if self._yerel_kullanilir(key):
+            if self._yerel_oku(self.make_and_validate_key(key, version=version)) is not None:
+                return True
+        return self.paylasilan.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        # Sayaçlar paylaşılan katmanda atomik olarak artırılır
+        self._yerel_sil(self.make_and_validate_key(key, version=version))
+        return self.paylasilan.incr(key, delta, version=version)
+
+    def clear(self):
+        with self._kilit:
+            self._yerel.clear()
+        self.paylasilan.clear()
+
+    def yerel_temizle(self):
+        """Sadece bu süreçteki yerel katmanı boşaltır"""
+        with self._kilit:
+            self._yerel.clear()
@@ -0,0 +1,146 @@
+"""
+ONEP Sürümlü Önbellek Anahtarları
+Joker karakterli silme yerine sürüm (generation) sayaçları kullanılır:
+
+    - katalog sürümü: herhangi bir ürün/yorum değiştiğinde artar; listeleme,
+      kategori ve benzer ürün önbellekleri bu sürümü anahtara katar
+    - ürün sürümü: sadece ilgili ürün veya yorumları değiştiğinde artar
+
+Sürüm artınca eski anahtarlar bir daha okunmaz ve zaman aşımıyla düşer, yani
+geçersiz kılma O(1)'dir. Katalog sürümünün yanında son değişiklik zamanı da
+saklanır; ETag/Last-Modified doğrulayıcıları bu ikisinden üretilir (bkz.
+onep/conditional.py). Sürüm anahtarları süresiz saklanır; silinmiş bir
+sayaç zamana dayalı yeni bir değerle başlar, eski girdilerle çakışmaz.
+
+Kullanılan önbellek settings.ONEP_KATALOG_CACHE ile seçilir. İki katmanlı
+önbellekte 'surum:' önekli sayaçlar yerel katmanı atlar, böylece sürümler tüm
+worker'larda aynıdır.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import transaction
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.connection import ConnectionProxy
+from django.utils.safestring import mark_safe
+
+# Katalog önbelleği (views ve sürüm sayaçları)
+onbellek = ConnectionProxy(caches, getattr(settings, 'ONEP_KATALOG_CACHE', DEFAULT_CACHE_ALIAS))
+
+KATALOG_SURUM_ANAHTARI = 'surum:katalog'
+KATALOG_ZAMAN_ANAHTARI = 'surum:katalog:zaman'
+
+# onbellekli_parca bir parçayı yeniden render ettiğinde isteğe işaret koyar
+# (hit/miss sayaçları için, bkz. onep/conditional.py)
+ISTEK_PARCA_KACIRMA = '_onep_parca_kacirma'
+
+# Önbelleğe yazılan parçalarda {% csrf_token %} bu değerle render edilir ve
+# her istekte kullanıcının kendi token'ı ile değiştirilir
+CSRF_YER_TUTUCU = 'onep-csrf-yer-tutucu'
+
+
+def _urun_surum_anahtari(urun_id):
+    return f'surum:urun:{urun_id}'
+
+
+def _yeni_surum():
+    return int(time.time() * 1000)
+
+
+def _surum_oku(anahtar):
+    return _surum_oku_veya_baslat(anahtar, _yeni_surum)
+
+
+def _surum_oku_veya_baslat(anahtar, baslangic):
+    surum = onbellek.get(anahtar)
+    if surum is None:
+        onbellek.add(anahtar, baslangic(), None)
+        surum = onbellek.get(anahtar)
+    return surum
+
+
+def _surum_artir(anahtar):
+    try:
+        onbellek.incr(anahtar)
+    except ValueError:
+        # Sayaç yok (ilk kullanım veya önbellekten düşmüş)
+        onbellek.set(anahtar, _yeni_surum(), None)
+
+
+def katalog_surumu():
+    """Güncel katalog sürümü"""
+    return _surum_oku(KATALOG_SURUM_ANAHTARI)
+
+
+def katalog_degisim_zamani():
+    """
+    Katalog sürümünün son artırıldığı an (UTC, saniye hassasiyetinde).
+    Sayaç önbellekten düşmüşse şimdiki zaman ile başlar - doğrulayıcı ilerler,
+    hiçbir zaman eski bir sayfa için 304 dönülmez.
+    """
+    zaman = _surum_oku_veya_baslat(KATALOG_ZAMAN_ANAHTARI, lambda: int(time.time()))
+    return datetime.fromtimestamp(zaman, tz=timezone.utc)
+
+
+def urun_surumu(urun_id):
+    """Tek bir ürünün güncel sürümü"""
+    return _surum_oku(_urun_surum_anahtari(urun_id))
+
+
+def katalog_anahtari(ad, *parcalar):
+    """Katalog sürümüne bağlı önbellek anahtarı"""
+    return _anahtar(ad, f'k{katalog_surumu()}', *parcalar)
+
+
+def urun_anahtari(ad, urun_id, *parcalar):
+    """Ürün ve katalog sürümüne bağlı önbellek anahtarı"""
+    return _anahtar(ad, urun_id, f'u{urun_surumu(urun_id)}', f'k{katalog_surumu()}', *parcalar)
+
+
+def _anahtar(ad, *parcalar):
+    # Uzun/özel karakterli parçalar (sorgu dizeleri) memcached uyumlu olsun diye özetlenir
+    ozet = hashlib.md5(':'.join(str(p) for p in parcalar).encode('utf-8')).hexdigest()
+    return f'{ad}:{ozet}'
+
+
+def urunleri_gecersiz_kil(urun_idleri):
+    """
+    Verilen ürünlerin ve katalogun sürümünü artırır.
+    Hemen artırılır (bu transaction'daki sonraki okumalar için) ve commit
+    sonrasında tekrar artırılır (commit'ten önce eski veriyi önbelleğe yazmış
+    eşzamanlı isteklere karşı).
+    """
+    urun_idleri = list(urun_idleri)
+
+    def _artir():
+        for urun_id in urun_idleri:
+            _surum_artir(_urun_surum_anahtari(urun_id))
+        _surum_artir(KATALOG_SURUM_ANAHTARI)
+        onbellek.set(KATALOG_ZAMAN_ANAHTARI, int(time.time()), None)
+
+    _artir()
+    transaction.on_commit(_artir)
+
+
+def onbellekli_parca(request, anahtar, sablon, context_uretici, sure):
+    """
+    Bir şablon parçasını HTML olarak önbelleğe alır ve güvenli (safe) döndürür.
+    context_uretici sadece önbellekte yokken çağrılır, böylece sorgular da
+    atlanır. Parça request olmadan render edilir: context processor'lar
+    (sepet, kullanıcı, mesajlar) parçaya girmez, CSRF token'ı yer tutucu ile
+    saklanıp her istekte yenisiyle değiştirilir.
+    """
+    html = onbellek.get(anahtar)
+    if html is None:
+        setattr(request, ISTEK_PARCA_KACIRMA, True)
+        context = context_uretici()
+        context['csrf_token'] = CSRF_YER_TUTUCU
+        html = render_to_string(sablon, context)
+        onbellek.set(anahtar, html, sure)
+    if CSRF_YER_TUTUCU in html:
+        html = html.replace(CSRF_YER_TUTUCU, get_token(request))
+    return mark_safe(html)
@@ -0,0 +1,259 @@
+"""
+ONEP Sepet Fiyatlandırma Servisi
+Session sepetindeki ({'urun_id': miktar}) tüm ürünleri tek bir in_bulk sorgusu
+ile yükler; ara toplam, KDV ve genel toplamı hesaplar.
+
+Yüklenen ürünler istek (request) üzerinde saklanır, böylece aynı istek içinde
+sepet birden fazla kez fiyatlandırılsa da veritabanına tekrar gidilmez.
+
+Sepet session'a sepeti_kaydet() ile yazılır; toplam adet 'sepet_adedi'
+anahtarında birlikte tutulur, böylece sepet rozeti her sayfada sepeti toplamaz.
+Giriş yapmış kullanıcılarda sepet ayrıca Sepet/SepetKalemi tablolarına
+yazılır (sadece değişen kalemler); girişte anonim sepet kalıcı sepetle
+birleştirilir.
+
+Toplu sepet işlemleri (sepete_toplu_uygula) birden fazla ekleme/güncelleme/
+silme işlemini tek stok sorgusu ile doğrular ve hep birlikte uygular.
+"""
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .models import Sepet, SepetKalemi, Urun
+
+KDV_ORANI = Decimal('0.18')
+
+_ISTEK_URUN_ONBELLEGI = '_onep_sepet_urunleri'
+
+
+def sepeti_kaydet(request, sepet, kalici=True):
+    """
+    Sepeti ve toplam adedini session'a yazar. Kullanıcı giriş yapmışsa
+    (kalici=True iken) kalıcı sepeti de günceller.
+    """
+    request.session['sepet'] = sepet
+    request.session['sepet_adedi'] = sum(sepet.values())
+    if kalici and request.user.is_authenticated:
+        kalici_sepeti_kaydet(request.user, sepet)
+
+
+def sepet_adedi(session):
+    """Sepetteki toplam ürün adedi (sepet_adedi yoksa sepetten hesaplanır)"""
+    adet = session.get('sepet_adedi')
+    if adet is None:
+        adet = sum(session.get('sepet', {}).values())
+    return adet
+
+
+def kalici_sepeti_yukle(kullanici):
+    """Kullanıcının kalıcı sepeti, session biçiminde: {'urun_id': adet}"""
+    return {
+        str(urun_id): adet
+        for urun_id, adet in SepetKalemi.objects.filter(sepet__kullanici=kullanici).values_list('urun_id', 'adet')
+    }
+
+
+def kalici_sepeti_kaydet(kullanici, sepet):
+    """
+    Kullanıcının kalıcı sepetini sepet sözlüğüyle eşitler ve Sepet kaydını
+    döndürür. Sadece farklar yazılır: çıkarılan kalemler tek DELETE, eklenen
+    veya adedi değişen kalemler tek INSERT ... ON CONFLICT DO UPDATE ile.
+    Silinmiş ürünler atlanır.
+    """
+    kayit, _ = Sepet.objects.get_or_create(kullanici=kullanici)
+    istenen = {int(urun_id): adet for urun_id, adet in sepet.items() if adet > 0}
+    mevcut = dict(kayit.kalemler.values_list('urun_id', 'adet'))
+
+    silinecek = mevcut.keys() - istenen.keys()
+    yazilacak = {urun_id: adet for urun_id, adet in istenen.items() if mevcut.get(urun_id) != adet}
+    if silinecek:
+        kayit.kalemler.filter(urun_id__in=silinecek).delete()
+    if yazilacak:
+        gecerli = Urun.objects.filter(id__in=yazilacak).values_list('id', flat=True)
+        SepetKalemi.objects.bulk_create(
+            [SepetKalemi(sepet=kayit, urun_id=urun_id, adet=yazilacak[urun_id]) for urun_id in sorted(gecerli)],
+            update_conflicts=True,
+            unique_fields=['sepet', 'urun'],
+            update_fields=['adet'],
+        )
+    if silinecek or yazilacak:
+        Sepet.objects.filter(pk=kayit.pk).update(guncellenme_tarihi=timezone.now())
+    return kayit
+
+
+def giriste_sepetleri_birlestir(request, anonim_sepet):
+    """
+    login() sonrasında çağrılır: girişten önceki (anonim) session sepeti
+    kullanıcının kalıcı sepetiyle birleştirilir. Her iki sepette bulunan
+    ürünlerde büyük adet alınır; aynı sepet iki kez toplanmaz.
+    """
+    kalici = kalici_sepeti_yukle(request.user)
+    birlesik = dict(kalici)
+    for urun_id, adet in anonim_sepet.items():
+        birlesik[urun_id] = max(adet, birlesik.get(urun_id, 0))
+    if birlesik != kalici:
+        kalici_sepeti_kaydet(request.user, birlesik)
+    sepeti_kaydet(request, birlesik, kalici=False)
+
+
+def sepet_urunlerini_yukle(urun_idleri, request=None):
+    """
+    Verilen id'lere sahip ürünleri {id: Urun} olarak döndürür.
+    request verilirse bu istekte daha önce yüklenmiş ürünler tekrar sorgulanmaz.
+    """
+    urun_idleri = {int(urun_id) for urun_id in urun_idleri}
+    onbellek = getattr(request, _ISTEK_URUN_ONBELLEGI, None) if request is not None else None
+    if onbellek is None:
+        onbellek = {}
+        if request is not None:
+            setattr(request, _ISTEK_URUN_ONBELLEGI, onbellek)
+
+    eksik = urun_idleri - onbellek.keys()
+    if eksik:
+        yuklenen = Urun.objects.select_related('kategori').in_bulk(eksik)
+        for urun_id in eksik:
+            # Bulunamayan ürünler de None olarak işaretlenir, tekrar sorgulanmaz
+            onbellek[urun_id] = yuklenen.get(urun_id)
+
+    return {urun_id: onbellek[urun_id] for urun_id in urun_idleri if onbellek[urun_id] is not None}
+
+
+def sepet_onbellegini_temizle(request, urun_idleri=None):
+    """Stok/fiyat değişen ürünlerin istek içi kopyalarını unut"""
+    onbellek = getattr(request, _ISTEK_URUN_ONBELLEGI, None)
+    if onbellek is None:
+        return
+    if urun_idleri is None:
+        onbellek.clear()
+    else:
+        for urun_id in urun_idleri:
+            onbellek.pop(int(urun_id), None)
+
+
+def sepeti_fiyatlandir(sepet, request=None):
+    """
+    Sepeti fiyatlandırır. Dönen sözlük:
+        kalemler           -- [{'urun', 'miktar', 'birim_fiyat', 'ara_toplam', 'resim_url'}]
+        eksik_urun_idleri  -- veritabanında bulunamayan sepet anahtarları
+        toplam_tutar, kdv_tutari, genel_toplam (Decimal), toplam_adet (int)
+    """
+    urunler = sepet_urunlerini_yukle(sepet.keys(), request)
+
+    kalemler = []
+    eksik_urun_idleri = []
+    toplam_tutar = Decimal('0.00')
+    toplam_adet = 0
+
+    for urun_id, miktar in sepet.items():
+        urun = urunler.get(int(urun_id))
+        if urun is None:
+            eksik_urun_idleri.append(urun_id)
+            continue
+
+        ara_toplam = urun.fiyat * miktar
+        toplam_tutar += ara_toplam
+        toplam_adet += miktar
+        kalemler.append({
+            'urun': urun,
+            'miktar': miktar,
+            'birim_fiyat': urun.fiyat,
+            'ara_toplam': ara_toplam,
+            'resim_url': urun.resim_url or None,
+        })
+
+    kdv_tutari = (toplam_tutar * KDV_ORANI).quantize(Decimal('0.01'))
+    genel_toplam = (toplam_tutar + kdv_tutari).quantize(Decimal('0.01'))
+
+    return {
+        'kalemler': kalemler,
+        'eksik_urun_idleri': eksik_urun_idleri,
+        'toplam_tutar': toplam_tutar,
+        'kdv_tutari': kdv_tutari,
+        'genel_toplam': genel_toplam,
+        'toplam_adet': toplam_adet,
+    }
+
+
+# --- toplu sepet işlemleri --------------------------------------------------
+
+SEPET_ISLEMLERI = ('set', 'add', 'remove')
+MAKSIMUM_ISLEM_SAYISI = 100
+
+
+class SepetIslemHatasi(Exception):
+    """
+    Toplu sepet işlemlerinden biri veya daha fazlası geçersiz; sepet değişmez.
+    hatalar: [{'urun_id', 'message'}]
+    """
+
+    def __init__(self, hatalar):
+        self.hatalar = hatalar
+        super().__init__('; '.join(hata['message'] for hata in hatalar))
+
+
+def _islemleri_ayristir(islemler):
+    if not isinstance(islemler, list) or not islemler or len(islemler) > MAKSIMUM_ISLEM_SAYISI:
+        raise SepetIslemHatasi([{'urun_id': None, 'message': 'Geçersiz işlem listesi!'}])
+
+    ayristirilmis = []
+    for islem in islemler:
+        try:
+            urun_id = int(islem['urun_id'])
+            tur = islem['islem']
+            miktar = int(islem.get('miktar', 1 if tur == 'add' else 0))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise SepetIslemHatasi([{'urun_id': None, 'message': 'Geçersiz işlem!'}])
+        if tur not in SEPET_ISLEMLERI or (tur == 'set' and miktar < 0):
+            raise SepetIslemHatasi([{'urun_id': urun_id, 'message': 'Geçersiz işlem!'}])
+        ayristirilmis.append((urun_id, tur, miktar))
+    return ayristirilmis
+
+
+def sepete_toplu_uygula(sepet, islemler, request=None):
+    """
+    İşlemleri ({'urun_id', 'islem': set|add|remove, 'miktar'}) sırayla sepetin
+    bir kopyasına uygular ve yeni sepeti döndürür. 'add' miktarı negatif
+    olabilir (azaltma); miktarı sıfıra inen ürünler sepetten çıkar.
+
+    Sepetteki ve işlemlerdeki tüm ürünler tek sorguda yüklenir (aynı istekteki
+    fiyatlandırma da bu kopyaları kullanır). Değişen kalemlerden biri stoğu
+    aşıyorsa veya ürün bulunamazsa hiçbir işlem uygulanmaz ve
+    SepetIslemHatasi fırlatılır. Silinmiş ürünler sepetten temizlenir.
+    """
+    ayristirilmis = _islemleri_ayristir(islemler)
+
+    miktarlar = {int(urun_id): miktar for urun_id, miktar in sepet.items()}
+    degisen = set()
+    for urun_id, tur, miktar in ayristirilmis:
+        if tur == 'set':
+            miktarlar[urun_id] = miktar
+        elif tur == 'add':
+            miktarlar[urun_id] = miktarlar.get(urun_id, 0) + miktar
+        else:
+            miktarlar[urun_id] = 0
+        degisen.add(urun_id)
+
+    urunler = sepet_urunlerini_yukle(miktarlar.keys(), request)
+
+    hatalar = []
+    for urun_id in sorted(degisen):
+        miktar = miktarlar[urun_id]
+        if miktar <= 0:
+            continue
+        urun = urunler.get(urun_id)
+        if urun is None:
+            hatalar.append({'urun_id': urun_id, 'message': 'Ürün bulunamadı!'})
+        elif miktar > urun.stok_adedi:
+            mesaj = (
+                f'{urun.urun_adi} stokta bulunmuyor!' if urun.stok_adedi <= 0
+                else f'{urun.urun_adi} için stokta sadece {urun.stok_adedi} adet var!'
+            )
+            hatalar.append({'urun_id': urun_id, 'message': mesaj})
+    if hatalar:
+        raise SepetIslemHatasi(hatalar)
+
+    # Sepet sırası korunur, yeni ürünler sona eklenir
+    return {
+        str(urun_id): miktar for urun_id, miktar in miktarlar.items()
+        if miktar > 0 and urun_id in urunler
+    }
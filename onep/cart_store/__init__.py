@@ -0,0 +1,14 @@
+"""
+ONEP Sepet Deposu
+Sepet request.session['sepet'] içinde tutulur; bu paket session'ı (dolayısıyla
+sepeti) veritabanı dışında saklayan iki SESSION_ENGINE sağlar. Görünümler ve
+cart_context session API'sini kullanmaya devam eder.
+
+    ONEP_SEPET_DEPOSU=db        django.contrib.sessions.backends.db
+    ONEP_SEPET_DEPOSU=cerez     onep.cart_store.cookie -- imzalı, sıkıştırılmış çerez
+    ONEP_SEPET_DEPOSU=onbellek  onep.cart_store.cache  -- paylaşılan önbellek, DB'ye gecikmeli yazma
+
+SESSION_SAVE_EVERY_REQUEST kapalıdır: session sadece içeriği değiştiğinde
+(ör. request.session['sepet'] = ... atandığında) yazılır, katalog gezinmesi
+hiçbir depoya yazmaz.
+"""
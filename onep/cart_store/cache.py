@@ -0,0 +1,176 @@
+"""
+Önbellek session deposu (DB'ye gecikmeli yazma)
+Session her değişiklikte paylaşılan önbelleğe (SESSION_CACHE_ALIAS) yazılır.
+Veritabanı kopyası sadece kalıcılık içindir ve şu durumlarda güncellenir:
+
+  * session ilk kez oluşturulduğunda,
+  * sepet dışındaki bir anahtar değiştiğinde (ör. giriş/çıkış bilgileri),
+  * son DB yazmasının üzerinden ONEP_SEPET_DB_GECIKMESI saniye geçtiğinde,
+  * flush_cart_sessions komutu çalıştığında.
+
+Böylece art arda sepet işlemleri tek bir DB yazmasına iner. DB'ye yazılmamış
+değişikliği olan session, ilk ertelenen kaydında önbellekteki bir "kirli
+session" günlüğüne eklenir; flush_cart_sessions (periyodik olarak, ör.
+ONEP_SEPET_DB_GECIKMESI aralığıyla çalıştırılır) günlükteki session'ları
+DB'ye yazar. Önbellek kaydı kaybolursa (tahliye, yeniden başlatma) session
+DB'den okunur: kaybolan sepet değişiklikleri son flush_cart_sessions
+çalışmasından sonrakilerle sınırlıdır. Günlük de önbellekte tutulduğu için
+önbelleğin tamamı düşerse henüz yazılmamış değişiklikler kaybolur.
+"""
+import hashlib
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+
+logger = logging.getLogger('django.contrib.sessions')
+
+# DB'ye yazılmasının ertelenebileceği anahtarlar
+GECIKMELI_ANAHTARLAR = frozenset({'sepet', 'sepet_adedi'})
+
+# Kirli session günlüğü: sayaç her yeni girdide artar, girdi sayacın
+# değeriyle saklanır; flush_cart_sessions işlediği son değeri hatırlar
+KIRLI_SAYAC_ANAHTARI = 'onep.cart_store.kirli'
+KIRLI_ISLENEN_ANAHTARI = 'onep.cart_store.kirli:islenen'
+
+
+def _db_gecikmesi():
+    return getattr(settings, 'ONEP_SEPET_DB_GECIKMESI', 300)
+
+
+def _kirli_anahtari(sira):
+    return f'{KIRLI_SAYAC_ANAHTARI}:{sira}'
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = 'onep.cart_store.cache'
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # DB'deki kopyanın kalıcı kısmının özeti ve yazılma zamanı
+        self._db_ozeti = None
+        self._db_zamani = 0.0
+        # DB'ye yazılmamış değişiklik var ve session kirli günlüğünde
+        self._kirli = False
+
+    @staticmethod
+    def _kalici_ozet(veri):
+        kalici = {anahtar: deger for anahtar, deger in veri.items() if anahtar not in GECIKMELI_ANAHTARLAR}
+        return hashlib.md5(json.dumps(kalici, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _onbellege_yaz(self, veri, expiry=None):
+        # load() sırasında expiry DB satırından verilir: get_expiry_age()
+        # session'ı okumaya kalkarsa load() tekrar çağrılır
+        sure = self.get_expiry_age(expiry=expiry) if expiry is not None else self.get_expiry_age()
+        try:
+            self._cache.set(
+                self.cache_key,
+                {'veri': veri, 'db_ozeti': self._db_ozeti, 'db_zamani': self._db_zamani, 'kirli': self._kirli},
+                sure,
+            )
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+
+    def load(self):
+        try:
+            kayit = self._cache.get(self.cache_key)
+        except Exception:
+            kayit = None
+
+        if kayit is not None:
+            self._db_ozeti, self._db_zamani = kayit['db_ozeti'], kayit['db_zamani']
+            self._kirli = kayit.get('kirli', False)
+            return kayit['veri']
+
+        s = self._get_session_from_db()
+        if not s:
+            return {}
+        veri = self.decode(s.session_data)
+        self._db_ozeti, self._db_zamani = self._kalici_ozet(veri), time.time()
+        self._onbellege_yaz(veri, s.expire_date)
+        return veri
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        veri = self._get_session(no_load=must_create)
+        ozet = self._kalici_ozet(veri)
+        simdi = time.time()
+        if must_create or ozet != self._db_ozeti or simdi - self._db_zamani >= _db_gecikmesi():
+            # DB ve önbellek birlikte güncellenir
+            DBStore.save(self, must_create)
+            self._db_ozeti, self._db_zamani, self._kirli = ozet, simdi, False
+        elif not self._kirli:
+            self._kirli_isaretle()
+        self._onbellege_yaz(veri)
+
+    def _kirli_isaretle(self):
+        """Session'ı kirli günlüğüne ekler (DB'ye yazma anına kadar bir kez)"""
+        try:
+            self._cache.add(KIRLI_SAYAC_ANAHTARI, 0, None)
+            sira = self._cache.incr(KIRLI_SAYAC_ANAHTARI)
+            self._cache.set(_kirli_anahtari(sira), self.session_key, self.get_expiry_age())
+            self._kirli = True
+        except Exception:
+            logger.exception("Error marking session dirty (%s)", self._cache)
+
+    def _kirliyse_db_ye_yaz(self):
+        """
+        Önbellekteki kirli kopyayı DB'ye yazar. Yazma sırasında session tekrar
+        değiştiyse kirli kalır ve günlüğe yeniden eklenir.
+        """
+        kayit = self._cache.get(self.cache_key)
+        if not kayit or not kayit.get('kirli'):
+            return False
+        self._session_cache = kayit['veri']
+        try:
+            DBStore.save(self)
+        except UpdateError:
+            # Session DB'den silinmiş (çıkış, süresi dolmuş)
+            return False
+
+        self._db_ozeti, self._db_zamani, self._kirli = self._kalici_ozet(kayit['veri']), time.time(), False
+        guncel = self._cache.get(self.cache_key)
+        if guncel is None:
+            return True
+        if guncel['veri'] == kayit['veri']:
+            self._onbellege_yaz(kayit['veri'])
+        else:
+            self._kirli_isaretle()
+            self._session_cache = guncel['veri']
+            self._onbellege_yaz(guncel['veri'])
+        return True
+
+    @classmethod
+    def bekleyenleri_db_ye_yaz(cls):
+        """
+        Kirli günlüğündeki session'ları DB'ye yazar (bkz. flush_cart_sessions).
+        Yazılan session sayısını döndürür.
+        """
+        onbellek = caches[settings.SESSION_CACHE_ALIAS]
+        son = onbellek.get(KIRLI_SAYAC_ANAHTARI, 0)
+        islenen = onbellek.get(KIRLI_ISLENEN_ANAHTARI, 0)
+        if islenen > son:
+            # Sayaç önbellekten düşüp yeniden başlamış
+            islenen = 0
+
+        yazilan = 0
+        for baslangic in range(islenen + 1, son + 1, 500):
+            anahtarlar = [_kirli_anahtari(sira) for sira in range(baslangic, min(baslangic + 500, son + 1))]
+            for session_key in set(onbellek.get_many(anahtarlar).values()):
+                yazilan += cls(session_key)._kirliyse_db_ye_yaz()
+            onbellek.delete_many(anahtarlar)
+        onbellek.set(KIRLI_ISLENEN_ANAHTARI, son, None)
+        return yazilan
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
@@ -0,0 +1,38 @@
+"""
+İmzalı çerez session deposu
+Tüm session istemcideki çerezde, SECRET_KEY ile imzalanmış ve sıkıştırılmış
+olarak tutulur; sunucu tarafında okuma/yazma yapılmaz. Sepet çerezde
+"urun_id:adet,urun_id:adet" şeklinde saklanarak çerez boyutu küçültülür.
+
+Çerez tarayıcı sınırı (~4 KB) nedeniyle sadece küçük session'lar için
+uygundur; oturum sunucu tarafında sonlandırılamaz (bkz. Django
+signed_cookies belgeleri).
+"""
+from django.contrib.sessions.backends import signed_cookies
+from django.core.signing import JSONSerializer
+
+
+class SepetSerializer(JSONSerializer):
+    """Sepet sözlüğünü çerezde kısa metin olarak saklayan JSON serializer"""
+
+    def dumps(self, obj):
+        sepet = obj.get('sepet')
+        if isinstance(sepet, dict):
+            obj = {**obj, 'sepet': ','.join(f'{urun_id}:{adet}' for urun_id, adet in sepet.items())}
+        return super().dumps(obj)
+
+    def loads(self, data):
+        obj = super().loads(data)
+        sepet = obj.get('sepet')
+        if isinstance(sepet, str):
+            obj['sepet'] = {
+                urun_id: int(adet)
+                for urun_id, adet in (kalem.split(':') for kalem in sepet.split(',') if kalem)
+            }
+        return obj
+
+
+class SessionStore(signed_cookies.SessionStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self.serializer = SepetSerializer
@@ -0,0 +1,119 @@
+"""
+ONEP Kategori Ağacı ve Ürün Sayıları
+Kategori.urun_sayisi / stokta_urun_sayisi alanları ürün kaydedildiğinde,
+silindiğinde ve checkout'ta stok tükendiğinde F() ile artımlı güncellenir.
+
+Kenar çubuğu ve kategori filtresi ürün tablosunu taramaz; Kategori
+tablosundan üretilen küçük bir ağaç yapısı katalog sürümüne bağlı anahtarla
+önbellekte tutulur:
+
+    {
+        'kokler': [dugum, ...],       # sira/ad sıralı üst kategoriler
+        'slug': {slug: dugum},
+        'ad': {ad: dugum},
+    }
+    dugum = {'id', 'ad', 'slug', 'ust_id', 'urun_sayisi', 'stokta_urun_sayisi',
+             'toplam_urun_sayisi', 'alt_kategoriler': [...], 'idler': [...]}
+
+'idler' kategorinin ve tüm alt kategorilerinin id'leridir; filtreleme
+bunları kullanır. 'toplam_urun_sayisi' alt kategoriler dahil ürün sayısıdır.
+"""
+from django.db.models import Count, F, Q
+
+from .caching import katalog_anahtari, onbellek
+from .models import Kategori, Urun
+
+
+def kategori_sayaci_uygula(kategori_id, urun_farki=0, stokta_farki=0):
+    """Kategorinin ürün / stoktaki ürün sayılarına fark uygular"""
+    if kategori_id is None or not (urun_farki or stokta_farki):
+        return
+    Kategori.objects.filter(id=kategori_id).update(
+        urun_sayisi=F('urun_sayisi') + urun_farki,
+        stokta_urun_sayisi=F('stokta_urun_sayisi') + stokta_farki,
+    )
+
+
+def tukenen_urunleri_dus(urun_idleri):
+    """
+    Stok düşümünden sonra stoğu sıfırlanan ürünlerin kategorilerinde
+    stokta_urun_sayisi'ni azaltır. Stok düşümü ile aynı transaction içinde
+    çağrılmalıdır (satırlar kilitliyken, bkz. checkout.stoklari_rezerve_et).
+    """
+    tukenenler = (
+        Urun.objects.filter(id__in=urun_idleri, stok_adedi=0, kategori__isnull=False)
+        .order_by().values('kategori_id').annotate(adet=Count('id'))
+    )
+    for satir in tukenenler:
+        kategori_sayaci_uygula(satir['kategori_id'], stokta_farki=-satir['adet'])
+
+
+def kategori_sayilarini_yeniden_hesapla():
+    """Tüm kategorilerin sayılarını tek gruplanmış sorgu ile baştan hesaplar"""
+    sayilar = {
+        satir['kategori_id']: satir
+        for satir in Urun.objects.filter(kategori__isnull=False).order_by().values('kategori_id').annotate(
+            urun_sayisi=Count('id'),
+            stokta_urun_sayisi=Count('id', filter=Q(stok_adedi__gt=0)),
+        )
+    }
+    kategoriler = list(Kategori.objects.only('id', 'urun_sayisi', 'stokta_urun_sayisi'))
+    for kategori in kategoriler:
+        satir = sayilar.get(kategori.id, {})
+        kategori.urun_sayisi = satir.get('urun_sayisi', 0)
+        kategori.stokta_urun_sayisi = satir.get('stokta_urun_sayisi', 0)
+    Kategori.objects.bulk_update(kategoriler, ['urun_sayisi', 'stokta_urun_sayisi'])
+    return len(kategoriler)
+
+
+def _agac_olustur():
+    dugumler = {
+        kategori['id']: dict(kategori, alt_kategoriler=[])
+        for kategori in Kategori.objects.values(
+            'id', 'ad', 'slug', 'ust_kategori_id', 'urun_sayisi', 'stokta_urun_sayisi'
+        )
+    }
+    kokler = []
+    for dugum in dugumler.values():
+        dugum['ust_id'] = dugum.pop('ust_kategori_id')
+        ust = dugumler.get(dugum['ust_id'])
+        (ust['alt_kategoriler'] if ust else kokler).append(dugum)
+
+    def topla(dugum, yol):
+        # yol: döngüsel üst kategori tanımlarına karşı koruma
+        idler = [dugum['id']]
+        toplam = dugum['urun_sayisi']
+        for alt in dugum['alt_kategoriler']:
+            if alt['id'] not in yol:
+                topla(alt, yol | {alt['id']})
+                idler.extend(alt['idler'])
+                toplam += alt['toplam_urun_sayisi']
+        dugum['idler'] = idler
+        dugum['toplam_urun_sayisi'] = toplam
+
+    for kok in kokler:
+        topla(kok, {kok['id']})
+
+    return {
+        'kokler': kokler,
+        'slug': {dugum['slug']: dugum for dugum in dugumler.values()},
+        'ad': {dugum['ad']: dugum for dugum in dugumler.values()},
+    }
+
+
+def kategori_agaci():
+    """Önbellekteki kategori ağacı (katalog değişince yenilenir)"""
+    anahtar = katalog_anahtari('kategori_agaci')
+    agac = onbellek.get(anahtar)
+    if agac is None:
+        agac = _agac_olustur()
+        onbellek.set(anahtar, agac, 3600)  # 1 saat cache
+    return agac
+
+
+def kategori_bul(deger):
+    """Slug veya ada göre kategori düğümü (bulunamazsa None)"""
+    if not deger:
+        return None
+    agac = kategori_agaci()
+    return agac['slug'].get(deger) or agac['ad'].get(deger)
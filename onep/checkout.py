@@ -0,0 +1,181 @@
+"""
+ONEP Sipariş Oluşturma
+Stok düşümü koşullu F() güncellemeleriyle yapılır:
+
+    UPDATE onep_urun SET stok_adedi = stok_adedi - n WHERE id = ? AND stok_adedi >= n
+
+Satırlar her zaman ürün id sırasına göre güncellenir; böylece eşzamanlı
+siparişler satır kilitlerini aynı sırayla alır (deadlock yok) ve stok hiçbir
+zaman sıfırın altına düşmez.
+
+Rezerve edilen kalemler kullanıcının kalıcı sepetine (SepetKalemi) yazılır ve
+sipariş kalemleri oradan tek bir küme tabanlı sorgu ile eklenir; birim fiyat
+kilitli ürün satırından okunur:
+
+    INSERT INTO onep_sipariskalemi (siparis_id, urun_id, adet, birim_fiyat, ...)
+    SELECT %s, k.urun_id, k.adet, u.fiyat, ... FROM onep_sepetkalemi k
+    JOIN onep_urun u ON u.id = k.urun_id WHERE k.sepet_id = %s
+
+Kalemlere ürün adı, resim ve satır toplamı, siparişe toplam ürün adedi
+yazılır; geçmiş sayfaları Urun'a JOIN yapmaz (eski siparişler için
+backfill_order_snapshots komutu).
+
+Ardından kalıcı sepet boşaltılır. Stoğu sıfırlanan ürünler kategorilerinin
+stokta_urun_sayisi'nden düşülür (update() sinyal göndermez). Son olarak
+sipariş günlük satış özetlerine eklenir (bkz. daily_sales).
+"""
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .caching import urunleri_gecersiz_kil
+from .cart import kalici_sepeti_kaydet
+from .categories import tukenen_urunleri_dus
+from .daily_sales import siparisi_ozete_ekle
+from .models import SepetKalemi, Siparis, SiparisKalemi, Urun
+
+
+class StokYetersizHatasi(Exception):
+    """
+    Sepetteki bir veya daha fazla kalem rezerve edilemedi.
+    basarisiz_kalemler: [{'urun_id', 'urun_adi', 'istenen', 'mevcut'}]
+    """
+
+    def __init__(self, basarisiz_kalemler):
+        self.basarisiz_kalemler = basarisiz_kalemler
+        super().__init__(
+            ', '.join(f"{k['urun_adi'] or k['urun_id']} ({k['istenen']}/{k['mevcut']})" for k in basarisiz_kalemler)
+        )
+
+
+def stoklari_rezerve_et(sepet):
+    """
+    Sepetteki tüm kalemlerin stoğunu düşer ve {urun_id: miktar} döndürür.
+    Açık bir transaction içinde çağrılmalıdır; herhangi bir kalem başarısız
+    olursa tüm kalemler listelenerek StokYetersizHatasi fırlatılır.
+    """
+    istenen = {int(urun_id): miktar for urun_id, miktar in sepet.items()}
+    simdi = timezone.now()
+
+    basarisiz_idler = []
+    for urun_id in sorted(istenen):
+        miktar = istenen[urun_id]
+        guncellenen = Urun.objects.filter(id=urun_id, stok_adedi__gte=miktar).update(
+            stok_adedi=F('stok_adedi') - miktar,
+            guncellenme_tarihi=simdi,
+        )
+        if not guncellenen:
+            basarisiz_idler.append(urun_id)
+
+    if basarisiz_idler:
+        mevcut = Urun.objects.in_bulk(basarisiz_idler)
+        raise StokYetersizHatasi([
+            {
+                'urun_id': urun_id,
+                'urun_adi': mevcut[urun_id].urun_adi if urun_id in mevcut else None,
+                'istenen': istenen[urun_id],
+                'mevcut': mevcut[urun_id].stok_adedi if urun_id in mevcut else 0,
+            }
+            for urun_id in basarisiz_idler
+        ])
+
+    tukenen_urunleri_dus(istenen.keys())
+    return istenen
+
+
+def _kalemleri_sepetten_ekle(siparis, sepet_kaydi):
+    """Sepet kalemlerini tek INSERT ... SELECT ile sipariş kalemlerine kopyalar"""
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(SiparisKalemi._meta.db_table)} "
+            f"(siparis_id, urun_id, adet, birim_fiyat, urun_adi, resim_url, satir_toplami) "
+            f"SELECT %s, k.urun_id, k.adet, u.fiyat, u.urun_adi, u.resim_url, k.adet * u.fiyat "
+            f"FROM {qn(SepetKalemi._meta.db_table)} k "
+            f"INNER JOIN {qn(Urun._meta.db_table)} u ON u.id = k.urun_id "
+            f"WHERE k.sepet_id = %s ORDER BY k.urun_id",
+            [siparis.id, sepet_kaydi.id],
+        )
+
+
+def siparis_olustur(kullanici, sepet):
+    """
+    Sepetten sipariş oluşturur: stok rezervasyonu, sipariş ve kalemler tek
+    transaction içindedir. Stok yetersizse hiçbir değişiklik kalıcı olmaz.
+    """
+    with transaction.atomic():
+        rezerve = stoklari_rezerve_et(sepet)
+        # update() sinyal göndermez - stok gösteren önbellekleri elle geçersiz kıl
+        urunleri_gecersiz_kil(rezerve.keys())
+
+        # Kalıcı sepet rezerve edilen kalemlerle eşitlenir (genelde zaten aynıdır)
+        sepet_kaydi = kalici_sepeti_kaydet(kullanici, rezerve)
+        kalemler = SepetKalemi.objects.filter(sepet=sepet_kaydi)
+
+        # Satırlar artık bu transaction tarafından kilitli; fiyatlar tutarlı
+        toplam_tutar = kalemler.aggregate(
+            toplam=Sum(ExpressionWrapper(
+                F('adet') * F('urun__fiyat'), output_field=DecimalField(max_digits=12, decimal_places=2)
+            ))
+        )['toplam'] or Decimal('0.00')
+
+        siparis = Siparis.objects.create(
+            kullanici=kullanici,
+            toplam_tutar=toplam_tutar,
+            urun_adedi=sum(rezerve.values())
+        )
+        _kalemleri_sepetten_ekle(siparis, sepet_kaydi)
+        kalemler.delete()
+        # Günün özet satırları parçalı (bkz. daily_sales.OZET_PARCA_SAYISI)
+        siparisi_ozete_ekle(siparis)
+
+    return siparis
+
+
+def siparis_goruntulerini_doldur(batch_size=1000):
+    """
+    Anlık görüntü alanları boş olan eski sipariş kalemlerini ürünlerden,
+    urun_adedi'si 0 olan siparişleri kalemlerinden doldurur. id aralıkları
+    halinde küme tabanlı UPDATE'ler çalıştırır; (kalem, sipariş) sayısı döner.
+    """
+    urun = Urun.objects.filter(pk=OuterRef('urun_id'))
+    kalem_sayisi = 0
+    son_id = 0
+    while True:
+        idler = list(
+            SiparisKalemi.objects.filter(id__gt=son_id, urun_adi='')
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not idler:
+            break
+        with transaction.atomic():
+            kalem_sayisi += SiparisKalemi.objects.filter(id__in=idler).update(
+                urun_adi=Subquery(urun.values('urun_adi')[:1]),
+                resim_url=Subquery(urun.values('resim_url')[:1]),
+                satir_toplami=F('adet') * F('birim_fiyat'),
+            )
+        son_id = idler[-1]
+
+    adet_toplami = (
+        SiparisKalemi.objects.filter(siparis_id=OuterRef('pk'))
+        .order_by().values('siparis_id').annotate(toplam=Sum('adet')).values('toplam')
+    )
+    siparis_sayisi = 0
+    son_id = 0
+    while True:
+        idler = list(
+            Siparis.objects.filter(id__gt=son_id, urun_adedi=0)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not idler:
+            break
+        with transaction.atomic():
+            siparis_sayisi += Siparis.objects.filter(id__in=idler).update(
+                urun_adedi=Coalesce(Subquery(adet_toplami), 0)
+            )
+        son_id = idler[-1]
+
+    return kalem_sayisi, siparis_sayisi
@@ -0,0 +1,127 @@
+"""
+ONEP Koşullu GET (ETag / Last-Modified)
+Katalog sayfalarının doğrulayıcıları veritabanına gitmeden, katalog sürüm
+sayacından ve son değişiklik zamanından üretilir (bkz. onep/caching.py).
+Ürün, yorum veya kategori değiştiğinde urunleri_gecersiz_kil bu sayacı
+artırır; parça önbelleği de aynı sürüme bağlı olduğundan önbellekten sunulan
+sayfalar ve 304 yanıtları sorgusuz kalır.
+
+Sayfalar kullanıcıya özel kısımlar (sepet rozeti, kullanıcı menüsü) içerdiği
+için ETag kullanıcı ve sepet adedini de içerir; bekleyen flash mesajı varsa
+doğrulayıcı üretilmez. Last-Modified sadece anonim ve sepeti boş ziyaretçilere
+gönderilir, çünkü kullanıcıya özel değişikliklerin zaman damgası yoktur.
+
+Her görünüm için hit / miss / 304 sayaçları paylaşılan önbellekte tutulur.
+"""
+import hashlib
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .caching import ISTEK_PARCA_KACIRMA, katalog_degisim_zamani, katalog_surumu, onbellek
+
+_ISTEK_DOGRULAYICI = '_onep_dogrulayici'
+
+SAYAC_ONEKI = 'sayac:'
+SAYAC_TURLERI = ('hit', 'miss', '304')
+
+
+# --- sayaçlar ---------------------------------------------------------------
+
+def _sayac_anahtari(gorunum, tur):
+    return f'{SAYAC_ONEKI}{gorunum}:{tur}'
+
+
+def sayac_artir(gorunum, tur):
+    """Görünümün hit/miss/304 sayacını bir artırır"""
+    anahtar = _sayac_anahtari(gorunum, tur)
+    if not onbellek.add(anahtar, 1, None):
+        try:
+            onbellek.incr(anahtar)
+        except ValueError:
+            # add ile incr arasında düşmüş
+            onbellek.set(anahtar, 1, None)
+
+
+def onbellek_istatistikleri(gorunumler):
+    """{gorunum: {'hit': n, 'miss': n, '304': n}} döndürür"""
+    anahtarlar = {
+        _sayac_anahtari(gorunum, tur): (gorunum, tur)
+        for gorunum in gorunumler for tur in SAYAC_TURLERI
+    }
+    degerler = onbellek.get_many(list(anahtarlar))
+    sonuc = {gorunum: dict.fromkeys(SAYAC_TURLERI, 0) for gorunum in gorunumler}
+    for anahtar, (gorunum, tur) in anahtarlar.items():
+        sonuc[gorunum][tur] = degerler.get(anahtar, 0)
+    return sonuc
+
+
+# --- doğrulayıcılar ---------------------------------------------------------
+
+def _dogrulayici(request, gorunum):
+    """
+    (son_guncelleme, etag) döndürür; aynı istekte tekrar üretilmez.
+    Bekleyen mesaj varsa (None, None).
+    """
+    hazir = getattr(request, _ISTEK_DOGRULAYICI, None)
+    if hazir is not None:
+        return hazir
+
+    sonuc = (None, None)
+    if not len(get_messages(request)):
+        sepet = request.session.get('sepet', {})
+        parcalar = [
+            gorunum,
+            request.get_full_path(),
+            request.headers.get('X-Requested-With', ''),
+            katalog_surumu(),
+            request.user.pk or '',
+            sum(sepet.values()) if sepet else 0,
+        ]
+        etag = hashlib.md5(':'.join(str(p) for p in parcalar).encode('utf-8')).hexdigest()
+        sonuc = (katalog_degisim_zamani(), etag)
+
+    setattr(request, _ISTEK_DOGRULAYICI, sonuc)
+    return sonuc
+
+
+def _kisisel_mi(request):
+    return request.user.is_authenticated or bool(request.session.get('sepet'))
+
+
+def kosullu_katalog_gorunumu(gorunum):
+    """
+    Katalog görünümlerine ETag/Last-Modified desteği ekler ve hit/miss/304
+    sayaçlarını tutar. Yanıt 'private, no-cache' olarak işaretlenir: tarayıcı
+    sayfayı saklar ama her seferinde sorar.
+    """
+    def dogrulayici(request, *args, **kwargs):
+        return _dogrulayici(request, gorunum)
+
+    def etag_func(request, *args, **kwargs):
+        return dogrulayici(request, *args, **kwargs)[1]
+
+    def last_modified_func(request, *args, **kwargs):
+        if _kisisel_mi(request):
+            return None
+        return dogrulayici(request, *args, **kwargs)[0]
+
+    def decorator(view_func):
+        kosullu = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        @wraps(view_func)
+        def _wrapper(request, *args, **kwargs):
+            response = kosullu(request, *args, **kwargs)
+            if response.status_code == 304:
+                sayac_artir(gorunum, '304')
+            elif response.status_code == 200:
+                sayac_artir(gorunum, 'miss' if getattr(request, ISTEK_PARCA_KACIRMA, False) else 'hit')
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Cookie', 'X-Requested-With'))
+            return response
+
+        return _wrapper
+
+    return decorator
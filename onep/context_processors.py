@@ -1,9 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cart import sepet_adedi
+
+
 def cart_context(request):
-    """Sepet bilgilerini tüm template'lerde kullanılabilir hale getirir"""
-    sepet = request.session.get('sepet', {})
-    cart_count = sum(sepet.values()) if sepet else 0
-    
+    """
+    Sepet bilgilerini tüm template'lerde kullanılabilir hale getirir.
+    Değerler tembeldir: session sadece şablon cart_count / cart_items
+    okuduğunda yüklenir (admin ve rozet göstermeyen sayfalar session'a dokunmaz).
+    """
     return {
-        'cart_count': cart_count,
-        'cart_items': sepet
+        'cart_count': SimpleLazyObject(lambda: sepet_adedi(request.session)),
+        'cart_items': SimpleLazyObject(lambda: request.session.get('sepet', {})),
     }
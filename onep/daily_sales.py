@@ -0,0 +1,218 @@
+"""
+ONEP Günlük Satış Özetleri
+GunlukSiparisOzeti (gün × durum) ve GunlukUrunSatisi (gün × ürün) admin satış
+özeti ekranının tek veri kaynağıdır; ekran Siparis / SiparisKalemi taramaz.
+
+Artımlı bakım:
+  - checkout: siparisi_ozete_ekle(), sipariş transaction'ı içinde
+  - durum / tutar değişikliği: signals -> siparis_ozetini_guncelle()
+  - sipariş silme: signals -> siparisi_ozetten_dus()
+
+Gün, siparis_tarihi'nin yerel saat dilimindeki (TIME_ZONE) tarihidir. İptal
+edilen siparişler gün × durum tablosunda 'iptal_edildi' satırına taşınır,
+ürün satışlarından düşülür. Eksik satırlar önce sıfır değerlerle eklenir
+(ignore_conflicts), sonra F() ile güncellenir; aynı günün ilk siparişleri
+eşzamanlı gelse de çakışmaz.
+
+Gün × durum satırı günün tüm checkout'larında ortaktır; satır kilidi commit'e
+kadar tutulduğundan eşzamanlı checkout'lar tek satırda sıraya girerdi. Bu
+yüzden her gün × durum OZET_PARCA_SAYISI parçaya bölünür: sipariş, id'sine
+göre hep aynı parçaya yazılır (durum değişikliği ve silme de aynı parçadan
+düşer), okuyanlar parçaları toplar. Toplamlar transaction içinde kaldığı için
+kesin kalır.
+
+Admin'den eklenen siparişler ve kalem düzenlemeleri artımlı olarak
+yansıtılmaz; rebuild_daily_sales tabloları baştan hesaplar.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Mod, TruncDate
+from django.utils import timezone
+
+from .models import GunlukSiparisOzeti, GunlukUrunSatisi, Siparis, SiparisKalemi, Urun
+
+IPTAL = 'iptal_edildi'
+EN_COK_SATAN_SAYISI = 10
+# Gün × durum satırlarının parça sayısı (bkz. migrations/0016)
+OZET_PARCA_SAYISI = 8
+
+
+def _gun(siparis):
+    return timezone.localdate(siparis.siparis_tarihi)
+
+
+def _parca(siparis):
+    return siparis.id % OZET_PARCA_SAYISI
+
+
+def _artir(model, anahtar, **farklar):
+    """anahtar satırının alanlarına farkları uygular; satır yoksa önce ekler"""
+    degerler = {alan: F(alan) + fark for alan, fark in farklar.items()}
+    if not model.objects.filter(**anahtar).update(**degerler):
+        model.objects.bulk_create([model(**anahtar)], ignore_conflicts=True)
+        model.objects.filter(**anahtar).update(**degerler)
+
+
+def _durum_satirina_uygula(gun, parca, durum, urun_adedi, toplam_tutar, isaret):
+    _artir(
+        GunlukSiparisOzeti, {'gun': gun, 'durum': durum, 'parca': parca},
+        siparis_sayisi=isaret, urun_adedi=isaret * urun_adedi, ciro=isaret * toplam_tutar,
+    )
+
+
+def _urun_satislarina_uygula(gun, siparis_id, isaret):
+    """Siparişin kalemlerini gün × ürün satırlarına iki sorguda ekler / düşer"""
+    toplamlar = defaultdict(lambda: [0, Decimal('0.00')])
+    for urun_id, adet, satir_toplami in SiparisKalemi.objects.filter(siparis_id=siparis_id).values_list(
+        'urun_id', 'adet', 'satir_toplami'
+    ):
+        toplamlar[urun_id][0] += adet
+        toplamlar[urun_id][1] += satir_toplami
+    if not toplamlar:
+        return
+
+    GunlukUrunSatisi.objects.bulk_create(
+        [GunlukUrunSatisi(gun=gun, urun_id=urun_id) for urun_id in sorted(toplamlar)],
+        ignore_conflicts=True,
+    )
+    GunlukUrunSatisi.objects.filter(gun=gun, urun_id__in=toplamlar).update(
+        adet=F('adet') + Case(
+            *[When(urun_id=urun_id, then=Value(isaret * adet)) for urun_id, (adet, _) in toplamlar.items()],
+            output_field=IntegerField(),
+        ),
+        ciro=F('ciro') + Case(
+            *[When(urun_id=urun_id, then=Value(isaret * ciro)) for urun_id, (_, ciro) in toplamlar.items()],
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+    )
+
+
+def siparisi_ozete_ekle(siparis):
+    """Yeni siparişi (kalemleri yazıldıktan sonra) günlük özetlere ekler"""
+    gun = _gun(siparis)
+    _durum_satirina_uygula(gun, _parca(siparis), siparis.durum, siparis.urun_adedi, siparis.toplam_tutar, +1)
+    if siparis.durum != IPTAL:
+        _urun_satislarina_uygula(gun, siparis.id, +1)
+
+
+def siparisi_ozetten_dus(siparis):
+    """Silinen siparişi (kalemleri henüz silinmeden) günlük özetlerden düşer"""
+    gun = _gun(siparis)
+    _durum_satirina_uygula(gun, _parca(siparis), siparis.durum, siparis.urun_adedi, siparis.toplam_tutar, -1)
+    if siparis.durum != IPTAL:
+        _urun_satislarina_uygula(gun, siparis.id, -1)
+
+
+def siparis_ozetini_guncelle(siparis, onceki):
+    """
+    Düzenlenen siparişin farkını uygular. onceki kayıt öncesi
+    (durum, urun_adedi, toplam_tutar) değerleridir.
+    """
+    yeni = (siparis.durum, siparis.urun_adedi, siparis.toplam_tutar)
+    if onceki == yeni:
+        return
+    gun, parca = _gun(siparis), _parca(siparis)
+    _durum_satirina_uygula(gun, parca, *onceki, -1)
+    _durum_satirina_uygula(gun, parca, *yeni, +1)
+
+    onceki_iptal, yeni_iptal = onceki[0] == IPTAL, siparis.durum == IPTAL
+    if onceki_iptal != yeni_iptal:
+        _urun_satislarina_uygula(gun, siparis.id, -1 if yeni_iptal else +1)
+
+
+def gunluk_ozetleri_yeniden_olustur(batch_size=1000):
+    """Özet tabloları siparişlerden baştan hesaplar; (gün × durum parçası, gün × ürün) satır sayısı döner"""
+    durum_satirlari = (
+        Siparis.objects.annotate(gun=TruncDate('siparis_tarihi'), parca=Mod('id', OZET_PARCA_SAYISI))
+        .order_by().values('gun', 'durum', 'parca')
+        .annotate(sayi=Count('id'), adet=Sum('urun_adedi'), toplam=Sum('toplam_tutar'))
+    )
+    urun_satirlari = (
+        SiparisKalemi.objects.exclude(siparis__durum=IPTAL)
+        .annotate(gun=TruncDate('siparis__siparis_tarihi'))
+        .order_by().values('gun', 'urun_id')
+        .annotate(toplam_adet=Sum('adet'), toplam=Sum('satir_toplami'))
+    )
+
+    with transaction.atomic():
+        GunlukSiparisOzeti.objects.all().delete()
+        GunlukUrunSatisi.objects.all().delete()
+
+        durum_kayitlari = GunlukSiparisOzeti.objects.bulk_create([
+            GunlukSiparisOzeti(
+                gun=satir['gun'], durum=satir['durum'], parca=satir['parca'], siparis_sayisi=satir['sayi'],
+                urun_adedi=satir['adet'] or 0, ciro=satir['toplam'] or Decimal('0.00'),
+            )
+            for satir in durum_satirlari
+        ], batch_size=batch_size)
+
+        urun_kayit_sayisi = 0
+        parca = []
+        for satir in urun_satirlari.iterator(chunk_size=batch_size):
+            parca.append(GunlukUrunSatisi(
+                gun=satir['gun'], urun_id=satir['urun_id'], adet=satir['toplam_adet'], ciro=satir['toplam'],
+            ))
+            if len(parca) >= batch_size:
+                urun_kayit_sayisi += len(GunlukUrunSatisi.objects.bulk_create(parca))
+                parca = []
+        urun_kayit_sayisi += len(GunlukUrunSatisi.objects.bulk_create(parca))
+
+    return len(durum_kayitlari), urun_kayit_sayisi
+
+
+def satis_ozeti(gun_sayisi):
+    """
+    Son gun_sayisi günün (bugün dahil) özet ekranı verisi. Sadece özet
+    tablolarını ve en çok satanların adları için Urun'u (id ile) okur.
+    """
+    bitis = timezone.localdate()
+    baslangic = bitis - timedelta(days=gun_sayisi - 1)
+    durumlar = [durum for durum, _ in Siparis.DURUM_SECENEKLERI]
+
+    gunler = {
+        baslangic + timedelta(days=i): {'durumlar': dict.fromkeys(durumlar, 0), 'siparis': 0, 'ciro': Decimal('0.00')}
+        for i in range(gun_sayisi)
+    }
+    durum_toplamlari = {durum: {'siparis': 0, 'ciro': Decimal('0.00')} for durum in durumlar}
+    # Gün × durum parçaları burada toplanır
+    for gun, durum, siparis_sayisi, ciro in GunlukSiparisOzeti.objects.filter(
+        gun__range=(baslangic, bitis)
+    ).values_list('gun', 'durum', 'siparis_sayisi', 'ciro'):
+        gunler[gun]['durumlar'][durum] += siparis_sayisi
+        durum_toplamlari[durum]['siparis'] += siparis_sayisi
+        durum_toplamlari[durum]['ciro'] += ciro
+        if durum != IPTAL:
+            gunler[gun]['siparis'] += siparis_sayisi
+            gunler[gun]['ciro'] += ciro
+
+    en_cok_satanlar = list(
+        GunlukUrunSatisi.objects.filter(gun__range=(baslangic, bitis))
+        .values('urun_id').annotate(adet=Sum('adet'), ciro=Sum('ciro'))
+        .order_by('-ciro', 'urun_id')[:EN_COK_SATAN_SAYISI]
+    )
+    adlar = Urun.objects.only('urun_adi').in_bulk([satir['urun_id'] for satir in en_cok_satanlar])
+    for satir in en_cok_satanlar:
+        urun = adlar.get(satir['urun_id'])
+        satir['urun_adi'] = urun.urun_adi if urun else f"#{satir['urun_id']}"
+
+    etiketler = dict(Siparis.DURUM_SECENEKLERI)
+    return {
+        'baslangic': baslangic,
+        'bitis': bitis,
+        'durumlar': [(durum, etiketler[durum]) for durum in durumlar],
+        'gunler': [
+            {'gun': gun, 'durum_sayilari': [veri['durumlar'][durum] for durum in durumlar],
+             'siparis': veri['siparis'], 'ciro': veri['ciro']}
+            for gun, veri in sorted(gunler.items(), reverse=True)
+        ],
+        'durum_toplamlari': [
+            {'durum': etiketler[durum], **durum_toplamlari[durum]} for durum in durumlar
+        ],
+        'toplam_siparis': sum(veri['siparis'] for veri in gunler.values()),
+        'toplam_ciro': sum((veri['ciro'] for veri in gunler.values()), Decimal('0.00')),
+        'en_cok_satanlar': en_cok_satanlar,
+    }
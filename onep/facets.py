@@ -0,0 +1,160 @@
+"""
+ONEP Facet Sayıları
+Liste filtreleri (kategori, fiyat aralığı, stok) için sonuç sayıları tek bir
+gruplanmış sorgu ile hesaplanır:
+
+    SELECT kategori_id, fiyat_kovasi, stokta, COUNT(*) FROM onep_urun
+    WHERE <arama ve fiyat filtreleri> GROUP BY 1, 2, 3
+
+Kategori filtresi sorguya eklenmez; böylece kategori sayıları "bu aramada
+diğer kategorilerde kaç ürün var" sorusunu yanıtlar. Fiyat aralığı ve stok
+sayıları satırlar seçili kategori (ve alt kategorileri) ile daraltılarak
+Python'da toplanır.
+
+Sonuç katalog sürümüne bağlı, normalize edilmiş filtre anahtarıyla (sıralama,
+sayfa ve imleç hariç) önbelleğe alınır.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import BooleanField, Case, Count, ExpressionWrapper, Q, Value, When
+
+from .caching import katalog_anahtari, onbellek
+from .categories import kategori_agaci, kategori_bul
+from .models import Urun
+from .search import urunleri_ara
+
+# Fiyat aralıkları: [0, 500), [500, 1000), ... [50000, ∞)
+FIYAT_SINIRLARI = (500, 1000, 5000, 10000, 25000, 50000)
+
+
+def fiyat_ayristir(deger):
+    """
+    Fiyat parametresini iki basamaklı Decimal'e çevirir ('10' ve '10.00'
+    aynı değeri verir). Boşsa None; geçersizse ValueError.
+    """
+    deger = (deger or '').strip()
+    if not deger:
+        return None
+    try:
+        fiyat = Decimal(deger).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(deger)
+    if not fiyat.is_finite() or fiyat < 0:
+        raise ValueError(deger)
+    return fiyat
+
+
+def _fiyat_veya_none(deger):
+    try:
+        return fiyat_ayristir(deger)
+    except ValueError:
+        return None
+
+
+def filtreleri_ayristir(params):
+    """
+    GET parametrelerinden normalize edilmiş filtreler. Aynı sonucu veren
+    istekler (farklı sıralama, sayfa, fazladan boşluk, kategori adı/slug'ı)
+    aynı sözlüğü üretir:
+
+        {'arama', 'kategori', 'kategori_idleri', 'min_fiyat', 'max_fiyat'}
+
+    kategori_idleri: None (filtre yok), [] (kategori bulunamadı) veya seçili
+    kategori ile alt kategorilerinin id'leri. Fiyatlar Decimal veya None;
+    geçersiz fiyatlar yok sayılır.
+    """
+    arama = ' '.join((params.get('arama') or '').split())
+    kategori = params.get('kategori') or ''
+    kategori_idleri = None
+    if kategori:
+        dugum = kategori_bul(kategori)
+        kategori, kategori_idleri = (dugum['slug'], dugum['idler']) if dugum else (kategori, [])
+    return {
+        'arama': arama,
+        'kategori': kategori,
+        'kategori_idleri': kategori_idleri,
+        'min_fiyat': _fiyat_veya_none(params.get('min_fiyat')),
+        'max_fiyat': _fiyat_veya_none(params.get('max_fiyat')),
+    }
+
+
+def filtreleri_uygula(urunler, filtreler, kategori=True):
+    """Arama, kategori (kategori=True ise) ve fiyat filtrelerini queryset'e uygular"""
+    if filtreler['arama']:
+        urunler = urunleri_ara(urunler, filtreler['arama'])
+    if kategori and filtreler['kategori_idleri'] is not None:
+        urunler = urunler.filter(kategori_id__in=filtreler['kategori_idleri'])
+    if filtreler['min_fiyat'] is not None:
+        urunler = urunler.filter(fiyat__gte=filtreler['min_fiyat'])
+    if filtreler['max_fiyat'] is not None:
+        urunler = urunler.filter(fiyat__lte=filtreler['max_fiyat'])
+    return urunler
+
+
+def _fiyat_kovasi():
+    return Case(
+        *[When(fiyat__lt=sinir, then=Value(sira)) for sira, sinir in enumerate(FIYAT_SINIRLARI)],
+        default=Value(len(FIYAT_SINIRLARI)),
+    )
+
+
+def _facetleri_hesapla(filtreler):
+    satirlar = list(
+        filtreleri_uygula(Urun.objects.all(), filtreler, kategori=False)
+        .annotate(
+            fiyat_kovasi=_fiyat_kovasi(),
+            stokta=ExpressionWrapper(Q(stok_adedi__gt=0), output_field=BooleanField()),
+        )
+        .order_by()
+        .values('kategori_id', 'fiyat_kovasi', 'stokta')
+        .annotate(adet=Count('id'))
+    )
+
+    secili = filtreler['kategori_idleri']
+    secili = None if secili is None else set(secili)
+    kapsamda = [s for s in satirlar if secili is None or s['kategori_id'] in secili]
+
+    kategori_sayilari = {}
+    for satir in satirlar:
+        kategori_sayilari[satir['kategori_id']] = kategori_sayilari.get(satir['kategori_id'], 0) + satir['adet']
+
+    kova_sayilari = [0] * (len(FIYAT_SINIRLARI) + 1)
+    for satir in kapsamda:
+        kova_sayilari[satir['fiyat_kovasi']] += satir['adet']
+
+    alt_sinirlar = (0,) + FIYAT_SINIRLARI
+    ust_sinirlar = FIYAT_SINIRLARI + (None,)
+    return {
+        'toplam': sum(s['adet'] for s in kapsamda),
+        'stokta': sum(s['adet'] for s in kapsamda if s['stokta']),
+        # Üst kategoriler; sayılar alt kategorileri kapsar
+        'kategoriler': [
+            {
+                'slug': kok['slug'],
+                'ad': kok['ad'],
+                'adet': sum(kategori_sayilari.get(kategori_id, 0) for kategori_id in kok['idler']),
+            }
+            for kok in kategori_agaci()['kokler']
+        ],
+        'fiyat_araliklari': [
+            {'min': alt, 'max': ust, 'adet': adet}
+            for alt, ust, adet in zip(alt_sinirlar, ust_sinirlar, kova_sayilari)
+        ],
+    }
+
+
+def facetleri_getir(filtreler):
+    """
+    filtreleri_ayristir() çıktısı için facet sayıları (önbellekten):
+
+        {'toplam', 'stokta', 'kategoriler': [{'slug', 'ad', 'adet'}],
+         'fiyat_araliklari': [{'min', 'max', 'adet'}]}
+    """
+    anahtar = katalog_anahtari(
+        'facetler', filtreler['arama'], filtreler['kategori'], filtreler['min_fiyat'], filtreler['max_fiyat']
+    )
+    facetler = onbellek.get(anahtar)
+    if facetler is None:
+        facetler = _facetleri_hesapla(filtreler)
+        onbellek.set(anahtar, facetler, 600)  # 10 dakika cache
+    return facetler
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from onep.checkout import siparis_goruntulerini_doldur
+
+
+class Command(BaseCommand):
+    help = 'Fill product name / image / line total snapshots on old order lines and item counts on orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows updated per transaction',
+        )
+
+    def handle(self, *args, **kwargs):
+        kalemler, siparisler = siparis_goruntulerini_doldur(batch_size=kwargs['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{kalemler} siparis kalemi ve {siparisler} siparis dolduruldu.'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from onep.conditional import onbellek_istatistikleri
+
+KATALOG_GORUNUMLERI = ['product_list', 'product_detail']
+
+
+class Command(BaseCommand):
+    help = 'Show fragment cache hit / miss and 304 counters for the catalog views'
+
+    def handle(self, *args, **kwargs):
+        for gorunum, sayaclar in onbellek_istatistikleri(KATALOG_GORUNUMLERI).items():
+            toplam = sum(sayaclar.values())
+            oran = (sayaclar['hit'] + sayaclar['304']) * 100 / toplam if toplam else 0
+            self.stdout.write(
+                f"{gorunum:<16} hit={sayaclar['hit']} miss={sayaclar['miss']} "
+                f"304={sayaclar['304']} (onbellekten: %{oran:.1f})"
+            )
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from onep.cart_store.cache import SessionStore
+
+
+class Command(BaseCommand):
+    help = 'Write cart changes held only in the cache session store to the database'
+
+    def handle(self, *args, **kwargs):
+        if settings.SESSION_ENGINE != 'onep.cart_store.cache':
+            self.stdout.write('Onbellek session deposu kullanilmiyor, yazilacak session yok.')
+            return
+        yazilan = SessionStore.bekleyenleri_db_ye_yaz()
+        self.stdout.write(self.style.SUCCESS(f'{yazilan} session veritabanina yazildi.'))
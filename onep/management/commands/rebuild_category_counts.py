@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from onep.caching import urunleri_gecersiz_kil
+from onep.categories import kategori_sayilarini_yeniden_hesapla
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized product / in-stock product counts on Kategori'
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            guncellenen = kategori_sayilarini_yeniden_hesapla()
+            # bulk_update sinyal göndermez - önbellekteki kategori ağacını yenile
+            urunleri_gecersiz_kil([])
+        self.stdout.write(self.style.SUCCESS(f'{guncellenen} kategorinin urun sayilari yeniden hesaplandi.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from onep.daily_sales import gunluk_ozetleri_yeniden_olustur
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-day order status and per-day product sales summaries from all orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of summary rows inserted per query',
+        )
+
+    def handle(self, *args, **kwargs):
+        durum_satirlari, urun_satirlari = gunluk_ozetleri_yeniden_olustur(batch_size=kwargs['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{durum_satirlari} gunluk durum ve {urun_satirlari} gunluk urun satiri yeniden hesaplandi.'
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from onep.ratings import puan_istatistiklerini_yeniden_hesapla
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized review count / rating sum / histogram columns on Urun'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--urun',
+            type=int,
+            nargs='*',
+            help='Only rebuild the given product ids (default: all products)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of products written per bulk_update batch',
+        )
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            guncellenen = puan_istatistiklerini_yeniden_hesapla(
+                urun_ids=kwargs['urun'],
+                batch_size=kwargs['batch_size'],
+            )
+        self.stdout.write(self.style.SUCCESS(f'{guncellenen} urunun puan istatistikleri yeniden hesaplandi.'))
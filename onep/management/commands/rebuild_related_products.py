@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from onep.caching import urunleri_gecersiz_kil
+from onep.recommendations import BENZER_URUN_SAYISI, benzer_urunleri_yeniden_hesapla
+
+
+class Command(BaseCommand):
+    help = 'Precompute related products (co-purchase, then category, then popularity) into BenzerUrun'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=BENZER_URUN_SAYISI,
+            help='Number of related products stored per product',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows inserted per query',
+        )
+
+    def handle(self, *args, **kwargs):
+        urunler, kayitlar = benzer_urunleri_yeniden_hesapla(n=kwargs['limit'], batch_size=kwargs['batch_size'])
+        # Önbellekteki benzer ürün parçalarını yenile
+        urunleri_gecersiz_kil([])
+        self.stdout.write(self.style.SUCCESS(f'{urunler} urun icin {kayitlar} benzer urun kaydi yazildi.'))
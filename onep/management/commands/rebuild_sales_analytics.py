@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from onep.analytics import satis_analitigini_yeniden_olustur
+
+
+class Command(BaseCommand):
+    help = 'Stream order lines and rebuild sales-by-product, sales-by-category-by-day and product pair summaries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of order lines fetched from the database at a time',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of summary rows inserted per query',
+        )
+
+    def handle(self, *args, **kwargs):
+        ilerleme = None
+        if kwargs['verbosity'] > 1:
+            def ilerleme(satir, sure):
+                self.stdout.write(f'{satir} satir okundu ({satir / sure:.0f} satir/sn)')
+
+        sonuc = satis_analitigini_yeniden_olustur(
+            chunk_size=kwargs['chunk_size'], batch_size=kwargs['batch_size'], ilerleme=ilerleme,
+        )
+        hiz = sonuc['satir'] / sonuc['sure'] if sonuc['sure'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{sonuc['siparis']} siparisin {sonuc['satir']} kalemi {sonuc['sure']:.1f} sn'de islendi "
+            f"({hiz:.0f} satir/sn): {sonuc['urun']} urun, {sonuc['kategori_gun']} gun/kategori, "
+            f"{sonuc['cift']} urun cifti yazildi."
+        ))
@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
 from django.contrib.auth.models import User
-from onep.models import Urun
+from onep.models import Kategori, Urun
 from decimal import Decimal
 import os
 
@@ -108,7 +108,8 @@ class Command(BaseCommand):
             ]
 
             for product_data in sample_products:
-                Urun.objects.create(**product_data)
+                kategori, _ = Kategori.objects.get_or_create(ad=product_data.pop('kategori'))
+                Urun.objects.create(kategori=kategori, **product_data)
                 
             self.stdout.write(self.style.SUCCESS(f'{len(sample_products)} adet ornek urun basariyla olusturuldu!'))
         else:
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:57
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def puan_istatistiklerini_doldur(apps, schema_editor):
+    """Mevcut yorumlardan ürün istatistiklerini hesapla"""
+    Urun = apps.get_model('onep', 'Urun')
+    Yorum = apps.get_model('onep', 'Yorum')
+    satirlar = Yorum.objects.order_by().values('urun_id').annotate(
+        yorum_sayisi=Count('id'),
+        puan_toplami=Sum('puan'),
+        **{f'puan_{puan}_sayisi': Count('id', filter=Q(puan=puan)) for puan in range(1, 6)}
+    )
+    for satir in satirlar:
+        Urun.objects.filter(id=satir.pop('urun_id')).update(**satir)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='urun',
+            name='puan_1_sayisi',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='1 Puan Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='urun',
+            name='puan_2_sayisi',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='2 Puan Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='urun',
+            name='puan_3_sayisi',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='3 Puan Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='urun',
+            name='puan_4_sayisi',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='4 Puan Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='urun',
+            name='puan_5_sayisi',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='5 Puan Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='urun',
+            name='puan_toplami',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Puan Toplamı'),
+        ),
+        migrations.AddField(
+            model_name='urun',
+            name='yorum_sayisi',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Yorum Sayısı'),
+        ),
+        migrations.RunPython(puan_istatistiklerini_doldur, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:20
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Ağırlıklar: ürün adı (A) > kategori (B) > açıklama (C)
+ARAMA_KURULUM_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION onep_urun_arama_vektoru_guncelle() RETURNS trigger AS $$
+    BEGIN
+        NEW.arama_vektoru :=
+            setweight(to_tsvector('turkish', coalesce(NEW.urun_adi, '')), 'A') ||
+            setweight(to_tsvector('turkish', coalesce(NEW.kategori, '')), 'B') ||
+            setweight(to_tsvector('turkish', coalesce(NEW.aciklama, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS onep_urun_arama_vektoru_trigger ON onep_urun",
+    """
+    CREATE TRIGGER onep_urun_arama_vektoru_trigger
+        BEFORE INSERT OR UPDATE OF urun_adi, kategori, aciklama ON onep_urun
+        FOR EACH ROW EXECUTE FUNCTION onep_urun_arama_vektoru_guncelle()
+    """,
+    # Mevcut satırları doldur (UPDATE OF urun_adi trigger'ı tetikler)
+    "UPDATE onep_urun SET urun_adi = urun_adi",
+    "CREATE INDEX IF NOT EXISTS onep_urun_arama_vektoru_gin ON onep_urun USING gin (arama_vektoru)",
+    "CREATE INDEX IF NOT EXISTS onep_urun_urun_adi_trgm ON onep_urun USING gin (urun_adi gin_trgm_ops)",
+]
+
+ARAMA_KALDIRMA_SQL = [
+    "DROP INDEX IF EXISTS onep_urun_urun_adi_trgm",
+    "DROP INDEX IF EXISTS onep_urun_arama_vektoru_gin",
+    "DROP TRIGGER IF EXISTS onep_urun_arama_vektoru_trigger ON onep_urun",
+    "DROP FUNCTION IF EXISTS onep_urun_arama_vektoru_guncelle()",
+]
+
+
+def arama_altyapisini_kur(apps, schema_editor):
+    """Trigger ve GIN indeksleri sadece PostgreSQL üzerinde oluşturulur"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in ARAMA_KURULUM_SQL:
+        schema_editor.execute(sql)
+
+
+def arama_altyapisini_kaldir(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in ARAMA_KALDIRMA_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0002_urun_puan_istatistikleri'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='urun',
+            name='arama_vektoru',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Arama Vektörü'),
+        ),
+        migrations.RunPython(arama_altyapisini_kur, arama_altyapisini_kaldir),
+    ]
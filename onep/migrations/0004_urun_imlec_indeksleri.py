@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0003_urun_arama_vektoru'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(fields=['olusturulma_tarihi', 'id'], name='urun_tarih_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(fields=['fiyat', 'id'], name='urun_fiyat_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(fields=['urun_adi', 'id'], name='urun_ad_id_idx'),
+        ),
+    ]
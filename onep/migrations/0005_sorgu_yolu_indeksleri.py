@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0004_urun_imlec_indeksleri'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='siparis',
+            index=models.Index(fields=['kullanici', '-siparis_tarihi'], name='siparis_kullanici_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(fields=['kategori', '-olusturulma_tarihi'], name='urun_kategori_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(fields=['kategori', 'fiyat'], name='urun_kategori_fiyat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(condition=models.Q(('stok_adedi__gt', 0)), fields=['-olusturulma_tarihi'], name='urun_stokta_tarih_idx'),
+        ),
+    ]
@@ -0,0 +1,166 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils.text import slugify
+
+# Arama vektörü trigger'ı kategori adını artık onep_kategori tablosundan okur.
+# Kategori adı değişince o kategorideki ürünlerin vektörü de yenilenir.
+ARAMA_TRIGGER_KALDIRMA_SQL = [
+    "DROP TRIGGER IF EXISTS onep_urun_arama_vektoru_trigger ON onep_urun",
+]
+
+ARAMA_TRIGGER_KURULUM_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION onep_urun_arama_vektoru_guncelle() RETURNS trigger AS $$
+    DECLARE
+        kategori_adi text;
+    BEGIN
+        SELECT ad INTO kategori_adi FROM onep_kategori WHERE id = NEW.kategori_id;
+        NEW.arama_vektoru :=
+            setweight(to_tsvector('turkish', coalesce(NEW.urun_adi, '')), 'A') ||
+            setweight(to_tsvector('turkish', coalesce(kategori_adi, '')), 'B') ||
+            setweight(to_tsvector('turkish', coalesce(NEW.aciklama, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER onep_urun_arama_vektoru_trigger
+        BEFORE INSERT OR UPDATE OF urun_adi, kategori_id, aciklama ON onep_urun
+        FOR EACH ROW EXECUTE FUNCTION onep_urun_arama_vektoru_guncelle()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION onep_kategori_adi_degisti() RETURNS trigger AS $$
+    BEGIN
+        UPDATE onep_urun SET kategori_id = kategori_id WHERE kategori_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS onep_kategori_adi_trigger ON onep_kategori",
+    """
+    CREATE TRIGGER onep_kategori_adi_trigger
+        AFTER UPDATE OF ad ON onep_kategori
+        FOR EACH ROW WHEN (OLD.ad IS DISTINCT FROM NEW.ad)
+        EXECUTE FUNCTION onep_kategori_adi_degisti()
+    """,
+    # Mevcut satırları yenile
+    "UPDATE onep_urun SET urun_adi = urun_adi",
+]
+
+ESKI_ARAMA_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS onep_kategori_adi_trigger ON onep_kategori",
+    "DROP FUNCTION IF EXISTS onep_kategori_adi_degisti()",
+    "DROP TRIGGER IF EXISTS onep_urun_arama_vektoru_trigger ON onep_urun",
+]
+
+
+def _postgresql_calistir(sql_listesi):
+    def calistir(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in sql_listesi:
+            schema_editor.execute(sql)
+    return calistir
+
+
+def _eski_trigger_kur(apps, schema_editor):
+    """Geri alma: 0003'teki metin kategorili trigger"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from importlib import import_module
+    arama = import_module('onep.migrations.0003_urun_arama_vektoru')
+    # Fonksiyon, trigger ve vektör doldurma (indeksler zaten mevcut)
+    for sql in arama.ARAMA_KURULUM_SQL[:4]:
+        schema_editor.execute(sql)
+
+
+def kategorileri_olustur(apps, schema_editor):
+    """Metin kategorilerden Kategori kayıtları oluşturur ve ürünleri bağlar"""
+    Kategori = apps.get_model('onep', 'Kategori')
+    Urun = apps.get_model('onep', 'Urun')
+
+    adlar = sorted(set(
+        Urun.objects.exclude(kategori='').values_list('kategori', flat=True)
+    ))
+    kullanilan_sluglar = set()
+    for sira, ad in enumerate(adlar):
+        slug = temel = slugify(ad, allow_unicode=True) or 'kategori'
+        ek = 2
+        while slug in kullanilan_sluglar:
+            slug = f'{temel}-{ek}'
+            ek += 1
+        kullanilan_sluglar.add(slug)
+        kategori = Kategori.objects.create(ad=ad, slug=slug, sira=sira)
+        Urun.objects.filter(kategori=ad).update(kategori_yeni=kategori)
+
+    # Ürün ve stoktaki ürün sayıları
+    for satir in Urun.objects.filter(kategori_yeni__isnull=False).values('kategori_yeni').annotate(
+        urun_sayisi=Count('id'),
+        stokta_urun_sayisi=Count('id', filter=Q(stok_adedi__gt=0)),
+    ):
+        Kategori.objects.filter(id=satir['kategori_yeni']).update(
+            urun_sayisi=satir['urun_sayisi'],
+            stokta_urun_sayisi=satir['stokta_urun_sayisi'],
+        )
+
+
+def kategorileri_metne_dondur(apps, schema_editor):
+    Urun = apps.get_model('onep', 'Urun')
+    for urun in Urun.objects.filter(kategori_yeni__isnull=False).select_related('kategori_yeni'):
+        Urun.objects.filter(id=urun.id).update(kategori=urun.kategori_yeni.ad)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0005_sorgu_yolu_indeksleri'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Kategori',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ad', models.CharField(max_length=100, unique=True, verbose_name='Kategori Adı')),
+                ('slug', models.SlugField(allow_unicode=True, blank=True, help_text='Boş bırakılırsa addan üretilir', max_length=120, unique=True, verbose_name='URL Adı')),
+                ('sira', models.PositiveIntegerField(default=0, verbose_name='Sıra')),
+                ('urun_sayisi', models.PositiveIntegerField(default=0, editable=False, verbose_name='Ürün Sayısı')),
+                ('stokta_urun_sayisi', models.PositiveIntegerField(default=0, editable=False, verbose_name='Stoktaki Ürün Sayısı')),
+                ('ust_kategori', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='alt_kategoriler', to='onep.kategori', verbose_name='Üst Kategori')),
+            ],
+            options={
+                'verbose_name': 'Kategori',
+                'verbose_name_plural': 'Kategoriler',
+                'ordering': ['sira', 'ad'],
+            },
+        ),
+        # Trigger eski kategori kolonuna bağlı; kolon kaldırılmadan önce düşürülür
+        migrations.RunPython(_postgresql_calistir(ARAMA_TRIGGER_KALDIRMA_SQL), _eski_trigger_kur),
+        migrations.AddField(
+            model_name='urun',
+            name='kategori_yeni',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='onep.kategori'),
+        ),
+        migrations.RunPython(kategorileri_olustur, kategorileri_metne_dondur),
+        migrations.RemoveIndex(model_name='urun', name='urun_kategori_tarih_idx'),
+        migrations.RemoveIndex(model_name='urun', name='urun_kategori_fiyat_idx'),
+        migrations.RemoveField(model_name='urun', name='kategori'),
+        migrations.RenameField(model_name='urun', old_name='kategori_yeni', new_name='kategori'),
+        migrations.AlterField(
+            model_name='urun',
+            name='kategori',
+            field=models.ForeignKey(blank=True, help_text='Ürün kategorisi', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='urunler', to='onep.kategori', verbose_name='Kategori'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(fields=['kategori', '-olusturulma_tarihi'], name='urun_kategori_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(fields=['kategori', 'fiyat'], name='urun_kategori_fiyat_idx'),
+        ),
+        migrations.RunPython(
+            _postgresql_calistir(ARAMA_TRIGGER_KURULUM_SQL), _postgresql_calistir(ESKI_ARAMA_TRIGGER_SQL)
+        ),
+    ]
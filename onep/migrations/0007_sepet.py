@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:40
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0006_kategori'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sepet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guncellenme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+                ('kullanici', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sepet', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Sepet',
+                'verbose_name_plural': 'Sepetler',
+            },
+        ),
+        migrations.CreateModel(
+            name='SepetKalemi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('adet', models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Adet')),
+                ('eklenme_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Eklenme Tarihi')),
+                ('sepet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kalemler', to='onep.sepet', verbose_name='Sepet')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sepet_kalemleri', to='onep.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Sepet Kalemi',
+                'verbose_name_plural': 'Sepet Kalemleri',
+                'indexes': [models.Index(fields=['urun', 'adet'], name='sepet_kalemi_urun_adet_idx')],
+                'constraints': [models.UniqueConstraint(fields=('sepet', 'urun'), name='sepet_kalemi_tekil')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0007_sepet'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='siparis',
+            index=models.Index(fields=['kullanici', 'durum', '-siparis_tarihi'], name='siparis_kul_durum_tarih_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:46
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0008_siparis_durum_indeksi'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='siparis',
+            name='urun_adedi',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Ürün Adedi'),
+        ),
+        migrations.AddField(
+            model_name='sipariskalemi',
+            name='resim_url',
+            field=models.URLField(blank=True, null=True, verbose_name='Resim URL'),
+        ),
+        migrations.AddField(
+            model_name='sipariskalemi',
+            name='satir_toplami',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='adet × birim fiyat (TL)', max_digits=12, verbose_name='Satır Toplamı'),
+        ),
+        migrations.AddField(
+            model_name='sipariskalemi',
+            name='urun_adi',
+            field=models.CharField(blank=True, max_length=200, verbose_name='Ürün Adı'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0009_siparis_anlik_goruntuleri'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='yorum',
+            index=models.Index(fields=['urun', '-tarih', '-id'], name='yorum_urun_tarih_id_idx'),
+        ),
+    ]
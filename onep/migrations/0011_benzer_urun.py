@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0010_yorum_sayfalama_indeksi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BenzerUrun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sira', models.PositiveSmallIntegerField(verbose_name='Sıra')),
+                ('kaynak', models.CharField(choices=[('birlikte', 'Birlikte Satın Alınan'), ('kategori', 'Aynı Kategori'), ('populer', 'Popüler')], max_length=10, verbose_name='Kaynak')),
+                ('benzer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='oneren_kayitlar', to='onep.urun', verbose_name='Benzer Ürün')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='benzer_kayitlari', to='onep.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Benzer Ürün',
+                'verbose_name_plural': 'Benzer Ürünler',
+                'constraints': [models.UniqueConstraint(fields=('urun', 'sira'), name='benzer_urun_sira_tekil')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:57
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0011_benzer_urun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UrunSatisOzeti',
+            fields=[
+                ('urun', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='satis_ozeti', serialize=False, to='onep.urun', verbose_name='Ürün')),
+                ('adet', models.PositiveBigIntegerField(default=0, verbose_name='Satılan Adet')),
+                ('ciro', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Ciro')),
+                ('siparis_sayisi', models.PositiveIntegerField(default=0, verbose_name='Sipariş Sayısı')),
+            ],
+            options={
+                'verbose_name': 'Ürün Satış Özeti',
+                'verbose_name_plural': 'Ürün Satış Özetleri',
+            },
+        ),
+        migrations.CreateModel(
+            name='KategoriGunlukSatis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gun', models.DateField(verbose_name='Gün')),
+                ('adet', models.PositiveBigIntegerField(default=0, verbose_name='Satılan Adet')),
+                ('ciro', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Ciro')),
+                ('kategori', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='gunluk_satislar', to='onep.kategori', verbose_name='Kategori')),
+            ],
+            options={
+                'verbose_name': 'Kategori Günlük Satış',
+                'verbose_name_plural': 'Kategori Günlük Satışlar',
+                'constraints': [models.UniqueConstraint(fields=('gun', 'kategori'), name='kategori_gunluk_satis_tekil')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UrunCifti',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('siparis_sayisi', models.PositiveIntegerField(default=0, verbose_name='Sipariş Sayısı')),
+                ('diger', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='onep.urun', verbose_name='Diğer Ürün')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cift_kayitlari', to='onep.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Ürün Çifti',
+                'verbose_name_plural': 'Ürün Çiftleri',
+                'constraints': [models.UniqueConstraint(fields=('urun', 'diger'), name='urun_cifti_tekil')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:59
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onep', '0012_satis_analitigi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GunlukSiparisOzeti',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gun', models.DateField(verbose_name='Gün')),
+                ('durum', models.CharField(choices=[('beklemede', 'Beklemede'), ('hazirlaniyor', 'Hazırlanıyor'), ('kargoda', 'Kargoda'), ('teslim_edildi', 'Teslim Edildi'), ('iptal_edildi', 'İptal Edildi')], max_length=20, verbose_name='Sipariş Durumu')),
+                ('parca', models.PositiveSmallIntegerField(default=0, verbose_name='Parça')),
+                ('siparis_sayisi', models.PositiveIntegerField(default=0, verbose_name='Sipariş Sayısı')),
+                ('urun_adedi', models.PositiveIntegerField(default=0, verbose_name='Ürün Adedi')),
+                ('ciro', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Ciro')),
+            ],
+            options={
+                'verbose_name': 'Günlük Sipariş Özeti',
+                'verbose_name_plural': 'Günlük Sipariş Özetleri',
+                'constraints': [models.UniqueConstraint(fields=('gun', 'durum', 'parca'), name='gunluk_siparis_ozeti_tekil')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GunlukUrunSatisi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gun', models.DateField(verbose_name='Gün')),
+                ('adet', models.PositiveIntegerField(default=0, verbose_name='Satılan Adet')),
+                ('ciro', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Ciro')),
+                ('urun', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gunluk_satislar', to='onep.urun', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Günlük Ürün Satışı',
+                'verbose_name_plural': 'Günlük Ürün Satışları',
+                'constraints': [models.UniqueConstraint(fields=('gun', 'urun'), name='gunluk_urun_satisi_tekil')],
+            },
+        ),
+    ]
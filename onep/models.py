@@ -1,9 +1,67 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils.text import slugify
 from decimal import Decimal
 
 
+class Kategori(models.Model):
+    """Kategori modeli - ürün kategorileri (isteğe bağlı üst kategori ile hiyerarşik)"""
+    
+    ad = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Kategori Adı"
+    )
+    slug = models.SlugField(
+        max_length=120,
+        unique=True,
+        allow_unicode=True,
+        blank=True,
+        verbose_name="URL Adı",
+        help_text="Boş bırakılırsa addan üretilir"
+    )
+    ust_kategori = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        related_name='alt_kategoriler',
+        on_delete=models.SET_NULL,
+        verbose_name="Üst Kategori"
+    )
+    sira = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Sıra"
+    )
+    
+    # Ürün sayıları - ürün kaydedildiğinde/silindiğinde ve stok düşümünde
+    # F() ile güncellenir (bkz. onep/categories.py)
+    urun_sayisi = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Ürün Sayısı"
+    )
+    stokta_urun_sayisi = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Stoktaki Ürün Sayısı"
+    )
+    
+    class Meta:
+        verbose_name = "Kategori"
+        verbose_name_plural = "Kategoriler"
+        ordering = ['sira', 'ad']
+    
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.ad, allow_unicode=True)
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return self.ad
+
+
 class Urun(models.Model):
     """Ürün modeli - e-ticaret platformundaki ürünleri temsil eder"""
     
@@ -28,9 +86,12 @@ class Urun(models.Model):
         verbose_name="Stok Adedi",
         help_text="Mevcut stok miktarı"
     )
-    kategori = models.CharField(
-        max_length=100,
+    kategori = models.ForeignKey(
+        Kategori,
+        null=True,
         blank=True,
+        related_name='urunler',
+        on_delete=models.SET_NULL,
         verbose_name="Kategori",
         help_text="Ürün kategorisi"
     )
@@ -49,15 +110,73 @@ class Urun(models.Model):
         verbose_name="Güncellenme Tarihi"
     )
     
+    # Yorum istatistikleri - Yorum kaydedildiğinde/silindiğinde aynı
+    # transaction içinde güncellenir (bkz. onep/ratings.py)
+    yorum_sayisi = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Yorum Sayısı"
+    )
+    puan_toplami = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Puan Toplamı"
+    )
+    puan_1_sayisi = models.PositiveIntegerField(default=0, editable=False, verbose_name="1 Puan Sayısı")
+    puan_2_sayisi = models.PositiveIntegerField(default=0, editable=False, verbose_name="2 Puan Sayısı")
+    puan_3_sayisi = models.PositiveIntegerField(default=0, editable=False, verbose_name="3 Puan Sayısı")
+    puan_4_sayisi = models.PositiveIntegerField(default=0, editable=False, verbose_name="4 Puan Sayısı")
+    puan_5_sayisi = models.PositiveIntegerField(default=0, editable=False, verbose_name="5 Puan Sayısı")
+    
+    # PostgreSQL tam metin arama vektörü - veritabanı trigger'ı ile güncellenir
+    # (bkz. migrations/0003_urun_arama_vektoru.py, onep/search.py)
+    arama_vektoru = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name="Arama Vektörü"
+    )
+    
     @property
     def is_stokta(self):
         """Ürünün stokta olup olmadığını kontrol eder"""
         return self.stok_adedi > 0
     
+    @property
+    def ortalama_puan(self):
+        """Saklanan istatistiklerden ortalama puanı döndürür (yorum yoksa None)"""
+        if not self.yorum_sayisi:
+            return None
+        return round(self.puan_toplami / self.yorum_sayisi, 1)
+    
+    @property
+    def puan_dagilimi(self):
+        """5'ten 1'e puan histogramı: [{'puan', 'sayi', 'yuzde'}, ...]"""
+        dagilim = []
+        for puan in range(5, 0, -1):
+            sayi = getattr(self, f'puan_{puan}_sayisi')
+            yuzde = round(sayi * 100 / self.yorum_sayisi) if self.yorum_sayisi else 0
+            dagilim.append({'puan': puan, 'sayi': sayi, 'yuzde': yuzde})
+        return dagilim
+    
     class Meta:
         verbose_name = "Ürün"
         verbose_name_plural = "Ürünler"
         ordering = ['-olusturulma_tarihi']
+        indexes = [
+            # İmleç sayfalama: her sıralama anahtarı + id (onep/pagination.py)
+            models.Index(fields=['olusturulma_tarihi', 'id'], name='urun_tarih_id_idx'),
+            models.Index(fields=['fiyat', 'id'], name='urun_fiyat_id_idx'),
+            models.Index(fields=['urun_adi', 'id'], name='urun_ad_id_idx'),
+            # Kategori filtresi + sıralama (liste, benzer ürünler)
+            models.Index(fields=['kategori', '-olusturulma_tarihi'], name='urun_kategori_tarih_idx'),
+            models.Index(fields=['kategori', 'fiyat'], name='urun_kategori_fiyat_idx'),
+            # Sadece stoktaki ürünler (kısmi indeks)
+            models.Index(
+                fields=['-olusturulma_tarihi'],
+                condition=models.Q(stok_adedi__gt=0),
+                name='urun_stokta_tarih_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.urun_adi} - {self.fiyat} TL"
@@ -98,14 +217,26 @@ class Siparis(models.Model):
         default='beklemede',
         verbose_name="Sipariş Durumu"
     )
+    # Sipariş anındaki toplam ürün adedi (kalemler sayılmadan gösterilir)
+    urun_adedi = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Ürün Adedi"
+    )
     
     class Meta:
         verbose_name = "Sipariş"
         verbose_name_plural = "Siparişler"
         ordering = ['-siparis_tarihi']
+        indexes = [
+            # Sipariş geçmişi: kullanıcının siparişleri yeniden eskiye
+            models.Index(fields=['kullanici', '-siparis_tarihi'], name='siparis_kullanici_tarih_idx'),
+            # Sipariş geçmişi durum filtresi: kullanıcı + durum, yeniden eskiye
+            models.Index(fields=['kullanici', 'durum', '-siparis_tarihi'], name='siparis_kul_durum_tarih_idx'),
+        ]
     
     def __str__(self):
-        return f"Sipariş #{self.id} - {self.kullanici.username} - {self.toplam_tutar} TL"
+        return f"Sipariş #{self.id} - {self.toplam_tutar} TL"
 
 
 class SiparisKalemi(models.Model):
@@ -135,18 +266,108 @@ class SiparisKalemi(models.Model):
         verbose_name="Birim Fiyat",
         help_text="Sipariş anındaki ürün fiyatı (TL)"
     )
+    # Sipariş anındaki ürün bilgileri: geçmiş sayfaları Urun'a JOIN yapmaz ve
+    # ürün sonradan değişse/silinse de doğru kalır
+    urun_adi = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Ürün Adı"
+    )
+    resim_url = models.URLField(
+        blank=True,
+        null=True,
+        verbose_name="Resim URL"
+    )
+    satir_toplami = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Satır Toplamı",
+        help_text="adet × birim fiyat (TL)"
+    )
     
     @property
     def toplam_fiyat(self):
         """Bu kalemin toplam fiyatını hesaplar"""
-        return self.miktar * self.birim_fiyat
+        return self.adet * self.birim_fiyat
     
     class Meta:
         verbose_name = "Sipariş Kalemi"
         verbose_name_plural = "Sipariş Kalemleri"
     
+    def save(self, *args, **kwargs):
+        # Tek tek eklenen kalemler (admin vb.); checkout bunları INSERT ... SELECT ile yazar
+        if not self.urun_adi and self.urun_id:
+            self.urun_adi = self.urun.urun_adi
+            self.resim_url = self.urun.resim_url
+        self.satir_toplami = self.toplam_fiyat
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return f"{self.urun_adi} x{self.adet} - {self.satir_toplami} TL"
+
+
+class Sepet(models.Model):
+    """Giriş yapmış kullanıcının kalıcı sepeti (cihazlar arasında paylaşılır)"""
+    
+    kullanici = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='sepet',
+        verbose_name="Kullanıcı"
+    )
+    guncellenme_tarihi = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Güncellenme Tarihi"
+    )
+    
+    class Meta:
+        verbose_name = "Sepet"
+        verbose_name_plural = "Sepetler"
+    
+    def __str__(self):
+        return f"{self.kullanici.username} sepeti"
+
+
+class SepetKalemi(models.Model):
+    """Kalıcı sepetteki ürün ve adedi"""
+    
+    sepet = models.ForeignKey(
+        Sepet,
+        related_name='kalemler',
+        on_delete=models.CASCADE,
+        verbose_name="Sepet"
+    )
+    urun = models.ForeignKey(
+        Urun,
+        related_name='sepet_kalemleri',
+        on_delete=models.CASCADE,
+        verbose_name="Ürün"
+    )
+    adet = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        verbose_name="Adet"
+    )
+    eklenme_tarihi = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Eklenme Tarihi"
+    )
+    
+    class Meta:
+        verbose_name = "Sepet Kalemi"
+        verbose_name_plural = "Sepet Kalemleri"
+        constraints = [
+            # Sepet yükleme (sepet_id ile) ve upsert çakışma hedefi
+            models.UniqueConstraint(fields=['sepet', 'urun'], name='sepet_kalemi_tekil'),
+        ]
+        indexes = [
+            # Ürün talebi: bir ürün kaç sepette, toplam kaç adet
+            models.Index(fields=['urun', 'adet'], name='sepet_kalemi_urun_adet_idx'),
+        ]
+    
     def __str__(self):
-        return f"{self.urun.urun_adi} x{self.miktar} - {self.toplam_fiyat} TL"
+        return f"{self.urun.urun_adi} x{self.adet}"
 
 
 class Yorum(models.Model):
@@ -192,6 +413,207 @@ class Yorum(models.Model):
         ordering = ['-tarih']
         # Bir kullanıcı aynı ürüne sadece bir kez yorum yapabilir
         unique_together = ('urun', 'kullanici')
+        indexes = [
+            # Yorum sayfalama: ürünün yorumları yeniden eskiye (imleç: tarih, id)
+            models.Index(fields=['urun', '-tarih', '-id'], name='yorum_urun_tarih_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kullanici.username} - {self.urun.urun_adi} - {self.puan} yıldız"
+
+
+class BenzerUrun(models.Model):
+    """
+    Önceden hesaplanmış benzer ürün önerileri (bkz. onep/recommendations.py).
+    Her ürün için sıralı ilk N komşu saklanır; detay sayfası tek sorgu ile okur.
+    """
+    
+    KAYNAK_SECENEKLERI = [
+        ('birlikte', 'Birlikte Satın Alınan'),
+        ('kategori', 'Aynı Kategori'),
+        ('populer', 'Popüler'),
+    ]
+    
+    urun = models.ForeignKey(
+        Urun,
+        related_name='benzer_kayitlari',
+        on_delete=models.CASCADE,
+        verbose_name="Ürün"
+    )
+    benzer = models.ForeignKey(
+        Urun,
+        related_name='oneren_kayitlar',
+        on_delete=models.CASCADE,
+        verbose_name="Benzer Ürün"
+    )
+    sira = models.PositiveSmallIntegerField(verbose_name="Sıra")
+    kaynak = models.CharField(
+        max_length=10,
+        choices=KAYNAK_SECENEKLERI,
+        verbose_name="Kaynak"
+    )
+    
+    class Meta:
+        verbose_name = "Benzer Ürün"
+        verbose_name_plural = "Benzer Ürünler"
+        constraints = [
+            # Detay sayfası: WHERE urun_id = ? ORDER BY sira
+            models.UniqueConstraint(fields=['urun', 'sira'], name='benzer_urun_sira_tekil'),
+        ]
+    
+    def __str__(self):
+        return f"{self.urun_id} -> {self.benzer_id} ({self.sira})"
+
+
+class UrunSatisOzeti(models.Model):
+    """Ürün başına satış toplamları (bkz. onep/analytics.py, iptal edilenler hariç)"""
+    
+    urun = models.OneToOneField(
+        Urun,
+        primary_key=True,
+        related_name='satis_ozeti',
+        on_delete=models.CASCADE,
+        verbose_name="Ürün"
+    )
+    adet = models.PositiveBigIntegerField(default=0, verbose_name="Satılan Adet")
+    ciro = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Ciro"
+    )
+    siparis_sayisi = models.PositiveIntegerField(default=0, verbose_name="Sipariş Sayısı")
+    
+    class Meta:
+        verbose_name = "Ürün Satış Özeti"
+        verbose_name_plural = "Ürün Satış Özetleri"
+    
+    def __str__(self):
+        return f"{self.urun_id}: {self.adet} adet - {self.ciro} TL"
+
+
+class KategoriGunlukSatis(models.Model):
+    """Gün × kategori satış toplamları (kategorisiz ürünler için kategori boş)"""
+    
+    gun = models.DateField(verbose_name="Gün")
+    kategori = models.ForeignKey(
+        Kategori,
+        null=True,
+        blank=True,
+        related_name='gunluk_satislar',
+        on_delete=models.CASCADE,
+        verbose_name="Kategori"
+    )
+    adet = models.PositiveBigIntegerField(default=0, verbose_name="Satılan Adet")
+    ciro = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Ciro"
+    )
+    
+    class Meta:
+        verbose_name = "Kategori Günlük Satış"
+        verbose_name_plural = "Kategori Günlük Satışlar"
+        constraints = [
+            models.UniqueConstraint(fields=['gun', 'kategori'], name='kategori_gunluk_satis_tekil'),
+        ]
+    
+    def __str__(self):
+        return f"{self.gun} - {self.kategori_id}: {self.ciro} TL"
+
+
+class UrunCifti(models.Model):
+    """
+    Aynı siparişte birlikte geçen ürün çiftleri. Her çift bir kez, küçük id
+    urun tarafında olacak şekilde saklanır.
+    """
+    
+    urun = models.ForeignKey(
+        Urun,
+        related_name='cift_kayitlari',
+        on_delete=models.CASCADE,
+        verbose_name="Ürün"
+    )
+    diger = models.ForeignKey(
+        Urun,
+        related_name='+',
+        on_delete=models.CASCADE,
+        verbose_name="Diğer Ürün"
+    )
+    siparis_sayisi = models.PositiveIntegerField(default=0, verbose_name="Sipariş Sayısı")
+    
+    class Meta:
+        verbose_name = "Ürün Çifti"
+        verbose_name_plural = "Ürün Çiftleri"
+        constraints = [
+            models.UniqueConstraint(fields=['urun', 'diger'], name='urun_cifti_tekil'),
+        ]
+    
+    def __str__(self):
+        return f"{self.urun_id} + {self.diger_id}: {self.siparis_sayisi}"
+
+
+class GunlukSiparisOzeti(models.Model):
+    """
+    Gün × durum sipariş toplamları (bkz. onep/daily_sales.py). Checkout ve
+    durum değişikliklerinde artımlı güncellenir; admin özet ekranı sadece
+    bu tabloyu ve GunlukUrunSatisi'ni okur. Her gün × durum, eşzamanlı
+    checkout'lar aynı satırın kilidini beklemesin diye parçalara bölünür
+    (sipariş id'sine göre); okuyanlar parçaları toplar.
+    """
+    
+    gun = models.DateField(verbose_name="Gün")
+    durum = models.CharField(
+        max_length=20,
+        choices=Siparis.DURUM_SECENEKLERI,
+        verbose_name="Sipariş Durumu"
+    )
+    parca = models.PositiveSmallIntegerField(default=0, verbose_name="Parça")
+    siparis_sayisi = models.PositiveIntegerField(default=0, verbose_name="Sipariş Sayısı")
+    urun_adedi = models.PositiveIntegerField(default=0, verbose_name="Ürün Adedi")
+    ciro = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Ciro"
+    )
+    
+    class Meta:
+        verbose_name = "Günlük Sipariş Özeti"
+        verbose_name_plural = "Günlük Sipariş Özetleri"
+        constraints = [
+            models.UniqueConstraint(fields=['gun', 'durum', 'parca'], name='gunluk_siparis_ozeti_tekil'),
+        ]
+    
+    def __str__(self):
+        return f"{self.gun} - {self.durum} #{self.parca}: {self.siparis_sayisi} sipariş"
+
+
+class GunlukUrunSatisi(models.Model):
+    """Gün × ürün satış toplamları (iptal edilen siparişler hariç)"""
+    
+    gun = models.DateField(verbose_name="Gün")
+    urun = models.ForeignKey(
+        Urun,
+        related_name='gunluk_satislar',
+        on_delete=models.CASCADE,
+        verbose_name="Ürün"
+    )
+    adet = models.PositiveIntegerField(default=0, verbose_name="Satılan Adet")
+    ciro = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Ciro"
+    )
+    
+    class Meta:
+        verbose_name = "Günlük Ürün Satışı"
+        verbose_name_plural = "Günlük Ürün Satışları"
+        constraints = [
+            models.UniqueConstraint(fields=['gun', 'urun'], name='gunluk_urun_satisi_tekil'),
+        ]
     
     def __str__(self):
-        return f"{self.kullanici.username} - {self.urun.urun_adi} - {self.puan} yıldız"
\ No newline at end of file
+        return f"{self.gun} - {self.urun_id}: {self.adet} adet"
@@ -0,0 +1,185 @@
+"""
+ONEP İmleç (Keyset) Sayfalama
+Paginator her istekte COUNT(*) çalıştırır ve OFFSET kullanır; derin
+sayfalarda maliyet doğrusal artar. İmleç modunda son gösterilen satırın
+sıralama anahtarı ve id'si imlece yazılır, sonraki sayfa
+
+    WHERE (anahtar > v) OR (anahtar = v AND id > son_id)  ORDER BY anahtar, id
+
+ile okunur; (anahtar, id) bileşik indeksleri sayesinde sayfa derinliğinden
+bağımsızdır. Sayım yapılmaz, bir fazla satır okunarak sonraki sayfa olup
+olmadığı anlaşılır.
+
+Ürün listesinde sadece IMLEC_SIRALAMALARI'ndaki sıralamalar desteklenir;
+alaka ve puan gibi hesaplanan sıralamalar sayfa numarası modunda kalır.
+Katalog API'si bunlar için ofset_ile_sayfala() kullanır: imleç sadece
+konumu taşır, sayım yine yapılmaz.
+Diğer listeler (ör. sipariş geçmişi) anahtar_ile_sayfala() ile alanı doğrudan
+verir.
+
+Admin listeleri numaralı sayfalamada kalır; TahminiSayimliPaginator filtresiz
+büyük tablolarda COUNT(*) yerine PostgreSQL'in pg_class.reltuples tahminini
+kullanır (ANALYZE / autovacuum ile güncellenir, tam sayı değildir).
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+# siralama -> (alan, azalan_mi); id her zaman eşitlik bozucu olarak eklenir
+IMLEC_SIRALAMALARI = {
+    '-olusturulma_tarihi': ('olusturulma_tarihi', True),
+    'fiyat_artan': ('fiyat', False),
+    'fiyat_azalan': ('fiyat', True),
+    'isim_artan': ('urun_adi', False),
+    'isim_azalan': ('urun_adi', True),
+}
+
+
+def imlec_destekleniyor(siralama):
+    return siralama in IMLEC_SIRALAMALARI
+
+
+def _imlec_kodla(deger, son_id):
+    veri = json.dumps([str(deger), son_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(veri.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _imlec_coz(imlec, alan):
+    """Geçersiz imleçler için None döner (ilk sayfa gösterilir)"""
+    try:
+        dolgu = '=' * (-len(imlec) % 4)
+        deger, son_id = json.loads(base64.urlsafe_b64decode(imlec + dolgu))
+        return alan.to_python(deger), int(son_id)
+    except (binascii.Error, ValueError, TypeError, ValidationError):
+        return None
+
+
+class ImlecSayfasi:
+    """
+    Tek bir imleç sayfası. Şablonlarda Page gibi gezilebilir; sayfa
+    numarası yerine sonraki_url / sonraki_imlec sağlar.
+    """
+
+    def __init__(self, object_list, sonraki_imlec, params):
+        self.object_list = object_list
+        self.sonraki_imlec = sonraki_imlec
+        self._params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.sonraki_imlec is not None
+
+    @property
+    def sonraki_url(self):
+        if self.sonraki_imlec is None:
+            return None
+        params = self._params.copy()
+        params.pop('page', None)
+        params['imlec'] = self.sonraki_imlec
+        return f'?{params.urlencode()}'
+
+
+def anahtar_ile_sayfala(sorgu, alan_adi, azalan, imlec, sayfa_boyutu, params):
+    """
+    sorgu queryset'ini (alan_adi, id) anahtarına göre sıralayıp imleçten
+    sonraki sayfa_boyutu kadar satırını ImlecSayfasi olarak döndürür. params
+    sonraki sayfa bağlantısı için kullanılan GET parametreleridir (QueryDict).
+    """
+    alan = sorgu.model._meta.get_field(alan_adi)
+    on_ek = '-' if azalan else ''
+    karsilastirma = 'lt' if azalan else 'gt'
+
+    sorgu = sorgu.order_by(f'{on_ek}{alan_adi}', f'{on_ek}id')
+    cozulmus = _imlec_coz(imlec, alan) if imlec else None
+    if cozulmus is not None:
+        deger, son_id = cozulmus
+        sorgu = sorgu.filter(
+            Q(**{f'{alan_adi}__{karsilastirma}': deger}) |
+            Q(**{alan_adi: deger, f'id__{karsilastirma}': son_id})
+        )
+
+    satirlar = list(sorgu[:sayfa_boyutu + 1])
+    sonraki_imlec = None
+    if len(satirlar) > sayfa_boyutu:
+        satirlar = satirlar[:sayfa_boyutu]
+        son = satirlar[-1]
+        sonraki_imlec = _imlec_kodla(getattr(son, alan_adi), son.id)
+
+    return ImlecSayfasi(satirlar, sonraki_imlec, params)
+
+
+def imlec_ile_sayfala(urunler, siralama, imlec, sayfa_boyutu, params):
+    """Ürünleri IMLEC_SIRALAMALARI'ndaki bir sıralama ile imleç sayfalar"""
+    alan_adi, azalan = IMLEC_SIRALAMALARI[siralama]
+    return anahtar_ile_sayfala(urunler, alan_adi, azalan, imlec, sayfa_boyutu, params)
+
+
+def ofset_ile_sayfala(sorgu, imlec, sayfa_boyutu, params):
+    """
+    Anahtarla sayfalanamayan (hesaplanan) sıralamalar için OFFSET ile
+    sayfalar ve ImlecSayfasi döndürür; imleç sadece konumu taşır. Sıra
+    kararlı olsun diye id eşitlik bozucu olarak eklenir.
+    """
+    ofset = 0
+    if imlec:
+        try:
+            dolgu = '=' * (-len(imlec) % 4)
+            ofset = max(0, int(json.loads(base64.urlsafe_b64decode(imlec + dolgu))[0]))
+        except (binascii.Error, ValueError, TypeError, IndexError, KeyError):
+            ofset = 0
+
+    sorgu = sorgu.order_by(*(sorgu.query.order_by or sorgu.model._meta.ordering), '-id')
+    satirlar = list(sorgu[ofset:ofset + sayfa_boyutu + 1])
+    sonraki_imlec = None
+    if len(satirlar) > sayfa_boyutu:
+        satirlar = satirlar[:sayfa_boyutu]
+        veri = json.dumps([ofset + sayfa_boyutu])
+        sonraki_imlec = base64.urlsafe_b64encode(veri.encode('utf-8')).decode('ascii').rstrip('=')
+
+    return ImlecSayfasi(satirlar, sonraki_imlec, params)
+
+
+# Bu sayının altındaki tahminlere güvenilmez (küçük / hiç ANALYZE edilmemiş tablo)
+TAHMINI_SAYIM_ESIGI = 100000
+
+
+def tablo_satir_tahmini(sorgu):
+    """
+    Filtresiz queryset için PostgreSQL satır tahmini; tahmin yoksa, sorgu
+    filtreliyse veya veritabanı PostgreSQL değilse None.
+    """
+    if not isinstance(sorgu, QuerySet) or sorgu.query.where or sorgu.query.distinct:
+        return None
+    baglanti = connections[sorgu.db]
+    if baglanti.vendor != 'postgresql':
+        return None
+    with baglanti.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [baglanti.ops.quote_name(sorgu.model._meta.db_table)],
+        )
+        satir = cursor.fetchone()
+    # Hiç ANALYZE edilmemiş tabloda reltuples -1'dir
+    return satir[0] if satir and satir[0] >= 0 else None
+
+
+class TahminiSayimliPaginator(Paginator):
+    """Filtresiz ve büyük tablolarda sayımı tahminden alan Paginator (admin listeleri)"""
+
+    @cached_property
+    def count(self):
+        tahmin = tablo_satir_tahmini(self.object_list)
+        if tahmin is not None and tahmin >= TAHMINI_SAYIM_ESIGI:
+            return tahmin
+        return super().count
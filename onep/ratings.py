@@ -0,0 +1,65 @@
+"""
+ONEP Yorum İstatistikleri
+Urun üzerindeki yorum sayısı / puan toplamı / puan histogramı alanlarının bakımı.
+
+Tekil değişiklikler F() ifadeleriyle artımlı olarak uygulanır; toplu yeniden
+hesaplama tek bir gruplanmış sorgu ve bulk_update ile yapılır.
+"""
+from django.db.models import Count, F, Q, Sum
+
+from .models import Urun, Yorum
+
+PUAN_ALANLARI = [f'puan_{puan}_sayisi' for puan in range(1, 6)]
+ISTATISTIK_ALANLARI = ['yorum_sayisi', 'puan_toplami'] + PUAN_ALANLARI
+
+
+def puan_istatistigi_uygula(urun_id, puan, fark):
+    """
+    Tek bir yorumun etkisini ürün istatistiklerine uygular.
+    fark=+1 yorum eklendiğinde, fark=-1 yorum silindiğinde kullanılır.
+    """
+    Urun.objects.filter(id=urun_id).update(**{
+        'yorum_sayisi': F('yorum_sayisi') + fark,
+        'puan_toplami': F('puan_toplami') + fark * puan,
+        f'puan_{puan}_sayisi': F(f'puan_{puan}_sayisi') + fark,
+    })
+
+
+def puan_istatistiklerini_yeniden_hesapla(urun_ids=None, batch_size=500):
+    """
+    Yorum tablosundan istatistikleri baştan hesaplar.
+    urun_ids verilmezse tüm ürünler işlenir. Güncellenen ürün sayısını döndürür.
+    """
+    yorumlar = Yorum.objects.all()
+    urunler = Urun.objects.all()
+    if urun_ids is not None:
+        yorumlar = yorumlar.filter(urun_id__in=urun_ids)
+        urunler = urunler.filter(id__in=urun_ids)
+
+    # Tek gruplanmış sorgu ile tüm ürünlerin istatistikleri
+    istatistikler = {
+        satir.pop('urun_id'): satir
+        for satir in yorumlar.order_by().values('urun_id').annotate(
+            yorum_sayisi=Count('id'),
+            puan_toplami=Sum('puan'),
+            **{f'puan_{puan}_sayisi': Count('id', filter=Q(puan=puan)) for puan in range(1, 6)}
+        )
+    }
+
+    bos = {alan: 0 for alan in ISTATISTIK_ALANLARI}
+    guncellenecekler = []
+    guncellenen = 0
+    for urun in urunler.only('id', *ISTATISTIK_ALANLARI).iterator(chunk_size=batch_size):
+        for alan, deger in istatistikler.get(urun.id, bos).items():
+            setattr(urun, alan, deger)
+        guncellenecekler.append(urun)
+        if len(guncellenecekler) >= batch_size:
+            Urun.objects.bulk_update(guncellenecekler, ISTATISTIK_ALANLARI)
+            guncellenen += len(guncellenecekler)
+            guncellenecekler = []
+
+    if guncellenecekler:
+        Urun.objects.bulk_update(guncellenecekler, ISTATISTIK_ALANLARI)
+        guncellenen += len(guncellenecekler)
+
+    return guncellenen
@@ -0,0 +1,121 @@
+"""
+ONEP Benzer Ürün Önerileri
+Öneriler istek sırasında hesaplanmaz: rebuild_related_products komutu
+(cron ile periyodik çalıştırılır) her ürün için ilk BENZER_URUN_SAYISI
+komşuyu BenzerUrun tablosuna yazar. Adaylar sırayla:
+
+  1. birlikte  -- aynı siparişlerde en sık birlikte alınan ürünler
+  2. kategori  -- aynı kategorideki popüler ürünler
+  3. populer   -- tüm katalogdaki popüler ürünler
+
+Sadece stoktaki ürünler önerilir. Popülerlik satılan toplam adettir
+(eşitlikte yorum sayısı, sonra yenilik).
+
+Detay sayfası benzer_urunler() ile tek bir indeksli sorgu yapar. Ürün için
+henüz kayıt yoksa (komut yeni ürünü görmediyse) aynı kategorideki popüler
+ürünlere düşülür.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import BenzerUrun, SiparisKalemi, Urun
+
+BENZER_URUN_SAYISI = 4
+
+# _related_products.html kartının kullandığı kolonlar
+KART_ALANLARI = ('id', 'urun_adi', 'fiyat', 'resim_url')
+
+
+def _populer_sira():
+    """Stoktaki ürünler popülerlik sırasıyla: ([(id, kategori_id)], tüm ürün id'leri)"""
+    satislar = dict(
+        SiparisKalemi.objects.order_by().values('urun_id').annotate(toplam=Sum('adet')).values_list('urun_id', 'toplam')
+    )
+    urunler = list(
+        Urun.objects.order_by().values_list('id', 'kategori_id', 'stok_adedi', 'yorum_sayisi', 'olusturulma_tarihi')
+    )
+    stokta = sorted(
+        (urun for urun in urunler if urun[2] > 0),
+        key=lambda urun: (satislar.get(urun[0], 0), urun[3], urun[4], urun[0]),
+        reverse=True,
+    )
+    return [(urun[0], urun[1]) for urun in stokta], [urun[0] for urun in urunler]
+
+
+def _birlikte_alinanlar(stokta_idler):
+    """{urun_id: [benzer_id, ...]} -- birlikte alındığı sipariş sayısına göre azalan"""
+    ciftler = (
+        SiparisKalemi.objects.order_by()
+        .values('urun_id', benzer_id=F('siparis__kalemler__urun_id'))
+        .annotate(siparis_sayisi=Count('siparis_id', distinct=True))
+        .values_list('urun_id', 'benzer_id', 'siparis_sayisi')
+    )
+    komsular = defaultdict(list)
+    for urun_id, benzer_id, siparis_sayisi in ciftler.iterator(chunk_size=2000):
+        if urun_id != benzer_id and benzer_id in stokta_idler:
+            komsular[urun_id].append((siparis_sayisi, benzer_id))
+    return {
+        urun_id: [benzer_id for _, benzer_id in sorted(adaylar, key=lambda aday: (-aday[0], aday[1]))]
+        for urun_id, adaylar in komsular.items()
+    }
+
+
+def benzer_urunleri_yeniden_hesapla(n=BENZER_URUN_SAYISI, batch_size=1000):
+    """
+    BenzerUrun tablosunu baştan oluşturur (tek transaction).
+    (ürün sayısı, yazılan kayıt sayısı) döndürür.
+    """
+    populer, tum_idler = _populer_sira()
+    stokta_idler = {urun_id for urun_id, _ in populer}
+    kategori_populer = defaultdict(list)
+    for urun_id, kategori_id in populer:
+        if kategori_id is not None:
+            kategori_populer[kategori_id].append(urun_id)
+    kategoriler = dict(Urun.objects.order_by().values_list('id', 'kategori_id'))
+    birlikte = _birlikte_alinanlar(stokta_idler)
+
+    kayitlar = []
+    for urun_id in tum_idler:
+        secilen = []
+        gorulen = {urun_id}
+        kaynaklar = (
+            ('birlikte', birlikte.get(urun_id, ())),
+            ('kategori', kategori_populer.get(kategoriler[urun_id], ())),
+            ('populer', (aday for aday, _ in populer)),
+        )
+        for kaynak, adaylar in kaynaklar:
+            for aday in adaylar:
+                if len(secilen) >= n:
+                    break
+                if aday not in gorulen:
+                    gorulen.add(aday)
+                    secilen.append((aday, kaynak))
+        kayitlar.extend(
+            BenzerUrun(urun_id=urun_id, benzer_id=benzer_id, sira=sira, kaynak=kaynak)
+            for sira, (benzer_id, kaynak) in enumerate(secilen)
+        )
+
+    with transaction.atomic():
+        BenzerUrun.objects.all().delete()
+        BenzerUrun.objects.bulk_create(kayitlar, batch_size=batch_size)
+    return len(tum_idler), len(kayitlar)
+
+
+def benzer_urunler(urun, n=BENZER_URUN_SAYISI):
+    """Detay sayfası için önerilen ürünler (stokta olanlar, kart kolonlarıyla)"""
+    onerilen = list(
+        Urun.objects.filter(oneren_kayitlar__urun_id=urun.id, stok_adedi__gt=0)
+        .order_by('oneren_kayitlar__sira')
+        .only(*KART_ALANLARI)[:n]
+    )
+    if onerilen or BenzerUrun.objects.filter(urun_id=urun.id).exists() or not urun.kategori_id:
+        return onerilen
+    # Henüz hesaplanmamış ürün: aynı kategorideki popüler ürünler
+    return list(
+        Urun.objects.filter(kategori_id=urun.kategori_id, stok_adedi__gt=0)
+        .exclude(id=urun.id)
+        .order_by('-yorum_sayisi', '-olusturulma_tarihi')
+        .only(*KART_ALANLARI)[:n]
+    )
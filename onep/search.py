@@ -0,0 +1,51 @@
+"""
+ONEP Ürün Arama Motoru
+PostgreSQL üzerinde tsvector (turkish) + GIN indeksi ve pg_trgm ile yazım
+hatası toleranslı arama; diğer veritabanlarında (testlerde SQLite) icontains
+tabanlı yedek arama kullanılır.
+
+Her iki yol da queryset'e 'alaka' skoru ekler, böylece filtre/sıralama/sayfalama
+zincirine aynı şekilde bağlanır.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+ARAMA_YAPILANDIRMASI = 'turkish'
+
+
+def urunleri_ara(urunler, arama):
+    """Queryset'i arama terimine göre filtreler ve 'alaka' alanı ekler"""
+    arama = (arama or '').strip()
+    if not arama:
+        return urunler
+
+    if connections[urunler.db].vendor == 'postgresql':
+        return _tam_metin_arama(urunler, arama)
+    return _basit_arama(urunler, arama)
+
+
+def _tam_metin_arama(urunler, arama):
+    """tsvector eşleşmesi VEYA ürün adında trigram benzerliği (yazım hataları için)"""
+    sorgu = SearchQuery(arama, config=ARAMA_YAPILANDIRMASI, search_type='websearch')
+    return urunler.filter(
+        Q(arama_vektoru=sorgu) | Q(urun_adi__trigram_similar=arama)
+    ).annotate(
+        alaka=SearchRank(F('arama_vektoru'), sorgu) + TrigramSimilarity('urun_adi', arama)
+    )
+
+
+def _basit_arama(urunler, arama):
+    """Veritabanından bağımsız yedek arama - ad > kategori > açıklama ağırlıklı"""
+    return urunler.filter(
+        Q(urun_adi__icontains=arama) |
+        Q(aciklama__icontains=arama) |
+        Q(kategori__ad__icontains=arama)
+    ).annotate(
+        alaka=Case(
+            When(urun_adi__icontains=arama, then=Value(1.0)),
+            When(kategori__ad__icontains=arama, then=Value(0.4)),
+            default=Value(0.1),
+            output_field=FloatField(),
+        )
+    )
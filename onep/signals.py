@@ -0,0 +1,122 @@
+"""
+ONEP Sinyal Alıcıları
+Model değişikliklerine bağlı denormalize alanların bakımı.
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .caching import urunleri_gecersiz_kil
+from .categories import kategori_sayaci_uygula
+from .daily_sales import siparis_ozetini_guncelle, siparisi_ozetten_dus
+from .models import Kategori, Siparis, Urun, Yorum
+from .ratings import puan_istatistigi_uygula
+
+
+@receiver(pre_save, sender=Yorum)
+def yorum_onceki_durumu_sakla(sender, instance, raw=False, **kwargs):
+    """Düzenlenen yorumun eski ürün/puan bilgisini sakla (admin düzenlemeleri için)"""
+    instance._onceki_durum = None
+    if instance.pk and not raw:
+        instance._onceki_durum = (
+            Yorum.objects.filter(pk=instance.pk).values_list('urun_id', 'puan').first()
+        )
+
+
+@receiver(post_save, sender=Yorum)
+def yorum_kaydedildi(sender, instance, created, raw=False, **kwargs):
+    """Yeni yorumu ürün istatistiklerine ekle, düzenlenen yorumun farkını uygula"""
+    if raw:
+        # Fixture yüklemelerinde istatistikler rebuild_rating_stats ile hesaplanır
+        return
+
+    onceki_durum = getattr(instance, '_onceki_durum', None)
+    if not created and onceki_durum:
+        # Yorum metni değişmiş olabilir - ürün sayfası her durumda geçersiz
+        urunleri_gecersiz_kil({onceki_durum[0], instance.urun_id})
+        if onceki_durum == (instance.urun_id, instance.puan):
+            return
+        puan_istatistigi_uygula(onceki_durum[0], onceki_durum[1], -1)
+    else:
+        urunleri_gecersiz_kil([instance.urun_id])
+
+    puan_istatistigi_uygula(instance.urun_id, instance.puan, +1)
+
+
+@receiver(post_delete, sender=Yorum)
+def yorum_silindi(sender, instance, **kwargs):
+    """Silinen yorumu ürün istatistiklerinden düş"""
+    puan_istatistigi_uygula(instance.urun_id, instance.puan, -1)
+    urunleri_gecersiz_kil([instance.urun_id])
+
+
+@receiver(pre_save, sender=Urun)
+def urun_onceki_durumu_sakla(sender, instance, raw=False, **kwargs):
+    """Düzenlenen ürünün eski kategori/stok durumunu sakla (kategori sayıları için)"""
+    instance._onceki_kategori_durumu = None
+    if instance.pk and not raw:
+        onceki = Urun.objects.filter(pk=instance.pk).values_list('kategori_id', 'stok_adedi').first()
+        if onceki:
+            instance._onceki_kategori_durumu = (onceki[0], onceki[1] > 0)
+
+
+@receiver(post_save, sender=Urun)
+@receiver(post_delete, sender=Urun)
+def urun_degisti(sender, instance, raw=False, **kwargs):
+    """Ürün eklendi/düzenlendi/silindi - ürün ve katalog önbelleklerini geçersiz kıl"""
+    urunleri_gecersiz_kil([instance.pk])
+
+
+@receiver(post_save, sender=Urun)
+def urun_kategori_sayilarini_guncelle(sender, instance, created, raw=False, **kwargs):
+    """Kategori ürün/stoktaki ürün sayılarına farkı uygula"""
+    if raw:
+        # Fixture yüklemelerinde sayılar rebuild_category_counts ile hesaplanır
+        return
+
+    yeni = (instance.kategori_id, instance.stok_adedi > 0)
+    onceki = getattr(instance, '_onceki_kategori_durumu', None)
+    if onceki == yeni:
+        return
+    if onceki:
+        kategori_sayaci_uygula(onceki[0], -1, -int(onceki[1]))
+    kategori_sayaci_uygula(yeni[0], +1, int(yeni[1]))
+    instance._onceki_kategori_durumu = yeni
+
+
+@receiver(post_delete, sender=Urun)
+def urun_kategori_sayisindan_dus(sender, instance, **kwargs):
+    """Silinen ürünü kategori sayılarından düş"""
+    kategori_sayaci_uygula(instance.kategori_id, -1, -int(instance.stok_adedi > 0))
+
+
+@receiver(post_save, sender=Kategori)
+@receiver(pre_delete, sender=Kategori)
+def kategori_degisti(sender, instance, created=False, raw=False, **kwargs):
+    """Kategori ağacı ve kategori adı gösteren sayfalar katalog sürümüne bağlı"""
+    urunleri_gecersiz_kil([])
+
+
+@receiver(pre_save, sender=Siparis)
+def siparis_onceki_durumu_sakla(sender, instance, raw=False, **kwargs):
+    """Düzenlenen siparişin eski durum/adet/tutarını sakla (günlük özetler için)"""
+    instance._onceki_ozet = None
+    if instance.pk and not raw:
+        instance._onceki_ozet = (
+            Siparis.objects.filter(pk=instance.pk).values_list('durum', 'urun_adedi', 'toplam_tutar').first()
+        )
+
+
+@receiver(post_save, sender=Siparis)
+def siparis_kaydedildi(sender, instance, created, raw=False, **kwargs):
+    """Durum/tutar değişikliğini günlük özetlere yansıt (yeni siparişler checkout'ta eklenir)"""
+    onceki = getattr(instance, '_onceki_ozet', None)
+    if created or raw or not onceki:
+        return
+    siparis_ozetini_guncelle(instance, onceki)
+    instance._onceki_ozet = (instance.durum, instance.urun_adedi, instance.toplam_tutar)
+
+
+@receiver(pre_delete, sender=Siparis)
+def siparis_siliniyor(sender, instance, **kwargs):
+    """Silinen siparişi günlük özetlerden düş (kalemler henüz silinmedi)"""
+    siparisi_ozetten_dus(instance)
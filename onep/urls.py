@@ -2,12 +2,18 @@
 ONEP Uygulama URL Yapılandırması
 """
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     # Ana sayfa ve ürün sayfaları
     path('', views.product_list_view, name='product_list'),
     path('product/<int:id>/', views.product_detail_view, name='product_detail'),
+    path('product/<int:id>/reviews/', views.urun_yorumlari, name='product_reviews'),
+    
+    # Katalog JSON API (salt okunur, AJAX filtreleme)
+    path('api/products/', api.urun_listesi, name='api_product_list'),
+    path('api/products/facets/', api.facetler, name='api_product_facets'),
+    path('api/products/<int:id>/', api.urun_detayi, name='api_product_detail'),
     
     # Health check endpoint (veritabanı bağlantısı kullanmaz)
     path('health/', views.health_check, name='health_check'),
@@ -24,6 +30,7 @@ urlpatterns = [
     path('cart/add/<int:urun_id>/', views.sepete_ekle, name='sepete_ekle'),
     path('cart/remove/<int:urun_id>/', views.sepetten_sil, name='sepetten_sil'),
     path('cart/update/<int:urun_id>/', views.sepet_guncelle, name='sepet_guncelle'),
+    path('cart/batch/', views.sepet_toplu_guncelle, name='sepet_toplu_guncelle'),
     path('cart/clear/', views.sepet_bosalt, name='sepet_bosalt'),
     path('cart/validate/', views.sepet_dogrula, name='sepet_dogrula'),
     
@@ -2,32 +2,35 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse, Http404
-from django.views.decorators.http import require_POST
+from django.http import JsonResponse, HttpResponse, Http404, QueryDict
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET, require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.cache import never_cache
 from django.core.paginator import Paginator
-from django.db.models import Q, Avg, Prefetch
+from django.db.models import F, FloatField, Prefetch
+from django.db.models.functions import Cast, NullIf
 from django.db import transaction
-from django.core.cache import cache
-from decimal import Decimal
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.functional import SimpleLazyObject
+from datetime import datetime, timedelta
 import json
 import time
 import os
 
 from .models import Urun, Siparis, SiparisKalemi, Yorum
 from .forms import KullaniciKayitFormu, KullaniciGirisFormu, YorumFormu
-
-
-def clear_user_cache(request):
-    """Kullanıcıya özel cache'leri temizle"""
-    cache_patterns = [
-        "products_list_*",
-        "product_detail_*", 
-        "product_categories"
-    ]
-    for pattern in cache_patterns:
-        cache.delete(pattern)
+from .cart import (
+    SepetIslemHatasi, giriste_sepetleri_birlestir, sepete_toplu_uygula, sepeti_fiyatlandir, sepeti_kaydet,
+    sepet_urunlerini_yukle,
+)
+from .checkout import StokYetersizHatasi, siparis_olustur
+from .caching import katalog_anahtari, onbellek, onbellekli_parca, urun_anahtari
+from .conditional import kosullu_katalog_gorunumu
+from .pagination import anahtar_ile_sayfala, imlec_destekleniyor, imlec_ile_sayfala
+from .recommendations import benzer_urunler
+from .facets import facetleri_getir, filtreleri_ayristir, filtreleri_uygula
 
 
 def health_check(request):
@@ -48,74 +51,64 @@ def health_check(request):
     return HttpResponse("OK")
 
 
-def sepet_hesapla(sepet):
-    """Sepet toplamlarını hesaplar"""
-    toplam_tutar = Decimal('0.00')
-    
-    for urun_id, miktar in sepet.items():
-        try:
-            urun = Urun.objects.get(id=urun_id)
-            ara_toplam = urun.fiyat * miktar
-            toplam_tutar += ara_toplam
-        except Urun.DoesNotExist:
-            pass
-    
-    kdv_orani = Decimal('0.18')
-    kdv_tutari = (toplam_tutar * kdv_orani).quantize(Decimal('0.01'))
-    genel_toplam = (toplam_tutar + kdv_tutari).quantize(Decimal('0.01'))
+def sepet_hesapla(sepet, request=None):
+    """Sepet toplamlarını hesaplar (AJAX yanıtları için float değerler)"""
+    fiyatlar = sepeti_fiyatlandir(sepet, request)
     
     return {
-        'toplam_tutar': float(toplam_tutar),
-        'kdv_tutari': float(kdv_tutari),
-        'genel_toplam': float(genel_toplam)
+        'toplam_tutar': float(fiyatlar['toplam_tutar']),
+        'kdv_tutari': float(fiyatlar['kdv_tutari']),
+        'genel_toplam': float(fiyatlar['genel_toplam'])
     }
 
 
-def product_list_view(request):
-    """Ürün listeleme sayfası - OPTIMIZE EDİLDİ"""
-    # Sepet verisi olmayan sayfalar için cache key oluştur
-    cache_key = f"products_list_{request.GET.urlencode()}"
-    
-    # Sadece anonim kullanıcılar ve boş sepet durumunda cache kullan
-    sepet = request.session.get('sepet', {})
-    can_use_cache = not sepet and not request.user.is_authenticated
-    
-    # Cache'den kontrol et (sadece güvenli durumlarda)
-    if can_use_cache:
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
-    
-    # Query optimization: Yorumları da önceden yükle
-    urunler = Urun.objects.prefetch_related(
-        Prefetch('yorumlar', queryset=Yorum.objects.select_related('kullanici'))
-    ).order_by('-olusturulma_tarihi')
-    
-    # Arama fonksiyonu
-    arama = request.GET.get('arama')
-    if arama:
-        urunler = urunler.filter(
-            Q(urun_adi__icontains=arama) | 
-            Q(aciklama__icontains=arama) |
-            Q(kategori__icontains=arama)
-        )
+def sepet_ozeti(sepet, request=None):
+    """Toplu sepet yanıtı: sepet adedi, toplamlar ve kalem başına miktar/ara toplam"""
+    fiyatlar = sepeti_fiyatlandir(sepet, request)
+    return {
+        'cart_count': fiyatlar['toplam_adet'],
+        'toplam_tutar': float(fiyatlar['toplam_tutar']),
+        'kdv_tutari': float(fiyatlar['kdv_tutari']),
+        'genel_toplam': float(fiyatlar['genel_toplam']),
+        'kalemler': {
+            str(kalem['urun'].id): {'miktar': kalem['miktar'], 'ara_toplam': float(kalem['ara_toplam'])}
+            for kalem in fiyatlar['kalemler']
+        },
+    }
+
+
+# Ürün grid'inin (_product_grid.html) render ettiği kolonlar + sıralama/imleç
+# alanları. Puan ortalaması ve yorum sayısı Urun üzerindeki istatistiklerden
+# okunur, yorumlar yüklenmez.
+LISTE_ALANLARI = (
+    'id', 'urun_adi', 'aciklama', 'fiyat', 'stok_adedi', 'kategori', 'resim_url',
+    'olusturulma_tarihi', 'yorum_sayisi', 'puan_toplami', 'kategori__ad', 'kategori__slug',
+)
+
+
+def urun_listesi_sorgusu(params):
+    """
+    GET parametrelerinden (arama, kategori, fiyat aralığı, sıralama) ürün
+    queryset'ini kurar. Queryset tembeldir; çağırmak veritabanına gitmez.
+    (urunler, siralama, filtreler) döndürür; filtreler filtreleri_ayristir()
+    çıktısıdır.
+    """
+    urunler = (
+        Urun.objects.select_related('kategori').only(*LISTE_ALANLARI)
+        .order_by('-olusturulma_tarihi')
+    )
     
-    # Kategori filtresi
-    kategori = request.GET.get('kategori')
-    if kategori:
-        urunler = urunler.filter(kategori=kategori)
-    
-    # Fiyat filtresi
-    min_fiyat = request.GET.get('min_fiyat')
-    max_fiyat = request.GET.get('max_fiyat')
-    if min_fiyat:
-        urunler = urunler.filter(fiyat__gte=min_fiyat)
-    if max_fiyat:
-        urunler = urunler.filter(fiyat__lte=max_fiyat)
-    
-    # Sıralama
-    siralama = request.GET.get('siralama', '-olusturulma_tarihi')
-    if siralama == 'fiyat_artan':
+    # Arama (PostgreSQL'de tam metin arama, diğerlerinde icontains), kategori
+    # (slug veya ad; alt kategoriler dahil) ve fiyat filtreleri
+    filtreler = filtreleri_ayristir(params)
+    urunler = filtreleri_uygula(urunler, filtreler)
+    arama = filtreler['arama']
+    
+    # Sıralama - arama yapıldıysa varsayılan olarak alaka düzeyine göre
+    siralama = params.get('siralama') or ('alaka' if arama else '-olusturulma_tarihi')
+    if siralama == 'alaka' and arama:
+        urunler = urunler.order_by('-alaka', '-olusturulma_tarihi')
+    elif siralama == 'fiyat_artan':
         urunler = urunler.order_by('fiyat')
     elif siralama == 'fiyat_azalan':
         urunler = urunler.order_by('-fiyat')
@@ -123,87 +116,164 @@ def product_list_view(request):
         urunler = urunler.order_by('urun_adi')
     elif siralama == 'isim_azalan':
         urunler = urunler.order_by('-urun_adi')
+    elif siralama == 'puan_azalan':
+        # Saklanan istatistiklerden ortalama - satır başına aggregate yok
+        urunler = urunler.annotate(
+            ortalama=Cast('puan_toplami', FloatField()) / NullIf(F('yorum_sayisi'), 0)
+        ).order_by(F('ortalama').desc(nulls_last=True), '-yorum_sayisi')
     else:
         urunler = urunler.order_by('-olusturulma_tarihi')
     
-    # Sayfalama
-    paginator = Paginator(urunler, 12)  # Sayfa başına 12 ürün
-    sayfa_numarasi = request.GET.get('page')
-    sayfa_urunleri = paginator.get_page(sayfa_numarasi)
-    
-    # Kategoriler listesi - Cache ile optimize et
-    kategoriler_cache_key = "product_categories"
-    kategoriler = cache.get(kategoriler_cache_key)
-    if not kategoriler:
-        kategoriler = list(set(Urun.objects.values_list('kategori', flat=True).exclude(kategori='')))
-        cache.set(kategoriler_cache_key, kategoriler, 3600)  # 1 saat cache
+    return urunler, siralama, filtreler
+
+
+@kosullu_katalog_gorunumu('product_list')
+def product_list_view(request):
+    """
+    Ürün listeleme sayfası - OPTIMIZE EDİLDİ
+    Ürün grid'i (sayfalama dahil) HTML parçası olarak önbelleğe alınır; sepet
+    rozeti, kullanıcı menüsü ve mesajlar her istekte taze render edilir, bu
+    yüzden giriş yapmış ve sepeti dolu kullanıcılar da önbellekten yararlanır.
+    """
+    urunler, siralama, filtreler = urun_listesi_sorgusu(request.GET)
+    arama = request.GET.get('arama')
+    # Eski bağlantılardaki kategori adları slug'a çevrilir
+    kategori = filtreler['kategori']
+    # Grid ve kenar çubuğu aynı facet sayılarını kullanır - bir kez okunur
+    facetler = SimpleLazyObject(lambda: facetleri_getir(filtreler))
+    
+    # Sayfalama - sadece grid önbellekte yoksa çalışır. Sonsuz kaydırma imleç
+    # (keyset) modunu kullanır: ?sayfalama=imlec veya ?imlec=...
+    imlec_modu = (
+        (request.GET.get('sayfalama') == 'imlec' or 'imlec' in request.GET)
+        and imlec_destekleniyor(siralama)
+    )
+    if imlec_modu:
+        sayfa_urunleri = SimpleLazyObject(
+            lambda: imlec_ile_sayfala(urunler, siralama, request.GET.get('imlec'), 12, request.GET)
+        )
+    else:
+        sayfa_urunleri = SimpleLazyObject(
+            lambda: Paginator(urunler, 12).get_page(request.GET.get('page'))  # Sayfa başına 12 ürün
+        )
     
     context = {
         'urunler': sayfa_urunleri,
-        'categories': kategoriler,
         'arama': arama,
         'secili_kategori': kategori,
         'secili_siralama': siralama,
+        'imlec_modu': imlec_modu,
     }
     
-    # AJAX isteği kontrolü
+    # Katalog sürümü anahtara katılır - ürün değişince eski girdiler okunmaz.
+    # Facet sayıları (fiyat aralıkları, stok) grid'in üstünde gösterilir;
+    # sonsuz kaydırmanın sonraki sayfaları sadece ürünleri ekler
+    grid = onbellekli_parca(
+        request,
+        katalog_anahtari('product_grid', request.GET.urlencode()),
+        '_product_grid.html',
+        lambda: dict(context, facetler=None if request.GET.get('imlec') else facetler),
+        600,  # 10 dakika cache
+    )
+    
+    # AJAX isteği ise sadece ürün grid'ini döndür
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        # AJAX isteği ise sadece ürün grid'ini döndür
-        response = render(request, '_product_grid.html', context)
-        # AJAX response'u cache'leme (sadece güvenli durumlarda)
-        if can_use_cache:
-            cache.set(f"{cache_key}_ajax", response, 300)  # 5 dakika
-        return response
+        return HttpResponse(grid)
     
-    # Normal response'u cache'le (sadece güvenli durumlarda)
-    response = render(request, 'product_list.html', context)
-    if can_use_cache:
-        cache.set(cache_key, response, 600)  # 10 dakika cache
-    return response
+    # Kategori kenar çubuğu - mevcut aramadaki ürün sayılarıyla
+    context.update({
+        'facetler': facetler,
+        'urun_grid_parcasi': grid,
+    })
+    return render(request, 'product_list.html', context)
+
 
+YORUM_SAYFA_BOYUTU = 10
 
+
+def yorum_sayfasi(urun_id, imlec=None):
+    """
+    Ürünün yorumlarından bir imleç sayfası (yeniden eskiye). Sadece yorum
+    kartlarının gösterdiği kolonlar yüklenir.
+    """
+    yorumlar = Yorum.objects.filter(urun_id=urun_id).select_related('kullanici').only(
+        'id', 'puan', 'yorum_metni', 'tarih',
+        'kullanici', 'kullanici__username', 'kullanici__first_name', 'kullanici__last_name',
+    )
+    return anahtar_ile_sayfala(yorumlar, 'tarih', True, imlec, YORUM_SAYFA_BOYUTU, QueryDict())
+
+
+@kosullu_katalog_gorunumu('product_detail')
 def product_detail_view(request, id):
-    """Ürün detay sayfası - OPTIMIZE EDİLDİ"""
-    # Cache key ile ürün detayını cache'le
-    cache_key = f"product_detail_{id}"
-    cached_product = cache.get(cache_key)
-    
-    if cached_product:
-        return cached_product
-    
-    # Select_related ve prefetch_related ile optimize et
-    urun = get_object_or_404(
-        Urun.objects.prefetch_related('yorumlar__kullanici'), 
-        id=id
+    """
+    Ürün detay sayfası - OPTIMIZE EDİLDİ
+    Ürün gövdesi, yorum listesi ve benzer ürünler HTML parçaları olarak
+    önbelleğe alınır; kullanıcıya özel kısımlar her istekte taze render edilir.
+    """
+    # Ürün ve katalog sürümü anahtara katılır
+    urun_cache_key = urun_anahtari('urun', id)
+    urun = onbellek.get(urun_cache_key)
+    if urun is None:
+        urun = get_object_or_404(Urun.objects.select_related('kategori'), id=id)
+        onbellek.set(urun_cache_key, urun, 900)  # 15 dakika cache
+    
+    detay_parcasi = onbellekli_parca(
+        request,
+        urun_anahtari('product_detail_body', id),
+        '_product_detail_body.html',
+        lambda: {
+            'product': urun,
+            # Ortalama puan - Urun üzerinde saklanan istatistiklerden
+            'ortalama_puan': urun.ortalama_puan,
+            'puan_dagilimi': urun.puan_dagilimi,
+        },
+        900,  # 15 dakika cache
     )
     
-    # Ürün yorumları - zaten prefetch edildi
-    yorumlar = urun.yorumlar.all()
-    
-    # Ortalama puan hesaplama
-    ortalama_puan = yorumlar.aggregate(ort=Avg('puan'))['ort']
-    if ortalama_puan:
-        ortalama_puan = round(ortalama_puan, 1)
+    # Sadece ilk yorum sayfası; sonrakiler urun_yorumlari ile
+    yorumlar_parcasi = onbellekli_parca(
+        request,
+        urun_anahtari('product_reviews', id),
+        '_product_reviews.html',
+        lambda: {'reviews': yorum_sayfasi(id), 'product_id': id},
+        900,
+    )
     
-    # Benzer ürünler (aynı kategoriden) - Cache ile
-    benzer_cache_key = f"related_products_{urun.kategori}_{id}"
-    benzer_urunler = cache.get(benzer_cache_key)
-    if not benzer_urunler:
-        benzer_urunler = Urun.objects.filter(
-            kategori=urun.kategori
-        ).exclude(id=urun.id)[:4]
-        cache.set(benzer_cache_key, benzer_urunler, 1800)  # 30 dakika
+    # Benzer ürünler: rebuild_related_products ile önceden hesaplanır
+    benzer_urunler_parcasi = onbellekli_parca(
+        request,
+        katalog_anahtari('related_products', urun.kategori_id, id),
+        '_related_products.html',
+        lambda: {'related_products': benzer_urunler(urun)},
+        1800,  # 30 dakika
+    )
     
     context = {
         'product': urun,
-        'reviews': yorumlar,
-        'ortalama_puan': ortalama_puan,
-        'related_products': benzer_urunler,
+        'detay_parcasi': detay_parcasi,
+        'yorumlar_parcasi': yorumlar_parcasi,
+        'benzer_urunler_parcasi': benzer_urunler_parcasi,
     }
-    
-    response = render(request, 'product_detail.html', context)
-    cache.set(cache_key, response, 900)  # 15 dakika cache
-    return response
+    return render(request, 'product_detail.html', context)
+
+
+@require_GET
+def urun_yorumlari(request, id):
+    """
+    Yorumların sonraki sayfaları (AJAX): {"html": "...", "sonraki": "<imleç>"}
+    Her sayfa ürün sürümüne bağlı anahtarla önbelleğe alınır.
+    """
+    imlec = request.GET.get('imlec', '')
+    anahtar = urun_anahtari('product_reviews_sayfa', id, imlec)
+    veri = onbellek.get(anahtar)
+    if veri is None:
+        sayfa = yorum_sayfasi(id, imlec)
+        veri = {
+            'html': render_to_string('_review_items.html', {'reviews': sayfa}),
+            'sonraki': sayfa.sonraki_imlec,
+        }
+        onbellek.set(anahtar, veri, 900)
+    return JsonResponse(veri)
 
 
 def signup_view(request):
@@ -221,7 +291,9 @@ def signup_view(request):
             username = form.cleaned_data.get('username')
             print(f"DEBUG - User {username} created successfully")
             messages.success(request, f'{username} için hesap başarıyla oluşturuldu!')
+            anonim_sepet = request.session.get('sepet', {})
             login(request, kullanici)
+            giriste_sepetleri_birlestir(request, anonim_sepet)
             print(f"DEBUG - User logged in, redirecting...")
             return redirect('product_list')
         else:
@@ -255,7 +327,10 @@ def login_view(request):
             
             if kullanici is not None:
                 print(f"DEBUG - Authentication successful for {username}")
+                # login() önceki kullanıcının session'ını temizleyebilir; sepet önce alınır
+                anonim_sepet = request.session.get('sepet', {})
                 login(request, kullanici)
+                giriste_sepetleri_birlestir(request, anonim_sepet)
                 messages.success(request, f'Hoş geldin {username}!')
                 next_page = request.GET.get('next', 'product_list')
                 print(f"DEBUG - Redirecting to: {next_page}")
@@ -316,53 +391,85 @@ def profile_edit_view(request):
     return render(request, 'profile_edit.html', context)
 
 
+SIPARIS_SAYFA_BOYUTU = 10
+
+
+def _gun_baslangici(deger, gun_ekle=0):
+    """'YYYY-MM-DD' -> o günün (yerel saat) başlangıcı; geçersizse None"""
+    try:
+        tarih = parse_date(deger or '')
+    except ValueError:
+        tarih = None
+    if tarih is None:
+        return None
+    return timezone.make_aware(datetime.combine(tarih + timedelta(days=gun_ekle), datetime.min.time()))
+
+
 @login_required
 def order_history_view(request):
-    """Kullanıcının sipariş geçmişi"""
-    siparisler = Siparis.objects.filter(kullanici=request.user).order_by('-siparis_tarihi')
-    return render(request, 'order_history.html', {'siparisler': siparisler})
+    """
+    Kullanıcının sipariş geçmişi: siparis_tarihi'ne göre imleç sayfalama,
+    isteğe bağlı durum ve tarih aralığı (?durum=&baslangic=&bitis=) filtresi.
+    Kalemler sayfa başına tek sorguda, sadece gösterilen kolonlarla yüklenir;
+    ürün adı ve resmi kalemdeki anlık görüntüden okunur (Urun'a JOIN yok).
+    """
+    siparisler = Siparis.objects.filter(kullanici=request.user).only(
+        'id', 'siparis_tarihi', 'toplam_tutar', 'durum', 'urun_adedi'
+    )
+
+    durum = request.GET.get('durum', '')
+    if durum not in dict(Siparis.DURUM_SECENEKLERI):
+        durum = ''
+    if durum:
+        siparisler = siparisler.filter(durum=durum)
+    baslangic = _gun_baslangici(request.GET.get('baslangic'))
+    if baslangic:
+        siparisler = siparisler.filter(siparis_tarihi__gte=baslangic)
+    bitis = _gun_baslangici(request.GET.get('bitis'), gun_ekle=1)
+    if bitis:
+        siparisler = siparisler.filter(siparis_tarihi__lt=bitis)
+
+    siparisler = siparisler.prefetch_related(Prefetch(
+        'kalemler',
+        queryset=SiparisKalemi.objects.only(
+            'id', 'siparis_id', 'adet', 'birim_fiyat', 'urun_adi', 'resim_url', 'satir_toplami'
+        ).order_by('id'),
+    ))
+    sayfa = anahtar_ile_sayfala(
+        siparisler, 'siparis_tarihi', True, request.GET.get('imlec'), SIPARIS_SAYFA_BOYUTU, request.GET
+    )
+
+    context = {
+        'siparisler': sayfa,
+        'durum_secenekleri': Siparis.DURUM_SECENEKLERI,
+        'secili_durum': durum,
+        'baslangic': request.GET.get('baslangic', '') if baslangic else '',
+        'bitis': request.GET.get('bitis', '') if bitis else '',
+        'ilk_sayfa': not request.GET.get('imlec'),
+    }
+    return render(request, 'order_history.html', context)
 
 
 @never_cache
 def sepet_goruntule(request):
     """Sepet görüntüleme sayfası - ASLA CACHE'LENMESIN"""
     sepet = request.session.get('sepet', {})
-    sepet_urunleri = []
-    toplam_tutar = Decimal('0.00')
     
-    for urun_id, miktar in sepet.items():
-        try:
-            urun = Urun.objects.get(id=urun_id)
-            ara_toplam = urun.fiyat * miktar
-            toplam_tutar += ara_toplam
-            
-            # Ürün resim URL'sini context'e ekle
-            resim_url = None
-            if urun.resim_url:
-                resim_url = urun.resim_url
-                
-            sepet_urunleri.append({
-                'urun': urun,
-                'miktar': miktar,
-                'ara_toplam': ara_toplam,
-                'resim_url': resim_url
-            })
-        except Urun.DoesNotExist:
-            # Silinmiş ürünü sepetten kaldır
-            del sepet[urun_id]
-            request.session['sepet'] = sepet
+    # Tüm sepet ürünleri tek sorguda yüklenir
+    fiyatlar = sepeti_fiyatlandir(sepet, request)
     
-    # Vergi ve genel toplam hesapla
-    kdv_orani = Decimal('0.18')
-    kdv_tutari = (toplam_tutar * kdv_orani).quantize(Decimal('0.01'))
-    genel_toplam = (toplam_tutar + kdv_tutari).quantize(Decimal('0.01'))
+    if fiyatlar['eksik_urun_idleri']:
+        # Silinmiş ürünleri sepetten kaldır
+        for urun_id in fiyatlar['eksik_urun_idleri']:
+            del sepet[urun_id]
+        sepeti_kaydet(request, sepet)
 
     context = {
-        'sepet_urunleri': sepet_urunleri,
-        'toplam_tutar': toplam_tutar,
-        'kdv_tutari': kdv_tutari,
-        'genel_toplam': genel_toplam,
-        'sepet_bos': len(sepet_urunleri) == 0
+        'sepet_urunleri': fiyatlar['kalemler'],
+        'toplam_tutar': fiyatlar['toplam_tutar'],
+        'kdv_tutari': fiyatlar['kdv_tutari'],
+        'genel_toplam': fiyatlar['genel_toplam'],
+        'sepet_bos': len(fiyatlar['kalemler']) == 0
     }
     return render(request, 'cart.html', context)
 
@@ -400,10 +507,8 @@ def sepete_ekle(request, urun_id):
     
     # Sepete ekle
     sepet[urun_id_str] = mevcut_miktar + 1
-    request.session['sepet'] = sepet
+    sepeti_kaydet(request, sepet)
     
-    # Cache temizleme (sepet değiştiğinde)
-    clear_user_cache(request)
     
     # Sepet toplam ürün sayısını hesapla
     toplam_urun = sum(sepet.values())
@@ -421,7 +526,7 @@ def sepete_ekle(request, urun_id):
 
 @never_cache
 def sepetten_sil(request, urun_id):
-    """Ürünü sepetten tamamen silen ve session'ı kaydeden güçlendirilmiş fonksiyon"""
+    """Ürünü sepetten tamamen silen fonksiyon"""
     sepet = request.session.get('sepet', {})
     urun_id_str = str(urun_id)
     
@@ -432,21 +537,14 @@ def sepetten_sil(request, urun_id):
         if urun_id_str in sepet:
             urun = get_object_or_404(Urun, id=urun_id)
             del sepet[urun_id_str]
-            request.session['sepet'] = sepet
-            # Session değişikliklerini anında kaydet
-            request.session.modified = True
-            
-            # Session'ı anında disk'e yazma
-            request.session.save()
-            
-            # Cache temizleme (sepet değiştiğinde)
-            clear_user_cache(request)
+            # Session yanıt dönerken (sadece değiştiği için) kaydedilir
+            sepeti_kaydet(request, sepet)
             
             print(f"Ürün silindi, yeni sepet: {request.session.get('sepet', {})}")
             
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 # Sepet toplamlarını hesapla
-                sepet_toplam = sepet_hesapla(sepet)
+                sepet_toplam = sepet_hesapla(sepet, request)
                 
                 return JsonResponse({
                     'success': True,
@@ -534,21 +632,22 @@ def sepet_guncelle(request, urun_id):
                             })
                 
                 if yeni_miktar > 0:
-                    # Stok kontrolü
-                    urun = get_object_or_404(Urun, id=urun_id)
+                    # Stok kontrolü - sepetin tüm ürünleri tek sorguda yüklenir,
+                    # aşağıdaki sepet_hesapla aynı istek içi kopyaları kullanır
+                    urun = sepet_urunlerini_yukle(sepet.keys(), request).get(urun_id)
+                    if urun is None:
+                        raise Http404('Ürün bulunamadı')
                     if yeni_miktar <= urun.stok_adedi:
                         sepet[urun_id_str] = yeni_miktar
-                        request.session['sepet'] = sepet
+                        sepeti_kaydet(request, sepet)
                         
-                        # Cache temizleme (sepet değiştiğinde)
-                        clear_user_cache(request)
                         
                         # Yeni toplam hesapla
                         yeni_toplam = urun.fiyat * yeni_miktar
                         
                         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                             # Sepet toplamlarını hesapla
-                            sepet_toplam = sepet_hesapla(sepet)
+                            sepet_toplam = sepet_hesapla(sepet, request)
                             
                             return JsonResponse({
                                 'success': True,
@@ -575,11 +674,11 @@ def sepet_guncelle(request, urun_id):
                 else:
                     # Miktar 0 ise ürünü sil
                     del sepet[urun_id_str]
-                    request.session['sepet'] = sepet
+                    sepeti_kaydet(request, sepet)
                     
                     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                         # Sepet toplamlarını hesapla
-                        sepet_toplam = sepet_hesapla(sepet)
+                        sepet_toplam = sepet_hesapla(sepet, request)
                         
                         return JsonResponse({
                             'success': True,
@@ -619,16 +718,48 @@ def sepet_guncelle(request, urun_id):
 
 @require_POST
 @never_cache
-def sepet_bosalt(request):
-    """Sepeti tamamen boşaltma - ASLA CACHE'LENMESIN"""
-    request.session['sepet'] = {}
+def sepet_toplu_guncelle(request):
+    """
+    Toplu sepet güncelleme - cart-ajax.js hızlı tıklamaları biriktirip tek
+    istekte gönderir. Gövde (JSON):
+        {"islemler": [{"urun_id": 5, "islem": "add", "miktar": 1}, ...]}
+    İşlemler tek stok sorgusu ile doğrulanır ve hep birlikte uygulanır; hata
+    varsa sepet değişmez ve mevcut sepet özeti döner.
+    """
+    try:
+        islemler = json.loads(request.body)['islemler']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'success': False, 'message': 'Geçersiz istek!'}, status=400)
     
-    # Session değişikliklerini anında kaydet
-    request.session.modified = True
-    request.session.save()
+    sepet = request.session.get('sepet', {})
+    try:
+        yeni_sepet = sepete_toplu_uygula(sepet, islemler, request)
+    except SepetIslemHatasi as hata:
+        return JsonResponse({
+            'success': False,
+            'message': hata.hatalar[0]['message'],
+            'hatalar': hata.hatalar,
+            **sepet_ozeti(sepet, request),
+        })
+    
+    # Session sadece sepet değiştiyse yazılır
+    if yeni_sepet != sepet:
+        sepeti_kaydet(request, yeni_sepet)
     
-    # Cache temizleme (sepet boşaltıldığında)
-    clear_user_cache(request)
+    return JsonResponse({
+        'success': True,
+        'message': 'Sepet güncellendi!',
+        **sepet_ozeti(yeni_sepet, request),
+    })
+
+
+@require_POST
+@never_cache
+def sepet_bosalt(request):
+    """Sepeti tamamen boşaltma - ASLA CACHE'LENMESIN"""
+    # Zaten boşsa session'a yazma
+    if request.session.get('sepet'):
+        sepeti_kaydet(request, {})
     
     return JsonResponse({
         'success': True,
@@ -643,12 +774,10 @@ def sepet_dogrula(request):
     sepet = request.session.get('sepet', {})
     degisti = False
     
-    # Geçerli ürünleri kontrol et
+    # Geçerli ürünleri tek sorguda kontrol et
+    mevcut_urunler = sepet_urunlerini_yukle(sepet.keys(), request)
     for urun_id in list(sepet.keys()):
-        try:
-            urun = Urun.objects.get(id=int(urun_id))
-            # Ürün mevcut, bir şey yapma
-        except Urun.DoesNotExist:
+        if int(urun_id) not in mevcut_urunler:
             # Ürün veritabanında yoksa sepetten kaldır
             del sepet[urun_id]
             degisti = True
@@ -660,9 +789,7 @@ def sepet_dogrula(request):
             degisti = True
     
     if degisti:
-        request.session['sepet'] = sepet
-        request.session.modified = True
-        request.session.save()
+        sepeti_kaydet(request, sepet)
     
     return JsonResponse({
         'changed': degisti,
@@ -677,80 +804,46 @@ def checkout_view(request):
     
     if not sepet:
         messages.error(request, 'Sepetiniz boş!')
-        return redirect('sepet_goruntule')
+        return redirect('cart')
     
     if request.method == 'POST':
         try:
-            with transaction.atomic():
-                # Sepetteki ürünlerin güncel stok durumunu kontrol et
-                sepet_urunleri = []
-                toplam_tutar = Decimal('0.00')
-                
-                for urun_id, miktar in sepet.items():
-                    urun = get_object_or_404(Urun, id=urun_id)
-                    
-                    # Stok kontrolü
-                    if urun.stok_adedi < miktar:
-                        messages.error(
-                            request,
-                            f'{urun.urun_adi} için yeterli stok yok! '
-                            f'Stokta {urun.stok_adedi} adet var.'
-                        )
-                        return redirect('sepet_goruntule')
-                    
-                    sepet_urunleri.append({
-                        'urun': urun,
-                        'miktar': miktar,
-                        'birim_fiyat': urun.fiyat
-                    })
-                    toplam_tutar += urun.fiyat * miktar
-                
-                # Sipariş oluştur
-                siparis = Siparis.objects.create(
-                    kullanici=request.user,
-                    toplam_tutar=toplam_tutar
-                )
-                
-                # Sipariş kalemlerini oluştur ve stokları güncelle
-                for sepet_urun in sepet_urunleri:
-                    SiparisKalemi.objects.create(
-                        siparis=siparis,
-                        urun=sepet_urun['urun'],
-                        miktar=sepet_urun['miktar'],
-                        birim_fiyat=sepet_urun['birim_fiyat']
+            # Stok düşümü koşullu F() güncellemeleriyle, kalemler bulk_create ile
+            siparis = siparis_olustur(request.user, sepet)
+        except StokYetersizHatasi as hata:
+            for kalem in hata.basarisiz_kalemler:
+                if kalem['urun_adi'] is None:
+                    messages.error(request, 'Sepetinizdeki bir ürün artık satışta değil!')
+                else:
+                    messages.error(
+                        request,
+                        f"{kalem['urun_adi']} için yeterli stok yok! "
+                        f"Stokta {kalem['mevcut']} adet var."
                     )
-                    
-                    # Stok güncelle
-                    sepet_urun['urun'].stok_adedi -= sepet_urun['miktar']
-                    sepet_urun['urun'].save()
-                
-                # Sepeti temizle
-                request.session['sepet'] = {}
-                
-                messages.success(request, 'Siparişiniz başarıyla oluşturuldu!')
-                return redirect('order_confirmation', siparis_id=siparis.id)
-                
+            return redirect('cart')
         except Exception as e:
             messages.error(request, 'Sipariş oluşturulurken bir hata oluştu!')
-            return redirect('sepet_goruntule')
+            return redirect('cart')
+        
+        # Sepeti temizle (kalıcı sepet siparis_olustur içinde boşaltıldı)
+        sepeti_kaydet(request, {}, kalici=False)
+        
+        messages.success(request, 'Siparişiniz başarıyla oluşturuldu!')
+        return redirect('order_confirmation', siparis_id=siparis.id)
     
     # GET request - checkout sayfasını göster
-    sepet_urunleri = []
-    toplam_tutar = Decimal('0.00')
-    
-    for urun_id, miktar in sepet.items():
-        urun = get_object_or_404(Urun, id=urun_id)
-        urun_toplam = urun.fiyat * miktar
-        sepet_urunleri.append({
-            'urun': urun,
-            'miktar': miktar,
-            'toplam': urun_toplam
-        })
-        toplam_tutar += urun_toplam
+    fiyatlar = sepeti_fiyatlandir(sepet, request)
+    if fiyatlar['eksik_urun_idleri']:
+        raise Http404('Sepetteki bir ürün bulunamadı')
+    
+    sepet_urunleri = [
+        {'urun': kalem['urun'], 'miktar': kalem['miktar'], 'toplam': kalem['ara_toplam']}
+        for kalem in fiyatlar['kalemler']
+    ]
     
     context = {
         'sepet_urunleri': sepet_urunleri,
-        'toplam_tutar': toplam_tutar,
+        'toplam_tutar': fiyatlar['toplam_tutar'],
     }
     return render(request, 'checkout.html', context)
 
@@ -759,7 +852,7 @@ def checkout_view(request):
 def order_confirmation_view(request, siparis_id):
     """Sipariş onay sayfası"""
     siparis = get_object_or_404(
-        Siparis.objects.select_related('kullanici').prefetch_related('kalemler__urun'),
+        Siparis.objects.only('id', 'kullanici_id', 'siparis_tarihi', 'toplam_tutar', 'durum', 'urun_adedi'),
         id=siparis_id,
         kullanici=request.user
     )
@@ -801,13 +894,15 @@ def yorum_ekle(request, urun_id):
                 'message': 'Yorum metni boş olamaz!'
             })
         
-        # Yorum oluştur
-        Yorum.objects.create(
-            urun=urun,
-            kullanici=request.user,
-            puan=puan,
-            yorum_metni=yorum_metni
-        )
+        # Yorum oluştur - ürün puan istatistikleri aynı transaction içinde
+        # post_save sinyali ile güncellenir
+        with transaction.atomic():
+            Yorum.objects.create(
+                urun=urun,
+                kullanici=request.user,
+                puan=puan,
+                yorum_metni=yorum_metni
+            )
         
         return JsonResponse({
             'success': True,
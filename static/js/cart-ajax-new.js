@@ -85,6 +85,161 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // --- Toplu sepet güncelleme ------------------------------------------------
+    // Hızlı tıklamalar BEKLEME_SURESI boyunca biriktirilir ve tek istekte
+    // /cart/batch/ adresine gönderilir; sunucu tüm stokları tek sorguda kontrol
+    // eder ve sepeti bir kez fiyatlandırır. Aynı anda tek istek uçuştadır.
+    // Ekran iyimser güncellendiği için kuyruk sayfadan ayrılırken de boşaltılır:
+    // bağlantılar (ödeme, sepet) kuyruk gönderildikten sonra açılır, sayfa
+    // kapanırken kalanlar keepalive isteği ile gönderilir.
+    const TOPLU_SEPET_URL = '/cart/batch/';
+    const BEKLEME_SURESI = 400;
+    let bekleyenIslemler = [];
+    let bekleyenMesajlar = new Set();
+    let zamanlayici = null;
+    let gonderiliyor = false;
+    let aktifIstek = Promise.resolve();
+
+    function topluIstek(islemler, keepalive) {
+        return fetch(TOPLU_SEPET_URL, {
+            method: 'POST',
+            keepalive: keepalive,
+            headers: {
+                'X-CSRFToken': csrftoken,
+                'X-Requested-With': 'XMLHttpRequest',
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ islemler: islemler })
+        });
+    }
+
+    function sepetIslemiEkle(islem, basariMesaji) {
+        bekleyenIslemler.push(islem);
+        if (basariMesaji) {
+            bekleyenMesajlar.add(basariMesaji);
+        }
+        clearTimeout(zamanlayici);
+        zamanlayici = setTimeout(topluGonder, BEKLEME_SURESI);
+    }
+
+    function topluGonder() {
+        if (gonderiliyor || !bekleyenIslemler.length) {
+            return;
+        }
+        const islemler = bekleyenIslemler;
+        const mesajlar = bekleyenMesajlar;
+        bekleyenIslemler = [];
+        bekleyenMesajlar = new Set();
+        gonderiliyor = true;
+
+        aktifIstek = topluIstek(islemler, false)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Server error: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (data.success) {
+                mesajlar.forEach(mesaj => showToast(mesaj));
+            } else {
+                showToast(data.message || 'Güncelleme başarısız', 'danger');
+            }
+            // Bekleyen tıklamalar varsa ekranı onların yanıtı günceller
+            if (!bekleyenIslemler.length) {
+                sepetGorunumunuGuncelle(data);
+            }
+        })
+        .catch(error => {
+            console.error('Sepet güncelleme hatası:', error);
+            showToast('Ağ hatası: ' + error.message, 'danger');
+        })
+        .finally(() => {
+            gonderiliyor = false;
+            if (bekleyenIslemler.length) {
+                clearTimeout(zamanlayici);
+                zamanlayici = setTimeout(topluGonder, BEKLEME_SURESI);
+            }
+        });
+    }
+
+    // Kuyruk ve uçuştaki istek bitene kadar bekler (beklemeden hemen gönderir)
+    async function kuyruguBosalt() {
+        while (gonderiliyor || bekleyenIslemler.length) {
+            if (!gonderiliyor) {
+                clearTimeout(zamanlayici);
+                topluGonder();
+            }
+            await aktifIstek;
+        }
+    }
+
+    // Sayfa kapanırken yanıt beklenemez: kalan işlemler keepalive ile gider
+    function kuyruguKeepaliveIleGonder() {
+        if (!bekleyenIslemler.length) {
+            return;
+        }
+        clearTimeout(zamanlayici);
+        topluIstek(bekleyenIslemler, true).catch(() => {});
+        bekleyenIslemler = [];
+        bekleyenMesajlar = new Set();
+    }
+
+    window.addEventListener('pagehide', kuyruguKeepaliveIleGonder);
+    document.addEventListener('visibilitychange', function() {
+        if (document.visibilityState === 'hidden') {
+            kuyruguKeepaliveIleGonder();
+        }
+    });
+
+    // Ödeme / sepet gibi bağlantılar son sepet durumunu görmeli
+    document.addEventListener('click', function(e) {
+        const link = e.target.closest('a[href]');
+        if (!link || !(gonderiliyor || bekleyenIslemler.length)) {
+            return;
+        }
+        if (e.defaultPrevented || e.button !== 0 || e.metaKey || e.ctrlKey || e.shiftKey
+                || (link.target && link.target !== '_self') || link.getAttribute('href').startsWith('#')) {
+            return;
+        }
+        e.preventDefault();
+        kuyruguBosalt().then(() => {
+            window.location.href = link.href;
+        });
+    });
+
+    // Sunucudaki sepet durumunu ekrana yansıt (miktarlar, ara toplamlar, özet)
+    function sepetGorunumunuGuncelle(data) {
+        updateCartCount(data.cart_count || 0);
+        updateCartTotals(data);
+
+        const formlar = document.querySelectorAll('.quantity-control[data-urun-id]');
+        formlar.forEach(form => {
+            const kalem = data.kalemler[form.dataset.urunId];
+            const satir = form.closest('.row');
+            if (!kalem) {
+                if (satir) {
+                    satir.style.opacity = '0';
+                    setTimeout(() => satir.remove(), 300);
+                }
+                return;
+            }
+            const quantityInput = form.querySelector('.quantity-input');
+            if (quantityInput) {
+                quantityInput.value = kalem.miktar;
+            }
+            const totalPriceEl = satir ? satir.querySelectorAll('.price-column .fw-bold')[1] : null;
+            if (totalPriceEl) {
+                totalPriceEl.textContent = `${kalem.ara_toplam.toFixed(2)} ₺`;
+            }
+        });
+
+        // Sepet sayfasında sepet boşaldıysa boş sepet görünümü için yenile
+        if (formlar.length && data.cart_count === 0) {
+            setTimeout(() => location.reload(), 300);
+        }
+    }
+
     // Event delegation ile tüm etkileşimleri yönet
     document.body.addEventListener('click', function(e) {
         // Sepete ekle butonu
@@ -95,155 +250,33 @@ document.addEventListener('DOMContentLoaded', function() {
             
             if (!form) return;
             
-            const formUrl = form.action;
             const urunId = form.querySelector('[name="urun_id"]')?.value;
             const urunAdi = form.dataset.urunAdi || "Ürün";
+            // Detay sayfasında miktar seçilebilir, grid'de her tıklama bir adet
+            const miktar = parseInt(form.querySelector('[name="miktar"]')?.value, 10) || 1;
+            if (!urunId) return;
             
-            fetch(formUrl, {
-                method: 'POST',
-                headers: {
-                    'X-CSRFToken': csrftoken,
-                    'X-Requested-With': 'XMLHttpRequest',
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                },
-                body: new URLSearchParams({
-                    'urun_id': urunId
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    showToast(`${urunAdi} sepete eklendi!`);
-                    
-                    // Sepet sayacını güncelle
-                    updateCartCount(data.cart_count || 0);
-                } else {
-                    showToast(data.message || 'Bir hata oluştu', 'danger');
-                }
-            })
-            .catch(error => {
-                console.error('Hata:', error);
-                showToast('Bir hata oluştu, lütfen tekrar deneyin', 'danger');
-            });
+            sepetIslemiEkle({ urun_id: urunId, islem: 'add', miktar: miktar }, `${urunAdi} sepete eklendi!`);
         }
         
         // Artı ve Eksi butonları - miktar güncelleme
-        else if (e.target.matches('button[name="increase"], button[name="decrease"], button[name="increase"] *, button[name="decrease"] *')) {
-            // Tıklanan butonu bul (i tag'ine tıklanırsa butonunu bul)
+        else if (e.target.closest('button[name="increase"], button[name="decrease"]')) {
             const button = e.target.closest('button');
-            if (!button) return;
-            
-            // Buton zaten disabled ise işlemi durdur
-            if (button.disabled) {
-                console.log('Button is disabled, ignoring click');
-                return;
-            }
-            
-            // Butonları geçici olarak disable et
-            button.disabled = true;
-            
             const form = button.closest('form');
-            if (!form) {
+            if (!form || !form.dataset.urunId) {
                 console.error('Form not found');
-                button.disabled = false;
-                return;
-            }
-            
-            const actionInput = form.querySelector('input[name="action"]');
-            if (!actionInput) {
-                console.error('Action input not found');
-                button.disabled = false;
                 return;
             }
             
-            // Action değerini belirle
-            actionInput.value = button.name; // "increase" veya "decrease"
+            const fark = button.name === 'increase' ? 1 : -1;
             
-            const formUrl = form.action;
-            console.log('Form submission:', {
-                url: formUrl,
-                action: actionInput.value
-            });
+            // Ekranda hemen göster, sunucu yanıtı ile düzeltilir
+            const quantityInput = form.querySelector('.quantity-input');
+            if (quantityInput) {
+                quantityInput.value = Math.max(0, (parseInt(quantityInput.value, 10) || 0) + fark);
+            }
             
-            // AJAX isteği gönder
-            fetch(formUrl, {
-                method: 'POST',
-                headers: {
-                    'X-CSRFToken': csrftoken,
-                    'X-Requested-With': 'XMLHttpRequest',
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                },
-                body: new URLSearchParams({
-                    'action': actionInput.value,
-                    'csrfmiddlewaretoken': form.querySelector('[name=csrfmiddlewaretoken]').value
-                })
-            })
-            .then(response => {
-                console.log('Response status:', response.status);
-                console.log('Response URL:', response.url);
-                console.log('Response headers:', response.headers.get('content-type'));
-                
-                // İlk olarak response text'ini alalım
-                return response.text().then(text => {
-                    console.log('Response text (ilk 200 karakter):', text.substring(0, 200));
-                    
-                    // Eğer response OK değilse
-                    if (!response.ok) {
-                        console.error(`HTTP error: ${response.status} for URL ${response.url}`);
-                        throw new Error(`Server error: ${response.status} - Response is not JSON`);
-                    }
-                    
-                    // JSON'a çevirmeye çalış
-                    try {
-                        return JSON.parse(text);
-                    } catch (e) {
-                        console.error('JSON parse error:', e);
-                        console.error('Raw response:', text);
-                        throw new Error(`JSON parse error: ${e.message}`);
-                    }
-                });
-            })
-            .then(data => {
-                console.log('Parsed response data:', data);
-                
-                if (data.success) {
-                    // Ürün miktarını güncelle
-                    const quantityInput = form.querySelector('.quantity-input');
-                    if (quantityInput && data.new_quantity !== undefined) {
-                        quantityInput.value = data.new_quantity;
-                    }
-                    
-                    // Ürün toplam fiyatını güncelle
-                    const row = form.closest('.row');
-                    if (row) {
-                        const totalPriceElement = row.querySelector('.price-column:last-of-type .fw-bold');
-                        if (totalPriceElement && data.new_total) {
-                            totalPriceElement.textContent = `${data.new_total.toFixed(2)} ₺`;
-                        }
-                    }
-                    
-                    // Sepet özetini güncelle
-                    updateCartTotals(data);
-                    
-                    // Sepet sayacını güncelle
-                    updateCartCount(data.cart_count || 0);
-                    
-                    showToast('Miktar güncellendi!');
-                } else {
-                    console.error('Response error:', data);
-                    showToast(data.message || 'Güncelleme başarısız', 'danger');
-                }
-            })
-            .catch(error => {
-                console.error('Fetch error:', error);
-                showToast('Ağ hatası: ' + error.message, 'danger');
-            })
-            .finally(() => {
-                // Butonu tekrar aktif et (500ms sonra)
-                setTimeout(() => {
-                    button.disabled = false;
-                }, 500);
-            });
+            sepetIslemiEkle({ urun_id: form.dataset.urunId, islem: 'add', miktar: fark }, 'Miktar güncellendi!');
         }
         
         // Sepetten sil butonu
@@ -252,55 +285,20 @@ document.addEventListener('DOMContentLoaded', function() {
             const button = e.target.closest('.remove-cart-form button');
             const form = button.closest('form');
             
-            if (!form) return;
+            if (!form || !form.dataset.urunId) return;
             
             // Onay isteme
             if (!confirm('Bu ürünü sepetten kaldırmak istediğinizden emin misiniz?')) {
                 return;
             }
             
-            const formUrl = form.action;
             const urunAdi = form.dataset.urunAdi || "Ürün";
+            const satir = form.closest('.row');
+            if (satir) {
+                satir.style.opacity = 0.5;  // Siliniyor görünümü
+            }
             
-            fetch(formUrl, {
-                method: 'POST',
-                headers: {
-                    'X-CSRFToken': csrftoken,
-                    'X-Requested-With': 'XMLHttpRequest',
-                }
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    // Ürünü listeden kaldır
-                    const row = form.closest('.row');
-                    if (row) {
-                        row.style.opacity = '0';
-                        setTimeout(() => {
-                            row.remove();
-                            
-                            // Eğer sepet boşaldıysa sayfayı yenile
-                            if (data.cart_count === 0) {
-                                location.reload();
-                            }
-                        }, 300);
-                    }
-                    
-                    // Sepet sayacını güncelle
-                    updateCartCount(data.cart_count || 0);
-                    
-                    // Sepet özetini güncelle
-                    updateCartTotals(data);
-                    
-                    showToast(`${urunAdi} sepetten silindi!`);
-                } else {
-                    showToast(data.message || 'Silme işlemi başarısız', 'danger');
-                }
-            })
-            .catch(error => {
-                console.error('Hata:', error);
-                showToast('Bir hata oluştu, lütfen tekrar deneyin', 'danger');
-            });
+            sepetIslemiEkle({ urun_id: form.dataset.urunId, islem: 'remove' }, `${urunAdi} sepetten silindi!`);
         }
     });
     
@@ -5,7 +5,20 @@ document.addEventListener('DOMContentLoaded', function () {
     const categoryLinks = document.querySelectorAll('.category-filter .filter-btn');
     const sortSelect = document.querySelector('.sort-dropdown');
 
+    // Katalog JSON API'si (onep/api.py) tüm sıralamaları destekler; kartlar
+    // sunucuda _product_card.html ile render edilip "kart" alanında gelir.
+    // API kullanılamazsa HTML parçası istenir.
+    const API_ALANLARI = 'id,kart';
+
+    function apiKullanilir() {
+        return Boolean(productGrid && productGrid.dataset.apiUrl);
+    }
+
     function fetchProducts(url) {
+        if (apiKullanilir()) {
+            urunleriApidenYukle(url);
+            return;
+        }
         fetch(url, {
             headers: {
                 'X-Requested-With': 'XMLHttpRequest'
@@ -18,11 +31,16 @@ document.addEventListener('DOMContentLoaded', function () {
             const doc = parser.parseFromString(html, 'text/html');
             const newGrid = doc.getElementById('productsGrid');
             const newPagination = doc.querySelector('.pagination-container');
+            const newFacetPanel = doc.getElementById('facetPanel');
+            const facetPanel = document.getElementById('facetPanel');
 
             if (newGrid) {
                 productGrid.innerHTML = newGrid.innerHTML;
             }
-            
+            if (facetPanel && newFacetPanel) {
+                facetPanel.innerHTML = newFacetPanel.innerHTML;
+            }
+
             // Sayfalamayı güncelle
             const paginationContainer = document.querySelector('.pagination-container');
             if (paginationContainer && newPagination) {
@@ -33,16 +51,257 @@ document.addEventListener('DOMContentLoaded', function () {
 
             // URL'yi tarayıcı geçmişine ekle
             history.pushState(null, '', url);
+            sentinelGozle();
+            facetleriGuncelle(url);
         })
         .catch(error => console.error('Filtreleme hatası:', error));
     }
 
+    // --- JSON API ile filtreleme ---------------------------------------------
+
+    function apiAdresi(url, imlec) {
+        const params = new URL(url, window.location.href).searchParams;
+        ['page', 'sayfalama', 'imlec'].forEach(p => params.delete(p));
+        params.set('alanlar', API_ALANLARI);
+        if (imlec) {
+            params.set('imlec', imlec);
+        } else {
+            params.set('facetler', '1');
+        }
+        return `${productGrid.dataset.apiUrl}?${params.toString()}`;
+    }
+
+    function apiIstegi(url, imlec) {
+        return fetch(apiAdresi(url, imlec), {
+            headers: {
+                'Accept': 'application/json'
+            }
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`API hatası: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(veri => ({
+            // Sütun başlıkları + satırlar -> nesneler
+            urunler: veri.urunler.map(satir => Object.fromEntries(veri.alanlar.map((alan, i) => [alan, satir[i]]))),
+            sonraki: veri.sonraki,
+            facetler: veri.facetler
+        }));
+    }
+
+    function urunleriApidenYukle(url) {
+        apiIstegi(url)
+        .then(veri => {
+            if (veri.urunler.length) {
+                kartlariEkle(veri.urunler);
+            } else {
+                productGrid.innerHTML = bosSonuc();
+            }
+            if (veri.facetler) {
+                facetPaneliniGuncelle(veri.facetler, url);
+                kategoriSayilariniGuncelle(veri.facetler);
+            }
+            sayfalamayiGuncelle(url, veri.sonraki);
+            history.pushState(null, '', url);
+            sentinelGozle();
+        })
+        .catch(error => {
+            // API kullanılamıyorsa HTML parçasına dön
+            console.error('Filtreleme hatası:', error);
+            productGrid.dataset.apiUrl = '';
+            fetchProducts(url);
+        });
+    }
+
+    function kacis(deger) {
+        const div = document.createElement('div');
+        div.textContent = deger == null ? '' : String(deger);
+        return div.innerHTML.replace(/"/g, '&quot;');
+    }
+
+    // API kartlarındaki CSRF yer tutucusu sayfanın kendi token'ı ile değiştirilir
+    function kartlariEkle(urunler, konum) {
+        const sablon = document.createElement('template');
+        sablon.innerHTML = urunler.map(urun => urun.kart).join('');
+        const girdi = document.querySelector('[name=csrfmiddlewaretoken]');
+        sablon.content.querySelectorAll('[name=csrfmiddlewaretoken]').forEach(csrf => {
+            csrf.value = girdi ? girdi.value : '';
+        });
+        if (konum === 'sona') {
+            productGrid.append(sablon.content);
+        } else {
+            productGrid.replaceChildren(sablon.content);
+        }
+    }
+
+    function bosSonuc() {
+        return `
+    <div class="col-12">
+        <div class="text-center py-5">
+            <div class="mb-4">
+                <i class="fas fa-search fa-4x text-muted opacity-50"></i>
+            </div>
+            <h4 class="text-muted mb-3">Henüz ürün bulunmuyor</h4>
+            <p class="text-muted">Lütfen daha sonra tekrar kontrol edin veya farklı arama kriterleri deneyin.</p>
+        </div>
+    </div>`;
+    }
+
+    function facetPaneliniGuncelle(facetler, url) {
+        let facetPanel = document.getElementById('facetPanel');
+        if (!facetPanel) {
+            facetPanel = document.createElement('div');
+            facetPanel.id = 'facetPanel';
+            facetPanel.className = 'facet-panel d-flex flex-wrap align-items-center mb-3';
+            productGrid.before(facetPanel);
+        }
+        const params = new URL(url, window.location.href).searchParams;
+        ['page', 'imlec', 'min_fiyat', 'max_fiyat'].forEach(p => params.delete(p));
+
+        let html = `<span class="me-3 text-muted small">${facetler.toplam} ürün, ${facetler.stokta} stokta</span>`;
+        facetler.fiyat_araliklari.filter(aralik => aralik.adet).forEach(aralik => {
+            const aralikParams = new URLSearchParams(params);
+            aralikParams.set('min_fiyat', aralik.min);
+            if (aralik.max) {
+                aralikParams.set('max_fiyat', aralik.max);
+            }
+            const etiket = aralik.max ? `₺${aralik.min} - ₺${aralik.max}` : `₺${aralik.min}+`;
+            html += `<a class="btn btn-sm btn-outline-secondary rounded-pill me-2 mb-1 facet-fiyat" href="?${kacis(aralikParams.toString())}">${etiket} <span class="badge bg-secondary">${aralik.adet}</span></a>`;
+        });
+        facetPanel.innerHTML = html;
+    }
+
+    function sayfalamayiGuncelle(url, sonraki) {
+        const paginationContainer = document.querySelector('.pagination-container');
+        if (!paginationContainer) {
+            return;
+        }
+        if (!sonraki) {
+            paginationContainer.innerHTML = '';
+            return;
+        }
+        const params = new URL(url, window.location.href).searchParams;
+        params.delete('page');
+        params.set('imlec', sonraki);
+        const sonrakiUrl = `?${params.toString()}`;
+        paginationContainer.innerHTML = `
+    <div class="text-center mt-4 infinite-scroll-sentinel" data-next-url="${kacis(sonrakiUrl)}" data-imlec="${kacis(sonraki)}">
+        <a class="btn btn-outline-primary rounded-pill load-more" href="${kacis(sonrakiUrl)}">
+            <i class="fas fa-chevron-down me-2"></i>Daha Fazla Ürün
+        </a>
+    </div>`;
+    }
+
+    // Kategori butonlarındaki sayılar - mevcut aramaya göre
+    function kategoriSayilariniGuncelle(facetler) {
+        facetler.kategoriler.forEach(kategori => {
+            const link = document.querySelector(`.category-filter .filter-btn[data-slug="${CSS.escape(kategori.slug)}"]`);
+            if (!link) {
+                return;
+            }
+            const rozet = link.querySelector('.facet-adet');
+            if (rozet) {
+                rozet.textContent = kategori.adet;
+            }
+            link.classList.toggle('opacity-50', kategori.adet === 0);
+        });
+    }
+
+    // HTML yolunda kenar çubuğu sayıları facet JSON'undan (önbellekli)
+    function facetleriGuncelle(url) {
+        if (!productGrid.dataset.facetUrl) {
+            return;
+        }
+        const query = new URL(url, window.location.href).search;
+        fetch(productGrid.dataset.facetUrl + query, {
+            headers: {
+                'Accept': 'application/json'
+            }
+        })
+        .then(response => response.json())
+        .then(kategoriSayilariniGuncelle)
+        .catch(error => console.error('Facet sayıları alınamadı:', error));
+    }
+
+    // Sonsuz kaydırma (imleç modu) - sonraki sayfa grid'in sonuna eklenir
+    let yukleniyor = false;
+    const gozlemci = 'IntersectionObserver' in window ? new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                sonrakiSayfayiYukle(entry.target);
+            }
+        });
+    }, { rootMargin: '400px' }) : null;
+
+    function sentinelGozle() {
+        const sentinel = document.querySelector('.infinite-scroll-sentinel');
+        if (sentinel && gozlemci) {
+            gozlemci.observe(sentinel);
+        }
+    }
+
+    function sonrakiSayfayiYukle(sentinel) {
+        if (yukleniyor) {
+            return;
+        }
+        yukleniyor = true;
+        if (gozlemci) {
+            gozlemci.unobserve(sentinel);
+        }
+
+        // API ile yüklenen sayfalar: sadece sonraki ürünlerin JSON'u
+        if (sentinel.dataset.imlec && productGrid.dataset.apiUrl) {
+            apiIstegi(window.location.href, sentinel.dataset.imlec)
+            .then(veri => {
+                kartlariEkle(veri.urunler, 'sona');
+                sayfalamayiGuncelle(window.location.href, veri.sonraki);
+                sentinelGozle();
+            })
+            .catch(error => console.error('Sonraki sayfa yüklenemedi:', error))
+            .finally(() => {
+                yukleniyor = false;
+            });
+            return;
+        }
+
+        fetch(sentinel.dataset.nextUrl, {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        })
+        .then(response => response.text())
+        .then(html => {
+            const doc = new DOMParser().parseFromString(html, 'text/html');
+            const newGrid = doc.getElementById('productsGrid');
+            const newPagination = doc.querySelector('.pagination-container');
+
+            if (newGrid) {
+                productGrid.insertAdjacentHTML('beforeend', newGrid.innerHTML);
+            }
+
+            // Yeni sentinel (varsa) eskisinin yerine geçer
+            const paginationContainer = document.querySelector('.pagination-container');
+            if (paginationContainer) {
+                paginationContainer.innerHTML = newPagination ? newPagination.innerHTML : '';
+            }
+            sentinelGozle();
+        })
+        .catch(error => console.error('Sonraki sayfa yüklenemedi:', error))
+        .finally(() => {
+            yukleniyor = false;
+        });
+    }
+
+    sentinelGozle();
+
     // Kategori linklerine event listener ekle
     categoryLinks.forEach(link => {
         link.addEventListener('click', function (e) {
             e.preventDefault();
             const url = this.href;
-            
+
             // Aktif class'ını yönet
             categoryLinks.forEach(l => l.classList.remove('active'));
             this.classList.add('active');
@@ -56,12 +315,26 @@ document.addEventListener('DOMContentLoaded', function () {
         sortSelect.addEventListener('change', function () {
             const url = new URL(window.location.href);
             url.searchParams.set('siralama', this.value);
+            url.searchParams.delete('page');
+            url.searchParams.delete('imlec');
             fetchProducts(url.toString());
         });
     }
-    
+
     // Sayfalama linklerini dinamik olarak yönet
     document.body.addEventListener('click', function(e) {
+        const dahaFazla = e.target.closest('.load-more');
+        if (dahaFazla) {
+            e.preventDefault();
+            sonrakiSayfayiYukle(dahaFazla.closest('.infinite-scroll-sentinel'));
+            return;
+        }
+        const fiyatAraligi = e.target.closest('.facet-fiyat');
+        if (fiyatAraligi) {
+            e.preventDefault();
+            fetchProducts(fiyatAraligi.href);
+            return;
+        }
         if (e.target.closest('.pagination a')) {
             e.preventDefault();
             const link = e.target.closest('.pagination a');